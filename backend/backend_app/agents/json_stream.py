@@ -0,0 +1,264 @@
+import os
+import re
+import typing
+from typing import Dict, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+# --- Incremental validation of streamed evaluator output ---
+# Evaluator responses are checked character by character as they stream in, against the
+# fields of the expected pydantic model. As soon as the output can no longer become a
+# valid object (a schema echoed back, a missing or mistyped field, a runaway answer)
+# the caller stops reading the stream and retries; once the object closes, the rest of
+# the generation is not waited for.
+
+# Evaluator output ceiling (tokens at ~4 characters each, as the rate limiter estimates)
+EVALUATOR_MAX_OUTPUT_TOKENS = int(os.getenv("EVALUATOR_MAX_OUTPUT_TOKENS", "1024"))
+# Top-level keys of a JSON Schema: a model echoing the format instructions back
+SCHEMA_ECHO_KEYS = frozenset({"$defs", "$schema", "properties", "required", "title", "type"})
+
+_NUMBER_RE = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+
+# Value kinds checked while streaming; anything else is left to the final model validation
+NUMBER, STRING, STRING_ARRAY, BOOLEAN, ANY = "number", "string", "string array", "boolean", "any"
+
+# Parser states
+_PREAMBLE, _KEY_OR_END, _KEY_START, _KEY, _COLON, _VALUE, _STRING, _LITERAL, _ARRAY_ITEM_OR_END, \
+    _ARRAY_ITEM, _ARRAY_STRING, _ARRAY_NEXT, _NESTED, _AFTER_VALUE, _DONE = range(15)
+
+
+class SchemaViolation(ValueError):
+    """The streamed output can no longer become a valid instance of the expected model."""
+
+
+def _field_kind(annotation) -> Tuple[str, bool]:
+    """(kind, nullable) of a model field annotation."""
+    nullable = False
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        nullable = len(args) < len(typing.get_args(annotation))
+        annotation = args[0] if len(args) == 1 else None
+    if annotation is bool:
+        return BOOLEAN, nullable
+    if annotation in (int, float):
+        return NUMBER, nullable
+    if annotation is str:
+        return STRING, nullable
+    if typing.get_origin(annotation) in (list, typing.List) and typing.get_args(annotation) == (str,):
+        return STRING_ARRAY, nullable
+    return ANY, nullable
+
+
+def _literal_kind(token: str) -> Optional[str]:
+    if token in ("true", "false"):
+        return BOOLEAN
+    if token == "null":
+        return "null"
+    if _NUMBER_RE.fullmatch(token):
+        return NUMBER
+    return None
+
+
+class IncrementalJSONValidator:
+    """
+    Validates one JSON object streamed in chunks against `model_cls`.
+
+    `feed(chunk)` returns True once the object is complete and valid (`result` then holds
+    the model instance) and raises SchemaViolation as soon as it cannot become valid.
+    `finish()` is called when the stream ends and raises if the object never closed.
+    Text before the opening brace (a ```json fence, prose) and after the closing one is
+    ignored; the output ceiling still bounds it.
+    Fields the model does not declare are skipped, except JSON Schema keywords (the format
+    instructions echoed back) or any unknown field when the model forbids extras.
+    """
+
+    def __init__(
+        self,
+        model_cls: Type[BaseModel],
+        max_chars: int = EVALUATOR_MAX_OUTPUT_TOKENS * 4,
+    ):
+        self.model_cls = model_cls
+        self.fields: Dict[str, Tuple[str, bool]] = {
+            name: _field_kind(info.annotation) for name, info in model_cls.model_fields.items()
+        }
+        self.required: Set[str] = {name for name, info in model_cls.model_fields.items() if info.is_required()}
+        # Unknown fields are skipped (the models ignore them) unless the model forbids extras
+        self.forbid_extra = model_cls.model_config.get("extra") == "forbid"
+        self.max_chars = max_chars
+        self.result: Optional[BaseModel] = None
+
+        self._chunks = []
+        self._consumed = 0
+        self._start = 0
+        self._state = _PREAMBLE
+        self._seen: Set[str] = set()
+        self._key = []
+        self._field = ("", (ANY, True))
+        self._literal = []
+        self._escaped = False
+        self._in_string = False
+        self._depth = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def _violation(self, reason: str):
+        raise SchemaViolation(f"{reason} (after {self._consumed} characters)")
+
+    def feed(self, chunk: str) -> bool:
+        if self._state == _DONE:
+            return True
+        self._chunks.append(chunk)
+        for char in chunk:
+            self._consumed += 1
+            if self._step(char):
+                self._complete()
+                return True
+        if self._consumed > self.max_chars:
+            self._violation(f"output exceeded {self.max_chars} characters without completing the object")
+        return False
+
+    def finish(self):
+        if self._state != _DONE:
+            self._violation("output ended before the JSON object was complete")
+
+    def _complete(self):
+        self._state = _DONE
+        missing = self.required - self._seen
+        if missing:
+            self._violation(f"object closed without required field(s) {sorted(missing)}")
+        raw = self.text[self._start:self._consumed]
+        try:
+            self.result = self.model_cls.model_validate_json(raw)
+        except ValidationError as e:
+            raise SchemaViolation(f"object does not validate as {self.model_cls.__name__}: {e}") from e
+
+    def _start_value(self, char: str):
+        name, (kind, nullable) = self._field
+        if char == '"':
+            found = STRING
+        elif char == "[":
+            found = STRING_ARRAY if kind == STRING_ARRAY else ANY
+        elif char == "{":
+            found = "object"
+        else:
+            # A number or literal: its type is known once the token ends
+            self._literal = [char]
+            self._state = _LITERAL
+            return
+        if kind != ANY and found != kind:
+            self._violation(f"field '{name}' should be a {kind}, got a {found}")
+        if found == STRING:
+            self._state = _STRING
+        elif found == STRING_ARRAY:
+            self._state = _ARRAY_ITEM_OR_END
+        else:
+            self._depth, self._in_string = 1, False
+            self._state = _NESTED
+
+    def _end_literal(self):
+        name, (kind, nullable) = self._field
+        token = "".join(self._literal)
+        found = _literal_kind(token)
+        if found is None:
+            self._violation(f"invalid JSON value {token!r} for field '{name}'")
+        if found == "null" and not nullable:
+            self._violation(f"field '{name}' may not be null")
+        if found != "null" and kind != ANY and found != kind:
+            self._violation(f"field '{name}' should be a {kind}, got a {found}")
+        self._state = _AFTER_VALUE
+
+    def _step(self, char: str) -> bool:
+        """Advances the parser by one character; returns True when the object closes."""
+        state = self._state
+
+        # Inside strings every character counts
+        if state in (_KEY, _STRING, _ARRAY_STRING) or (state == _NESTED and self._in_string):
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                if state == _KEY:
+                    self._end_key()
+                elif state == _STRING:
+                    self._state = _AFTER_VALUE
+                elif state == _ARRAY_STRING:
+                    self._state = _ARRAY_NEXT
+                else:
+                    self._in_string = False
+            elif state == _KEY:
+                self._key.append(char)
+            return False
+
+        if state == _LITERAL:
+            if char.isalnum() or char in "+-.":
+                self._literal.append(char)
+                return False
+            self._end_literal()
+            state = self._state  # the delimiter is handled as after a value
+
+        if state == _NESTED:
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._state = _AFTER_VALUE
+            return False
+
+        if char.isspace():
+            return False
+
+        if state == _PREAMBLE:
+            if char == "{":
+                self._start = self._consumed - 1
+                self._state = _KEY_OR_END
+        elif state in (_KEY_OR_END, _KEY_START):
+            if char == '"':
+                self._key = []
+                self._state = _KEY
+            elif char == "}" and state == _KEY_OR_END:
+                return True
+            else:
+                self._violation(f"expected a field name, got {char!r}")
+        elif state == _COLON:
+            if char != ":":
+                self._violation(f"expected ':' after field '{self._field[0]}', got {char!r}")
+            self._state = _VALUE
+        elif state == _VALUE:
+            self._start_value(char)
+        elif state == _ARRAY_ITEM_OR_END and char == "]":
+            self._state = _AFTER_VALUE
+        elif state in (_ARRAY_ITEM_OR_END, _ARRAY_ITEM):
+            if char != '"':
+                self._violation(f"field '{self._field[0]}' should contain only strings, got {char!r}")
+            self._state = _ARRAY_STRING
+        elif state == _ARRAY_NEXT:
+            if char == ",":
+                self._state = _ARRAY_ITEM
+            elif char == "]":
+                self._state = _AFTER_VALUE
+            else:
+                self._violation(f"expected ',' or ']' in field '{self._field[0]}', got {char!r}")
+        elif state == _AFTER_VALUE:
+            if char == ",":
+                self._state = _KEY_START
+            elif char == "}":
+                return True
+            else:
+                self._violation(f"expected ',' or '}}' after field '{self._field[0]}', got {char!r}")
+        return False
+
+    def _end_key(self):
+        name = "".join(self._key)
+        if name not in self.fields and (self.forbid_extra or name in SCHEMA_ECHO_KEYS):
+            self._violation(f"unexpected field '{name}' (expected {sorted(self.fields)})")
+        if name in self._seen:
+            self._violation(f"duplicate field '{name}'")
+        self._seen.add(name)
+        self._field = (name, self.fields.get(name, (ANY, True)))
+        self._state = _COLON
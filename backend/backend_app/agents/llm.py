@@ -0,0 +1,270 @@
+import os
+import time
+import asyncio
+import logging
+import contextlib
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.metrics import LLM_REQUEST_DURATION, LLM_REQUESTS, LLM_CALL_FAILURES
+from core.rate_limiter import RateLimiter
+from core.resilience import RetryPolicy, LatencyTracker, call_with_resilience
+from shared.llm_usage import usage_record
+from agents.json_stream import SchemaViolation
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "openai/gpt-oss-safeguard-20b"
+
+# Per-agent client settings. Every role draws from the same key pool.
+ROLE_TEMPERATURES = {
+    "drafter": 0.3,
+    "critic": 0.0,
+    "safety": 0.1,
+}
+ROLE_KEY_ENV = {
+    "drafter": "GROQ_API_KEY_DRAFTER",
+    "critic": "GROQ_API_KEY_CRITIC",
+    "safety": "GROQ_API_KEY_SAFETY",
+}
+
+# Timeouts / retries per role. Evaluator calls are short and idempotent, so they are
+# hedged after their p95 latency; drafter calls are long and expensive, so they are not.
+ROLE_POLICIES = {
+    "drafter": RetryPolicy(timeout_s=180, max_attempts=3),
+    "critic": RetryPolicy(timeout_s=90, max_attempts=3, hedge=True),
+    "safety": RetryPolicy(timeout_s=90, max_attempts=3, hedge=True),
+}
+_latency = {role: LatencyTracker() for role in ROLE_TEMPERATURES}
+# Call duration above which the rate limiter reads the provider as saturated and trims
+# the key's concurrency; a full draft legitimately takes much longer than a review
+ROLE_LATENCY_TARGETS = {
+    "drafter": 120.0,
+    "critic": 30.0,
+    "safety": 30.0,
+}
+
+# Rough completion size used to pre-charge the token bucket before the real usage is known
+COMPLETION_TOKEN_ESTIMATE = 1500
+
+# Replacement clients per role (simulated/fake models for benchmarks)
+llm_overrides: Dict[str, Any] = {}
+
+_clients: Dict[Tuple[str, str], "ChatGroq"] = {}
+_rate_limiter: Optional[RateLimiter] = None
+
+# (node, records) of the graph node currently running; tasks spawned by the node
+# (section gathers, hedges) inherit it and append to the same list
+_usage_scope: ContextVar[Optional[Tuple[str, List[Dict]]]] = ContextVar("llm_usage_scope", default=None)
+
+
+def get_api_keys() -> List[str]:
+    """Key pool: GROQ_API_KEYS (comma-separated) plus the per-agent keys."""
+    pool = [k.strip() for k in os.getenv("GROQ_API_KEYS", "").split(",")]
+    pool += [os.getenv(env) for env in ROLE_KEY_ENV.values()]
+    return [k for k in pool if k]
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            api_keys=get_api_keys(),
+            requests_per_minute=int(os.getenv("GROQ_RPM_PER_KEY", "30")),
+            tokens_per_minute=int(os.getenv("GROQ_TPM_PER_KEY", "8000")),
+            initial_concurrency=float(os.getenv("GROQ_INITIAL_CONCURRENCY_PER_KEY", "4")),
+            max_concurrency=float(os.getenv("GROQ_MAX_CONCURRENCY_PER_KEY", "32")),
+        )
+        logger.info(f"[LLM] Rate limiter ready with {len(_rate_limiter.keys)} key(s).")
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter: RateLimiter):
+    """Replaces the process-wide limiter (e.g. an unthrottled one for benchmarks)."""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_llm(role: str, api_key: str):
+    """Shared client for (role, key), created on first use (langchain_groq is imported then too)."""
+    if role in llm_overrides:
+        return llm_overrides[role]
+    client = _clients.get((role, api_key))
+    if client is None:
+        from langchain_groq import ChatGroq
+        client = ChatGroq(
+            model=MODEL_NAME,
+            temperature=ROLE_TEMPERATURES[role],
+            api_key=api_key or None,
+        )
+        _clients[(role, api_key)] = client
+    return client
+
+
+def prewarm_clients():
+    """Builds the rate limiter and every (role, key) client up front (no network calls)."""
+    limiter = get_rate_limiter()
+    for role in ROLE_TEMPERATURES:
+        for key in limiter.keys:
+            get_llm(role, key.api_key)
+
+
+def estimate_tokens(messages: List[Tuple[str, str]]) -> int:
+    prompt_chars = sum(len(content) for _, content in messages)
+    return prompt_chars // 4 + COMPLETION_TOKEN_ESTIMATE
+
+
+@contextlib.contextmanager
+def record_llm_usage(node: str) -> Iterator[List[Dict]]:
+    """Collects a usage record for every LLM request made inside the block (see core/graph.py)."""
+    records: List[Dict] = []
+    token = _usage_scope.set((node, records))
+    try:
+        yield records
+    finally:
+        _usage_scope.reset(token)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _admit(role: str, messages: List[Tuple[str, str]]):
+    """Rate limiter lease for one attempt; call_with_resilience times the attempt from its grant."""
+    return get_rate_limiter().lease(estimate_tokens(messages), ROLE_LATENCY_TARGETS[role])
+
+
+async def _invoke_once(role: str, lease, messages: List[Tuple[str, str]], config: Optional[dict] = None):
+    """One admitted call: runs the request on the leased key, reports usage / 429s."""
+    llm = get_llm(role, lease.api_key)
+    started = time.perf_counter()
+    try:
+        response = await llm.bind(tools=[]).ainvoke(messages, config=config)
+    except asyncio.CancelledError:
+        # A losing hedge, or an evaluator cancelled by early termination
+        LLM_REQUESTS.labels(role, "cancelled").inc()
+        raise
+    except Exception as e:
+        if is_rate_limit_error(e):
+            lease.record_rate_limited(_retry_after_seconds(e))
+            LLM_REQUESTS.labels(role, "rate_limited").inc()
+        else:
+            LLM_REQUESTS.labels(role, "error").inc()
+        raise
+    elapsed = time.perf_counter() - started
+    LLM_REQUEST_DURATION.labels(role).observe(elapsed)
+    LLM_REQUESTS.labels(role, "ok").inc()
+    lease.record_success()
+    _record_usage(role, lease, getattr(response, "usage_metadata", None) or {}, elapsed)
+    return response
+
+
+def _record_usage(role: str, lease, usage: Dict, elapsed: float):
+    lease.record_usage(usage.get("total_tokens"))
+    scope = _usage_scope.get()
+    if scope is not None:
+        scope[1].append(usage_record(scope[0], role, usage, elapsed))
+
+
+def _estimated_usage(messages: List[Tuple[str, str]], completion: str) -> Dict:
+    """Usage of a stream closed before the provider reported it (~4 characters per token)."""
+    input_tokens = sum(len(content) for _, content in messages) // 4
+    output_tokens = len(completion) // 4
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+async def _stream_once(role: str, lease, messages: List[Tuple[str, str]], consumer, config: Optional[dict] = None):
+    """
+    One admitted streaming call: feeds the response to `consumer` and stops reading (which
+    ends the generation) once the consumer has a complete answer or rejects the output.
+    """
+    llm = get_llm(role, lease.api_key)
+    started = time.perf_counter()
+    stream = llm.bind(tools=[]).astream(messages, config=config)
+    completion, usage = [], None
+    try:
+        async for chunk in stream:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if isinstance(chunk.content, str) and chunk.content:
+                completion.append(chunk.content)
+                if consumer.feed(chunk.content):
+                    break
+        else:
+            consumer.finish()
+    except asyncio.CancelledError:
+        LLM_REQUESTS.labels(role, "cancelled").inc()
+        raise
+    except SchemaViolation:
+        # Billed up to here: account for the partial generation
+        LLM_REQUESTS.labels(role, "aborted").inc()
+        _record_usage(role, lease, usage or _estimated_usage(messages, "".join(completion)), time.perf_counter() - started)
+        raise
+    except Exception as e:
+        if is_rate_limit_error(e):
+            lease.record_rate_limited(_retry_after_seconds(e))
+            LLM_REQUESTS.labels(role, "rate_limited").inc()
+        else:
+            LLM_REQUESTS.labels(role, "error").inc()
+        raise
+    finally:
+        await stream.aclose()
+    elapsed = time.perf_counter() - started
+    LLM_REQUEST_DURATION.labels(role).observe(elapsed)
+    LLM_REQUESTS.labels(role, "ok").inc()
+    lease.record_success()
+    _record_usage(role, lease, usage or _estimated_usage(messages, "".join(completion)), elapsed)
+    return consumer
+
+
+async def invoke_llm(role: str, messages: List[Tuple[str, str]], config: Optional[dict] = None):
+    """
+    Single entry point for agent LLM calls. Each attempt (and each hedge) goes through
+    the shared rate limiter; timeouts, jittered retries and hedging follow ROLE_POLICIES
+    and start counting once the limiter admits the attempt.
+    """
+    try:
+        return await call_with_resilience(
+            lambda lease: _invoke_once(role, lease, messages, config),
+            ROLE_POLICIES[role],
+            _latency[role],
+            label=role,
+            admit=lambda: _admit(role, messages),
+        )
+    except Exception:
+        LLM_CALL_FAILURES.labels(role).inc()
+        raise
+
+
+async def stream_llm(role: str, messages: List[Tuple[str, str]], new_consumer: Callable[[], Any], config: Optional[dict] = None):
+    """
+    Streaming counterpart of invoke_llm for structured answers (see agents/json_stream.py).
+    Every attempt and hedge feeds its response to a fresh `new_consumer()`: `feed(chunk)`
+    returns True once the answer is complete and raises SchemaViolation to abort the
+    request; `finish()` runs if the stream ends first. Returns the consumer that accepted
+    a response. Aborted requests are not retried here; the caller decides.
+    """
+    try:
+        return await call_with_resilience(
+            lambda lease: _stream_once(role, lease, messages, new_consumer(), config),
+            ROLE_POLICIES[role],
+            _latency[role],
+            label=role,
+            admit=lambda: _admit(role, messages),
+        )
+    except SchemaViolation:
+        raise
+    except Exception:
+        LLM_CALL_FAILURES.labels(role).inc()
+        raise
@@ -0,0 +1,70 @@
+import re
+import json
+from typing import List
+
+from pydantic import BaseModel, Field, ValidationError
+
+# --- Line-level patch revisions ---
+# In revision mode the drafter can answer with patches addressed by the <L#> tags that
+# preprocessor_node adds, instead of re-emitting the whole protocol.
+
+LINE_TAG_RE = re.compile(r"</?L\d+>")
+
+
+class LinePatch(BaseModel):
+    """Replace lines start..end (1-based, inclusive). end = start - 1 inserts before `start`."""
+    start: int = Field(..., ge=1)
+    end: int = Field(..., ge=0)
+    text: str = Field("", description="Replacement text; empty deletes the lines.")
+
+
+class PatchError(ValueError):
+    """The model's patch could not be parsed or does not apply to the current draft."""
+
+
+PATCH_FORMAT_INSTRUCTIONS = """
+Do NOT rewrite the whole protocol. Output ONLY a raw JSON object of this form:
+{"patches": [{"start": <first line>, "end": <last line>, "text": "<replacement text>"}]}
+- Line numbers are the <L#> numbers of the current draft; start..end is inclusive.
+- "text" replaces those lines and may span several lines (use \\n); do not include <L#> tags.
+- Use "text": "" to delete lines. To insert new lines before line N, use "start": N, "end": N-1.
+- Patches must not overlap. Only touch the lines needed to address the required fixes.
+"""
+
+
+def parse_patches(raw: str) -> List[LinePatch]:
+    match = re.search(r"[\[{][\s\S]*[\]}]", raw or "")
+    if not match:
+        raise PatchError("No JSON patch found in drafter output")
+    try:
+        payload = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise PatchError(f"Patch is not valid JSON: {e}") from e
+
+    items = payload.get("patches") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        raise PatchError("Patch JSON has no 'patches' list")
+    try:
+        return [LinePatch(**item) for item in items]
+    except (TypeError, ValidationError) as e:
+        raise PatchError(f"Malformed patch entry: {e}") from e
+
+
+def apply_line_patches(draft: str, patches: List[LinePatch]) -> str:
+    """Splices `patches` into `draft`. Raises PatchError if any range is invalid or overlapping."""
+    lines = draft.split("\n")
+    ordered = sorted(patches, key=lambda p: (p.start, p.end))
+
+    previous_end = 0
+    for patch in ordered:
+        if patch.end < patch.start - 1 or patch.start > len(lines) + 1 or patch.end > len(lines):
+            raise PatchError(f"Patch range {patch.start}-{patch.end} is outside the {len(lines)}-line draft")
+        if patch.start <= previous_end:
+            raise PatchError(f"Patch at line {patch.start} overlaps the previous patch")
+        previous_end = max(previous_end, patch.end)
+
+    # Apply bottom-up so earlier line numbers stay valid
+    for patch in reversed(ordered):
+        replacement = LINE_TAG_RE.sub("", patch.text).split("\n") if patch.text else []
+        lines[patch.start - 1:patch.end] = replacement
+    return "\n".join(lines)
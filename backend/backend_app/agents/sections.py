@@ -0,0 +1,113 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from shared.states import SafetyAssessment, ClinicalReview
+
+# --- Section-parallel evaluation ---
+# Long drafts are split at their Markdown headings so the evaluators can review the
+# sections concurrently and cache each one on its own (see agents/workers.py). Sections
+# are reviewed with section-relative <L#> numbers, so a line inserted or deleted above a
+# section does not change what it is cached under; the numbers cited in the feedback are
+# shifted back to draft-wide ones when the results are merged.
+
+TAGGED_LINE_RE = re.compile(r"^<L(\d+)>(.*)</L\1>$")
+HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s")
+# Line citations in evaluator feedback: "Line 3", "lines 4-6", "<L7>", "L8 and 9"
+LINE_REF_RE = re.compile(r"(\b[Ll]ines?\s*|<L|\bL)(\d+)((?:\s*(?:-|–|,|to|and)\s*\d+)*)")
+
+
+@dataclass
+class DraftSection:
+    title: str = ""
+    first_line: int = 1
+    last_line: int = 0
+    tagged_lines: List[str] = field(default_factory=list)
+    lines: List[str] = field(default_factory=list)
+    has_body: bool = False
+
+    @property
+    def augmented_text(self) -> str:
+        """The section's <L#>-tagged lines, keeping draft-wide numbering."""
+        return "\n".join(self.tagged_lines)
+
+    @property
+    def text(self) -> str:
+        """The section's lines without tags (its cache identity)."""
+        return "\n".join(self.lines)
+
+    @property
+    def relative_text(self) -> str:
+        """The section's lines tagged <L1>, <L2>, ... from its first line."""
+        return "\n".join(f"<L{number}>{line}</L{number}>" for number, line in enumerate(self.lines, start=1))
+
+
+def split_sections(augmented_draft: str) -> List[DraftSection]:
+    """
+    Splits an <L#>-tagged draft into sections, one per Markdown heading. Consecutive
+    headings (e.g. the protocol title followed by "## Introduction") stay together, and
+    lines before the first heading belong to the first section. first_line / last_line
+    are draft-wide, so section feedback can be mapped back to the <L#> lines the drafter
+    sees (see to_draft_lines).
+    """
+    sections: List[DraftSection] = []
+    current = DraftSection()
+
+    for index, tagged in enumerate((augmented_draft or "").split("\n"), start=1):
+        match = TAGGED_LINE_RE.match(tagged)
+        line_number, text = (int(match.group(1)), match.group(2)) if match else (index, tagged)
+        is_heading = bool(HEADING_RE.match(text))
+
+        if is_heading and current.has_body:
+            sections.append(current)
+            current = DraftSection(first_line=line_number)
+        if not current.tagged_lines:
+            current.first_line = line_number
+        if is_heading:
+            # The heading closest to the body names the section ("Introduction", not the title)
+            current.title = text.strip().lstrip("#").strip()
+        elif text.strip():
+            current.has_body = True
+
+        current.tagged_lines.append(tagged)
+        current.lines.append(text)
+        current.last_line = line_number
+
+    if current.tagged_lines:
+        sections.append(current)
+    return sections
+
+
+def to_draft_lines(feedback: Optional[List[str]], section: DraftSection) -> Optional[List[str]]:
+    """Shifts the section-relative line numbers cited in `feedback` to draft-wide ones."""
+    if not feedback:
+        return feedback
+    offset = section.first_line - 1
+
+    def shift(match: re.Match) -> str:
+        tail = re.sub(r"\d+", lambda number: str(int(number.group(0)) + offset), match.group(3))
+        return f"{match.group(1)}{int(match.group(2)) + offset}{tail}"
+
+    return [LINE_REF_RE.sub(shift, item) for item in feedback]
+
+
+def _merged_feedback(results, sections: List[DraftSection]) -> List[str]:
+    return [item for result, section in zip(results, sections) for item in (to_draft_lines(result.feedback, section) or [])]
+
+
+def merge_safety_assessments(results: List[SafetyAssessment], sections: List[DraftSection]) -> SafetyAssessment:
+    """A draft is only as safe as its least safe section: lowest score, all feedback (draft-wide lines)."""
+    feedback = _merged_feedback(results, sections)
+    return SafetyAssessment(
+        safety_score=min(result.safety_score for result in results),
+        feedback=feedback or None,
+    )
+
+
+def merge_clinical_reviews(results: List[ClinicalReview], sections: List[DraftSection]) -> ClinicalReview:
+    """Lowest section score wins, so one weak section still sends the draft back for revision."""
+    feedback = _merged_feedback(results, sections)
+    return ClinicalReview(
+        overall_score=min(result.overall_score for result in results),
+        feedback=feedback or None,
+    )
@@ -1,5 +1,6 @@
 from typing import Literal
-from shared.states import BlackboardState, SafetyAssessment, ClinicalReview 
+from shared.states import BlackboardState, SafetyAssessment, ClinicalReview, SAFETY_PASS_SCORE, CLINICAL_PASS_SCORE
+from core.metrics import SUPERVISOR_DECISIONS, WORKFLOW_ITERATIONS
 import logging 
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,13 @@ def get_attr_or_key(obj, key, default=None):
         return obj.get(key, default)
     return default
 
+def _decided(reason: str, decision: dict, iters: int) -> dict:
+    """Counts the routing decision (and the iterations it took to reach review) for /metrics."""
+    SUPERVISOR_DECISIONS.labels(decision["next_action"], reason).inc()
+    if decision["next_action"] == "human_in_the_loop":
+        WORKFLOW_ITERATIONS.observe(iters)
+    return decision
+
 # ----------------------------------------------------
 
 def supervisor_logic(state: BlackboardState):
@@ -31,6 +39,7 @@ def supervisor_logic(state: BlackboardState):
     
     safety = state.get('safety_assessment')
     critique = state.get('clinical_critique')
+    skipped = state.get('evaluation_skipped')
     iters = state.get('iteration_count', 0)
     human_decision = state.get("human_decision")
 
@@ -42,74 +51,88 @@ def supervisor_logic(state: BlackboardState):
         if human_decision == "approve":
             thought = "Human approved the final draft. Proceeding to finalization."
             logger.info(f"[SUPERVISOR] {thought}")
-            return {
+            return _decided("HUMAN_APPROVE", {
                 "next_action": "finalizer_node",
                 "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}],
                 "human_decision": None # Reset the decision flag
-            }
+            }, iters)
         
         elif human_decision == "revise":
             thought = "Human requested revisions. Cycling back to the drafter."
             logger.info(f"[SUPERVISOR] {thought}")
-            return {
+            return _decided("HUMAN_REVISE", {
                 "next_action": "drafter_agent",
                 "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}],
                 "human_decision": None # Reset the decision flag
-            }
+            }, iters)
         
     # --- 2. EMERGENCY BRAKE: Infinite Loop Protection ---
     if iters >= MAX_ITERATIONS:
         thought = "Maximum iterations reached. Escalating to human review to prevent an infinite loop."
         logger.warning(f"[SUPERVISOR] {thought}")
-        return {
+        return _decided("MAX_ITERATIONS", {
             "next_action": "human_in_the_loop",
             "status":"AWAITING_HUMAN_REVIEW",
             "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}]
-        }
+        }, iters)
     
     # --- Retrieve agent results safely ---
     safety_score = get_attr_or_key(safety, 'safety_score', default=None)
     critic_score = get_attr_or_key(critique, 'overall_score', default=None)
     
     # --- 3. ROBUSTNESS CHECK (Did the parallel agents succeed?) ---
-    if safety_score is None or critic_score is None:
+    # An evaluator cancelled by early termination has no score; the other one failed the
+    # draft, which the checks below act on.
+    if skipped is None:
+        missing = safety_score is None or critic_score is None
+    else:
+        missing = safety_score is None and critic_score is None
+    if missing:
         thought = f"CRITICAL: Safety ({safety_score}) or Critique ({critic_score}) results are missing. Workflow inconsistent."
         logger.error(f"[SUPERVISOR] {thought}")
-        return {
+        return _decided("MISSING_RESULTS", {
             "next_action": "human_in_the_loop", # Escalate critical failures
             "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}]
-        }
+        }, iters)
     
     # --- 4. SAFETY CHECK ---
     # Assuming safety_score is an integer from 1 to 10.
-    if int(safety_score) < 9:
-        thought = f"Safety score ({safety_score}) is below the threshold of 9. Requesting revision."
+    if safety_score is not None and int(safety_score) < SAFETY_PASS_SCORE:
+        thought = f"Safety score ({safety_score}) is below the threshold of {SAFETY_PASS_SCORE}. Requesting revision."
         logger.info(f"[SUPERVISOR] {thought}") 
-        return {
+        return _decided("SAFETY_FAILURE", {
             "next_action": "drafter_agent",
             "reason_for_revision": "SAFETY_FAILURE",
             "is_revision" : True,
             "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}]
-        }
+        }, iters)
 
     # --- 5. CLINICAL QUALITY CHECK --- 
-    # Assuming critic_score is an integer from 1 to 10 or a boolean that converts to 0/1. 
-    # If it's a score: < 8 fails. If it's a boolean, ensure the critiquing agent sets 'is_passing' appropriately.
-    if int(critic_score) < 8:
-        thought = f"Clinical critique score is below threshold({critic_score} < 8). Requesting revision."
+    # critic_score is ClinicalReview.overall_score, 0 to 10 (0 when the review could not be parsed).
+    if critic_score is not None and int(critic_score) < CLINICAL_PASS_SCORE:
+        thought = f"Clinical critique score is below threshold({critic_score} < {CLINICAL_PASS_SCORE}). Requesting revision."
         logger.info(f"[SUPERVISOR] {thought}") 
-        return {
+        return _decided("CLINICAL_FAILURE", {
             "next_action": "drafter_agent",
             "reason_for_revision": "CLINICAL_FAILURE",
             "is_revision" : True,
             "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}]
-        }
+        }, iters)
+
+    # A skip is only recorded after the other evaluator failed the draft
+    if safety_score is None or critic_score is None:
+        thought = f"CRITICAL: {get_attr_or_key(skipped, 'evaluator')} was skipped but no failing review was found. Workflow inconsistent."
+        logger.error(f"[SUPERVISOR] {thought}")
+        return _decided("MISSING_RESULTS", {
+            "next_action": "human_in_the_loop",
+            "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}]
+        }, iters)
 
     # --- 6. APPROVAL PATH (All checks passed) ---
     thought = "Safety and clinical quality checks passed. The draft is ready for human review."
     logger.info(f"[SUPERVISOR] {thought}") 
-    return {
+    return _decided("PASSED", {
         "next_action": "human_in_the_loop",
         "status": "AWAITING_HUMAN_REVIEW",
         "agent_thoughts": [{"agent_name": "Supervisor", "thought": thought}]
-    }
\ No newline at end of file
+    }, iters)
\ No newline at end of file
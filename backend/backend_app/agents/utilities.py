@@ -1,17 +1,13 @@
 from typing import Literal
 from langgraph.types import interrupt
+from langchain_core.runnables import RunnableConfig
 from shared.states import BlackboardState, ClinicalReview
-from core.sqlite_db import log_final_protocol # For the history requirement
+from core.archiver import protocol_archiver # For the history requirement
+from core.metrics import awaiting_review_threads
 import logging
 import json
 logger = logging.getLogger(__name__)
 
-import sys
-import io
-
-# Force UTF-8 for all stdout/stderr
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 # --- 1. Preprocessor Node (Augment with Line Numbers) ---
 def preprocessor_node(state: BlackboardState) -> dict:
     """
@@ -39,36 +35,40 @@ def preprocessor_node(state: BlackboardState) -> dict:
     history_update = {"draft_history": [draft]}
     return {
         "augmented_draft": augmented_draft, 
+        # A new evaluation round starts: drop the previous round's skip marker
+        "evaluation_skipped": None,
         **history_update
     }
 
 # --- 2. Human-in-the-Loop Node (The Interrupt) ---
 
-def human_in_the_loop(state):
+def human_in_the_loop(state, config: RunnableConfig):
+    # thread_id is not a state key (LangGraph drops it), so it comes from the run config
+    thread_id = config["configurable"]["thread_id"]
+    # The node re-runs from the top on resume, so the thread is counted while the
+    # interrupt below is pending and dropped once a decision arrives.
+    awaiting_review_threads.add(thread_id)
     decision = interrupt({
         "status": "AWAITING_HUMAN_REVIEW",
     })
+    awaiting_review_threads.discard(thread_id)
     logger.info(f"<<< [HUMAN IN LOOP] FINISHED: {decision}")
 
-    thread_id = state.get("thread_id")
-
     if decision.get("approved"):
         return {
-            "thread_id": thread_id,
             "current_draft": decision["final_draft"],
             "status": "COMPLETED",
             "human_decision": "approve",
         }
 
     return {
-        "thread_id": thread_id,
         "status": "Revising/Interrupting",
         "human_decision": "revise"
     }
 
 
 # --- 3. Finalizer Node (History Logger) ---
-def finalizer_node(state, config: dict) -> dict:
+async def finalizer_node(state, config: RunnableConfig) -> dict:
     try:
         run_id = config["configurable"]["thread_id"]
 
@@ -83,9 +83,12 @@ def finalizer_node(state, config: dict) -> dict:
                 else state.dict()
             )
 
-        log_final_protocol(
+        # Write-behind: the archiver batches inserts off the request path.
+        # Callers that need the row on disk before the run ends set durable_archive.
+        await protocol_archiver.archive(
             run_id=run_id,
             final_state=state_dict,
+            durable=config["configurable"].get("durable_archive", False),
         )
 
         return {"status": "COMPLETED"}
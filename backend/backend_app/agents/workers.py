@@ -1,39 +1,46 @@
-import os
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from shared.states import BlackboardState, SafetyAssessment, ClinicalReview
-from dotenv import load_dotenv 
-from langchain_core.messages import AIMessage
-import json
+from langchain_core.runnables import RunnableConfig
+from shared.states import (
+    BlackboardState, SafetyAssessment, ClinicalReview, EvaluationSkipped,
+    SAFETY_PASS_SCORE, CLINICAL_PASS_SCORE,
+)
+from core.eval_cache import evaluation_cache
+from core.safety_screen import safety_prescreen
+from core.intent_index import intent_index
+from core.evaluation_rounds import EARLY_TERMINATION_ENABLED, RoundKey, SiblingFailed, evaluation_rounds
+from agents.supervisor import MAX_ITERATIONS
+from agents.llm import invoke_llm, stream_llm, MODEL_NAME
+from agents.json_stream import IncrementalJSONValidator, SchemaViolation
+from agents.patching import PATCH_FORMAT_INSTRUCTIONS, PatchError, parse_patches, apply_line_patches
+from agents.sections import DraftSection, split_sections, merge_safety_assessments, merge_clinical_reviews
+from typing import List, Optional, Tuple, Type, TypeVar
+import asyncio
+import os
+import sqlite3
 import logging
 logger = logging.getLogger(__name__)
-# Load environment variables from .env file
-load_dotenv()
-
-def extract_json_block(text: str) -> dict:
-    import re
-    match = re.search(r"\{[\s\S]*\}", text)
-    if not match:
-        raise ValueError("No JSON object found in LLM output")
-    return json.loads(match.group(0))
-
-drafter_llm = ChatGroq(
-    model="openai/gpt-oss-safeguard-20b",
-    temperature=0.3,
-    api_key=os.getenv("GROQ_API_KEY_DRAFTER")
-)
 
-critic_llm = ChatGroq(
-    model="openai/gpt-oss-safeguard-20b",
-    temperature=0.0,
-    api_key=os.getenv("GROQ_API_KEY_CRITIC")
-)
+# Bump these whenever an evaluator's prompt changes so cached results are not reused
+SAFETY_PROMPT_VERSION = "safety-v3"
+CRITIC_PROMPT_VERSION = "critic-v1"
+
+EvaluationT = TypeVar("EvaluationT", SafetyAssessment, ClinicalReview)
 
-safety_llm = ChatGroq(
-    model="openai/gpt-oss-safeguard-20b",
-    temperature=0.1,
-    api_key=os.getenv("GROQ_API_KEY_SAFETY")
+# Revisions with line-referenced feedback ask for <L#> patches instead of a full rewrite
+PATCH_REVISIONS_ENABLED = True
+# Tag on patch-mode drafter calls, so the SSE stream doesn't forward patch JSON as draft text
+DRAFT_PATCH_TAG = "draft_patch"
+# First drafts of intents matching an approved protocol start from that protocol (core/intent_index.py):
+# an identical intent reuses it as is, a similar one has the drafter adapt it
+INTENT_REUSE_ENABLED = os.getenv("INTENT_REUSE_ENABLED", "true").lower() == "true"
+
+# First-draft prompt for an intent similar to an approved protocol's
+SEED_PROTOCOL_MSG = (
+    "User Intent: {intent}\n\n"
+    "An approved protocol written for a similar but different intent ('{seed_intent}') is below. "
+    "Adapt it to the user intent above: change everything the difference requires (population, "
+    "condition, setting, examples), keep what still applies, and do not mention the original intent.\n\n"
+    "Approved protocol:\n{seed_draft}"
 )
 
 # --- 1. The Drafter Agent ---
@@ -41,7 +48,7 @@ from typing import Literal
 # Ensure SafetyAssessment and ClinicalReview are correctly imported
 # from shared.states import BlackboardState, SafetyAssessment, ClinicalReview 
 
-def drafter_agent(state: BlackboardState):
+async def drafter_agent(state: BlackboardState):
 
     """Generates or Revises the CBT protocol based on the reason for revision."""
     
@@ -51,7 +58,35 @@ def drafter_agent(state: BlackboardState):
     
     # ⭐️ REQUIRED FLAG: Access the reason for revision set by the Supervisor
     revision_reason: Literal['SAFETY_FAILURE', 'CLINICAL_FAILURE', None] = state.get('reason_for_revision')
+    # Set in targeted revision modes: same goal, but asks for <L#> patches
+    patch_system_msg = None
     
+    # 0. REUSE: the same intent was already approved; its draft goes straight to evaluation
+    #    (the evaluators and, for UI runs, the human still review it). A similar intent's
+    #    protocol only seeds the first draft below: the evaluators never see the intent,
+    #    so a draft written for another population or condition must be adapted, not served.
+    seed = None
+    if INTENT_REUSE_ENABLED and not revision_reason and state.get('iteration_count', 0) == 0:
+        try:
+            match = await intent_index.find(intent)
+        except sqlite3.Error as e:
+            logger.warning(f"[DRAFTER] Intent index lookup failed ({e}); drafting from scratch.")
+            match = None
+        if match is not None and match.exact:
+            logger.info(f"[DRAFTER] Reusing protocol {match.protocol_id} for identical intent '{match.user_intent}'.")
+            return {
+                "current_draft": match.final_draft,
+                "augmented_draft": None,
+                "reason_for_revision": None,
+                "iteration_count": 1,
+                "reused_protocol_id": match.protocol_id,
+                "agent_thoughts": [{"agent_name": "Drafter", "thought": (
+                    f"An approved protocol exists for the same intent ('{match.user_intent}'). "
+                    "Starting from it instead of drafting from scratch; it goes through the full review."
+                )}]
+            }
+        seed = match
+
     # 1. INITIAL DRAFT MODE
 
     if not revision_reason :
@@ -75,6 +110,13 @@ def drafter_agent(state: BlackboardState):
                 Output the full protocol in clean Markdown only, with no extra commentary.
             """
         human_msg = f"User Intent: {intent}"
+        if seed is not None:
+            logger.info(f"[DRAFTER] Adapting protocol {seed.protocol_id} of similar intent '{seed.user_intent}' ({seed.similarity:.2f}).")
+            thought = (
+                f"{thought} An approved protocol exists for a similar intent ('{seed.user_intent}'); "
+                "adapting it to this intent instead of drafting from scratch."
+            )
+            human_msg = SEED_PROTOCOL_MSG.format(intent=intent, seed_intent=seed.user_intent, seed_draft=seed.final_draft)
         
 
     # 2. REVISION MODE (Targeted Fixes)
@@ -89,7 +131,9 @@ def drafter_agent(state: BlackboardState):
         if revision_reason == "SAFETY_FAILURE" and safety_assessment:
             logger.info("RUNNING REVISION FOR SAFETY FAILURE")
             thought = "Revising the draft to fix CRITICAL SAFETY ISSUES (Self-Harm, Medical Advice, Scope Breach)."
-            system_msg = "You are refining a CBT protocol. **Your primary goal is safety.** Fix ONLY the specific safety issues flagged below. Do not change structure or tone unless necessary for safety. Output the revised protocol in clean Markdown format Do not add any leading or ending words ."
+            revision_goal = "You are refining a CBT protocol. **Your primary goal is safety.** Fix ONLY the specific safety issues flagged below. Do not change structure or tone unless necessary for safety."
+            system_msg = f"{revision_goal} Output the revised protocol in clean Markdown format Do not add any leading or ending words ."
+            patch_system_msg = f"{revision_goal}\n{PATCH_FORMAT_INSTRUCTIONS}"
             
             # Assuming SafetyAssessment.feedback is a list of objects with line_number, safety_flag, description
             if safety_assessment.feedback:
@@ -114,7 +158,9 @@ def drafter_agent(state: BlackboardState):
         elif revision_reason == "CLINICAL_FAILURE" and clinical_review:
             logger.info("RUNNING REVISION FOR clinical FAILURE")
             thought = "Revising the draft to fix Clinical Quality Issues (Tone, Structure)."
-            system_msg = "You are refining a CBT protocol. **Your primary goal is fix Clinical Quality Issues (Empathy,Tone, Structure).** Fix ONLY the specific clinical issues flagged below. Maintain a safe protocol. Output the revised protocol in clean Markdown format do not add any leading or ending words."
+            revision_goal = "You are refining a CBT protocol. **Your primary goal is fix Clinical Quality Issues (Empathy,Tone, Structure).** Fix ONLY the specific clinical issues flagged below. Maintain a safe protocol."
+            system_msg = f"{revision_goal} Output the revised protocol in clean Markdown format do not add any leading or ending words."
+            patch_system_msg = f"{revision_goal}\n{PATCH_FORMAT_INSTRUCTIONS}"
             
             # Assuming ClinicalReview.feedback is a list of objects with line_number, aspect, description
             if clinical_review.feedback:
@@ -142,32 +188,150 @@ def drafter_agent(state: BlackboardState):
              # Use a generic revision message to continue the process
              system_msg = "You are refining a CBT protocol. Improve the current draft based on the last review. Output the revised protocol in clean Markdown format."
              human_msg = f"Current Draft:\n{draft}\n\nPlease review and improve this draft."
+             patch_system_msg = None
 
-    # Generate the new or revised draft
+    new_draft = None
+
+    # 3. PATCH MODE: splice line-level patches into the current draft
+    if PATCH_REVISIONS_ENABLED and patch_system_msg:
+        patch_response = await invoke_llm("drafter", [
+            ("system", patch_system_msg),
+            ("human", human_msg)
+        ], config={"tags": [DRAFT_PATCH_TAG]})
+        try:
+            patches = parse_patches(patch_response.content)
+            new_draft = apply_line_patches(draft, patches)
+            thought = f"{thought} Applied {len(patches)} line-level patch(es) instead of rewriting the protocol."
+        except PatchError as e:
+            logger.info(f"[DRAFTER] Patch did not apply ({e}); falling back to a full rewrite.")
 
-    response = drafter_llm.bind(tools=[]).invoke([
-        ("system", system_msg), 
-        ("human", human_msg)
-    ])
+    # Generate the new or revised draft
+    # When the graph runs under astream_events (the /start SSE stream), LangChain
+    # streams this call token by token; main.py forwards those chunks as draft_delta.
+    if new_draft is None:
+        response = await invoke_llm("drafter", [
+            ("system", system_msg), 
+            ("human", human_msg)
+        ])
+        new_draft = response.content
     
     # We update the state with the new draft and increment iteration
-    return {
-        "current_draft": response.content, 
+    update = {
+        "current_draft": new_draft, 
         "augmented_draft": None,
         "reason_for_revision": None, 
         "iteration_count": state.get('iteration_count', 0) + 1,
         "agent_thoughts": [{"agent_name": "Drafter", "thought": thought}]
     }
+    if seed is not None:
+        update["seeded_from_protocol_id"] = seed.protocol_id
+    return update
+
+# --- Shared evaluator plumbing ---
+# Drafts with more than one heading section and at least SECTION_EVALUATION_MIN_LINES lines
+# are reviewed section by section, concurrently, with one cache entry per section text. Each
+# section is shown with its own <L1>.. numbering, so a revision that only touches one section
+# (even one that inserts or deletes lines) re-reviews just that section.
+SECTION_EVALUATION_ENABLED = os.getenv("SECTION_EVALUATION_ENABLED", "true").lower() == "true"
+SECTION_EVALUATION_MIN_LINES = int(os.getenv("SECTION_EVALUATION_MIN_LINES", "40"))
+# Evaluator responses are validated while they stream; off-schema output is cut off and
+# re-requested at once, up to this many requests per evaluation
+EVALUATOR_OUTPUT_ATTEMPTS = int(os.getenv("EVALUATOR_OUTPUT_ATTEMPTS", "3"))
+
+SECTION_SCOPE_NOTE = (
+    "This is one section (\"{title}\") of a longer protocol; the other sections are reviewed "
+    "separately. Assess only this section and cite the <L#> numbers shown.\n\n"
+)
+
+
+def sections_for_review(augmented_draft: str) -> List[DraftSection]:
+    """Sections to evaluate separately, or [] when the draft should be reviewed in one call."""
+    if not SECTION_EVALUATION_ENABLED:
+        return []
+    sections = split_sections(augmented_draft)
+    if len(sections) < 2 or sections[-1].last_line < SECTION_EVALUATION_MIN_LINES:
+        return []
+    return sections
+
+
+def section_scope_note(section: DraftSection) -> str:
+    return SECTION_SCOPE_NOTE.format(title=section.title)
+
+
+async def evaluate_with_cache(
+    role: str,
+    prompt_version: str,
+    model_cls: Type[EvaluationT],
+    system_msg: str,
+    human_msg: str,
+    text: str,
+    scoped: bool = False,
+) -> Tuple[EvaluationT, bool]:
+    """
+    Runs one evaluator call over `text` (a whole draft or one section's untagged text) and
+    validates it into `model_cls`. Results are cached by the hash of `text`; returns
+    (result, served_from_cache).
+    """
+    cache_kind = f"{role}-section" if scoped else role
+    cache_key = evaluation_cache.make_key(cache_kind, prompt_version, MODEL_NAME, text)
+    cached = await evaluation_cache.get(cache_key, model_cls)
+    if cached is not None:
+        return cached, True
+
+    # Transport errors are retried / hedged in agents.llm. Output that cannot become a valid
+    # model_cls is aborted mid-stream and re-requested here; the last failure propagates to
+    # the agent's fallback.
+    for attempt in range(1, EVALUATOR_OUTPUT_ATTEMPTS + 1):
+        try:
+            validator = await stream_llm(role, [
+                ("system", system_msg),
+                ("human", human_msg)
+            ], lambda: IncrementalJSONValidator(model_cls))
+            break
+        except SchemaViolation as e:
+            logger.info(f"[EVALUATION] {role} output rejected (attempt {attempt}/{EVALUATOR_OUTPUT_ATTEMPTS}): {e}")
+            if attempt == EVALUATOR_OUTPUT_ATTEMPTS:
+                raise
+    result = validator.result
+
+    await evaluation_cache.put(cache_key, role, result)
+    return result, False
+
+
+# --- Early termination ---
+# A safety score below SAFETY_PASS_SCORE or a clinical score below CLINICAL_PASS_SCORE forces
+# a revision whatever the other evaluator says, so the first failing result cancels the
+# other evaluator's review (core/evaluation_rounds.py). The cancelled one leaves an
+# EvaluationSkipped marker and reviews the revised draft in the next round. At the
+# iteration cap the supervisor escalates to a human, who gets both reviews.
+
+def evaluation_round(state: BlackboardState, config: Optional[RunnableConfig]) -> Optional[RoundKey]:
+    """The round shared with the other evaluator, or None when early termination does not apply."""
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    iteration = state.get('iteration_count', 0)
+    if not EARLY_TERMINATION_ENABLED or thread_id is None or iteration >= MAX_ITERATIONS:
+        return None
+    return (thread_id, iteration)
+
+
+def skipped_review(field: str, evaluator: str, agent_name: str, skipped: SiblingFailed) -> dict:
+    return {
+        field: None,
+        "evaluation_skipped": EvaluationSkipped(evaluator=evaluator, failed_by=skipped.failed_by, reason=skipped.reason),
+        "agent_thoughts": [{"agent_name": agent_name, "thought": (
+            f"Skipped: {skipped.failed_by} already failed this draft ({skipped.reason}), so a revision is "
+            "required either way. The revised draft gets a full review."
+        )}]
+    }
+
 
 # --- 2. The Safety Guardian ---
-def safety_guardian_agent(state: BlackboardState):
-    logger.info(">>> [SAFETY] STARTING: Assessing draft for risk...")
-    
-    # 1. Define safety_agent Parser
-    safety_parser = PydanticOutputParser(pydantic_object=SafetyAssessment)
-    safety_format_instructions = safety_parser.get_format_instructions()
-        
-    system_msg = f"""
+# Unguarded hard lexicon hits (core/safety_screen.py) fail the draft without an LLM
+# round-trip; every other hit is passed to the LLM review as a hint
+SAFETY_PRESCREEN_ENABLED = os.getenv("SAFETY_PRESCREEN_ENABLED", "true").lower() == "true"
+PRESCREEN_FAIL_SCORE = 2.0
+
+SAFETY_SYSTEM_MSG = """
         You are an Expert Clinical Safety Officer specializing in reviewing drafts intended for CBT (Cognitive Behavioral Therapy) exercise.
         Your task is to thoroughly assess the provided draft text for safety risks,
         Specifically, look for:
@@ -184,58 +348,110 @@ def safety_guardian_agent(state: BlackboardState):
         * A **description** of the problem and the necessary fix.
         **You MUST output only a raw JSON object it must be directly parseable by json.loads()** that strictly conforms to the provided schema."
         """
+
+
+PRESCREEN_HINTS_NOTE = (
+    "Pre-screen notes: the lines below contain phrases worth a closer look. They are acceptable "
+    "as crisis resources, screening items or quoted examples, and unsafe as instructions or "
+    "advice; judge them in context.\n{hits}\n\n"
+)
+
+
+def prescreen_hints(text: str) -> str:
+    """Lexicon hits in `text` that did not fail the draft, as a note for the LLM review."""
+    if not SAFETY_PRESCREEN_ENABLED:
+        return ""
+    hits = safety_prescreen.scan(text)
+    if not hits:
+        return ""
+    return PRESCREEN_HINTS_NOTE.format(hits="\n".join(
+        f"- Line {hit.line_number} [{hit.flag}]: \"{hit.phrase}\"" for hit in hits
+    ))
+
+
+async def safety_guardian_agent(state: BlackboardState, config: Optional[RunnableConfig] = None):
+    logger.info(">>> [SAFETY] STARTING: Assessing draft for risk...")
+    round_key = evaluation_round(state, config)
     
-    human_msg = f"Draft to Check:\n{state['augmented_draft']}\n\n{safety_format_instructions}"
+    # 1. Define safety_agent Parser
+    safety_parser = PydanticOutputParser(pydantic_object=SafetyAssessment)
+    safety_format_instructions = safety_parser.get_format_instructions()
     
     thought = "Assessing the current draft for safety risks, including self-harm, medical advice, and crisis keywords."
-    
-    # 2. Get raw LLM response
-    raw_assessment_msg = safety_llm.bind(tools=[]).invoke([
-        ("system", system_msg), 
-        ("human", human_msg)
-    ])
-
-    # 3. Extract JSON content string
-    raw_json_string = raw_assessment_msg.content
-    
+    augmented_draft = state['augmented_draft']
+
+    # 1b. Deterministic pre-screen: unguarded hard lexicon violations fail the draft immediately
+    hits = [hit for hit in safety_prescreen.scan(augmented_draft) if hit.hard] if SAFETY_PRESCREEN_ENABLED else []
+    if hits:
+        prescreen_assessment = SafetyAssessment(
+            safety_score=PRESCREEN_FAIL_SCORE,
+            feedback=[
+                f"Line {hit.line_number} [{hit.flag}]: contains \"{hit.phrase}\". Remove or rephrase this line; "
+                "the protocol must not give crisis instructions or medical/medication advice."
+                for hit in hits
+            ],
+        )
+        logger.info(f"<<< [SAFETY] PRE-SCREEN FAILED: {prescreen_assessment}")
+        evaluation_rounds.fail(round_key, "safety_guardian_agent", f"pre-screen found {len(hits)} hard violation(s)")
+        return {
+            "safety_assessment": prescreen_assessment,
+            "agent_thoughts": [{"agent_name": "Safety Guardian", "thought": f"{thought} The local pre-screen found {len(hits)} hard violation(s); skipped the LLM review."}]
+        }
+
+    def assess(text: str, section: Optional[DraftSection] = None):
+        scope_note = section_scope_note(section) if section else ""
+        human_msg = f"{scope_note}{prescreen_hints(text)}Draft to Check:\n{text}\n\n{safety_format_instructions}"
+        return evaluate_with_cache(
+            "safety", SAFETY_PROMPT_VERSION, SafetyAssessment,
+            SAFETY_SYSTEM_MSG, human_msg, section.text if section else text, scoped=section is not None,
+        )
+
+    async def review() -> Tuple[SafetyAssessment, str]:
+        # 2. Long drafts: assess every section concurrently and keep the worst result.
+        #    Identical drafts / unchanged sections reuse their stored assessment.
+        sections = sections_for_review(augmented_draft)
+        if sections:
+            results = await asyncio.gather(*(
+                assess(section.relative_text, section) for section in sections
+            ))
+            reused = sum(from_cache for _, from_cache in results)
+            return (
+                merge_safety_assessments([result for result, _ in results], sections),
+                f"{thought} Reviewed {len(sections)} sections in parallel ({reused} reused from cache).",
+            )
+        assessment, from_cache = await assess(augmented_draft)
+        return assessment, f"{thought} (reused cached assessment of identical draft)" if from_cache else thought
+
     try:
-        data = extract_json_block(raw_json_string)
-        #data = json.loads(json_string)
-        
-        # Create the validated Pydantic object
-        validated_assessment = SafetyAssessment(**data)
+        validated_assessment, thought = await evaluation_rounds.unless_failed(round_key, "safety_guardian_agent", review())
         
         logger.info(f"<<< [SAFETY] FINISHED: {validated_assessment}")
+        if validated_assessment.safety_score < SAFETY_PASS_SCORE:
+            evaluation_rounds.fail(round_key, "safety_guardian_agent", f"safety score {validated_assessment.safety_score}")
         
-        # 5. Return the validated Pydantic object
+        # 3. Return the validated Pydantic object
         return {
      
             "safety_assessment": validated_assessment,
             "agent_thoughts": [{"agent_name": "Safety Guardian", "thought": thought}]
         }
+
+    except SiblingFailed as skipped:
+        logger.info(f"<<< [SAFETY] SKIPPED: {skipped}")
+        return skipped_review("safety_assessment", "safety_guardian_agent", "Safety Guardian", skipped)
         
-    except json.JSONDecodeError as e:
-        logger.info(f"--- [SAFETY-AGENT] JSON PARSE ERROR: {e}")
-        logger.info(f"Raw LLM response content: {raw_json_string}")
+    except Exception as e:
+        logger.info(f"--- [SAFETY-AGENT] ERROR: Failed to generate or parse response. {type(e).__name__}: {e}")
+        evaluation_rounds.fail(round_key, "safety_guardian_agent", "unparseable safety review")
         
         # Fallback for safety failure
         return {
-            "safety_assessment": SafetyAssessment(safety_score=0.0, flags=["JSON_PARSE_FAILURE"]),
+            "safety_assessment": SafetyAssessment(safety_score=0.0, feedback=[]),
             "agent_thoughts": [{"agent_name": "Safety Guardian", "thought": f"CRITICAL FAILURE: Failed to parse LLM output. {e}"}]
         }
     
 # --- 3. The Clinical Critic ---
-def clinical_critic_agent(state: BlackboardState):
-    logger.info(">>> [CRITIC] STARTING: Reviewing draft quality (Safe Parsing)...")
-    
-    # 1. Setup Parser
-    # The parser needs to know what structure to enforce
-    parser = PydanticOutputParser(pydantic_object=ClinicalReview)
-    critic_format_instructions = parser.get_format_instructions()
-    thought = "Critiquing the current draft for tone, structure, and clinical soundness."
-
-    # 2. Define the system message with explicit JSON instruction
-    system_msg = f"""
+CRITIC_SYSTEM_MSG = """
         You are an Expert CBT Critic. Your task is to review a CBT exercise draft.
         
         Check the draft *thoroughly* based on the following three aspects:
@@ -255,44 +471,66 @@ def clinical_critic_agent(state: BlackboardState):
 
         **You MUST output only a raw JSON object it must be directly parseable by json.loads() ** that strictly conforms to the provided schema.**
     """ 
+
+
+async def clinical_critic_agent(state: BlackboardState, config: Optional[RunnableConfig] = None):
+    logger.info(">>> [CRITIC] STARTING: Reviewing draft quality (Safe Parsing)...")
+    round_key = evaluation_round(state, config)
     
-    human_msg = f"Draft to Review:\n{state['augmented_draft']}\n\n{critic_format_instructions}"
+    # 1. Setup Parser
+    # The parser needs to know what structure to enforce
+    parser = PydanticOutputParser(pydantic_object=ClinicalReview)
+    critic_format_instructions = parser.get_format_instructions()
+    thought = "Critiquing the current draft for tone, structure, and clinical soundness."
+    augmented_draft = state['augmented_draft']
+
+    def review_text(text: str, section: Optional[DraftSection] = None):
+        scope_note = section_scope_note(section) if section else ""
+        human_msg = f"{scope_note}Draft to Review:\n{text}\n\n{critic_format_instructions}"
+        return evaluate_with_cache(
+            "critic", CRITIC_PROMPT_VERSION, ClinicalReview,
+            CRITIC_SYSTEM_MSG, human_msg, section.text if section else text, scoped=section is not None,
+        )
     
-    # Create the prompt with just the messages we need
-    raw_assessment_msg = critic_llm.bind(tools=[]).invoke([
-            ("system", system_msg), 
-            ("human", human_msg)
-        ])
+    async def review() -> Tuple[ClinicalReview, str]:
+        # 2. Long drafts: review every section concurrently and keep the lowest score.
+        #    Identical drafts / unchanged sections reuse their stored review.
+        sections = sections_for_review(augmented_draft)
+        if sections:
+            results = await asyncio.gather(*(
+                review_text(section.relative_text, section) for section in sections
+            ))
+            reused = sum(from_cache for _, from_cache in results)
+            return (
+                merge_clinical_reviews([result for result, _ in results], sections),
+                f"{thought} Reviewed {len(sections)} sections in parallel ({reused} reused from cache).",
+            )
+        result, from_cache = await review_text(augmented_draft)
+        return result, f"{thought} (reused cached review of identical draft)" if from_cache else thought
     
-    # 3. Extract JSON content string
-    raw_json_string = raw_assessment_msg.content
-
     try:
-        data = extract_json_block(raw_json_string)
-        #data = json.loads(json_string)
+        critique, thought = await evaluation_rounds.unless_failed(round_key, "clinical_critic_agent", review())
         
-        # Create the validated Pydantic object
-        review = ClinicalReview(**data)
+        logger.info(f"<<< [CRITIC] FINISHED: {critique}")
+        if critique.overall_score < CLINICAL_PASS_SCORE:
+            evaluation_rounds.fail(round_key, "clinical_critic_agent", f"clinical score {critique.overall_score}")
         
-        logger.info(f"<<< [CRITIC] FINISHED: {review}")
-        
-        # 4. Update the thought
-        thought = f"Reviewing the current draft for tone, structure, and clinical soundness. {thought}"
-        # 5. Return the result
+        # 3. Return the result
         return {
-            "clinical_critique": review,
+            "clinical_critique": critique,
             "agent_thoughts": [{"agent_name": "Clinical Critic", "thought": thought}]
         }
+
+    except SiblingFailed as skipped:
+        logger.info(f"<<< [CRITIC] SKIPPED: {skipped}")
+        return skipped_review("clinical_critique", "clinical_critic_agent", "Clinical Critic", skipped)
             
     except Exception as e:
         logger.info(f"--- [CRITIC] ERROR: Failed to generate or parse response. {type(e).__name__}: {str(e)}")
+        evaluation_rounds.fail(round_key, "clinical_critic_agent", "unparseable clinical review")
         
         # Fallback mechanism: Return a safe, failed review
         return {
-            "clinical_critique": ClinicalReview(
-                feedback=[], 
-                overall_score=0, 
-                is_passing=False # Use hardcoded False here for safety fallback
-            ),
+            "clinical_critique": ClinicalReview(feedback=[], overall_score=0),
             "agent_thoughts": [{"agent_name": "Clinical Critic", "thought": "CRITICAL FAILURE: LLM response failed structured parsing."}]
         }
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Checkpoint write throughput vs. number of checkpoint shards (core/sharded_checkpointer.py).
+
+Runs --workflows concurrent simulated workflows against a fresh ShardedSqliteSaver at
+each shard count and reports checkpoint rows written per second (checkpoints + pending
+writes, counted in the shard files afterwards).
+
+  --mode saver  replays the write pattern of one run straight into the checkpointer:
+                per step, the task writes then the checkpoint, with a draft of --draft-kb
+                (isolates the storage layer)
+  --mode graph  runs the real compiled graph to the human-review pause with zero-latency
+                simulated LLMs (includes graph overhead on the one event loop)
+
+Run from backend/backend_app:
+    python -m benchmarks.checkpoint_shards --shards 1 4 16 --workflows 100
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import uuid
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+
+from benchmarks.harness import SimulatedLLM, install_simulated_llms, isolate_databases
+from core.graph import build_graph
+from core.sharded_checkpointer import ShardedSqliteSaver, open_sharded_checkpointer
+
+# Node steps of a first pass: drafter, preprocessor, the two evaluators, supervisor, review pause
+RUN_STEPS = [["drafter_agent"], ["preprocessor"], ["safety_guardian_agent", "clinical_critic_agent"], ["supervisor"], ["human_in_the_loop"]]
+
+
+async def replay_run(saver: ShardedSqliteSaver, thread_id: str, draft: str, latencies: list):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    checkpoint = empty_checkpoint()
+    versions = {}
+
+    async def put(step: int, status: str):
+        nonlocal config, checkpoint
+        for channel in ("current_draft", "agent_thoughts", "status"):
+            versions[channel] = saver.get_next_version(versions.get(channel), None)
+        checkpoint = {
+            **checkpoint,
+            "id": str(uuid6(clock_seq=step + 1)),
+            "channel_values": {"current_draft": draft, "status": status, "iteration_count": 1},
+            "channel_versions": dict(versions),
+        }
+        started = time.perf_counter()
+        config = await saver.aput(config, checkpoint, {"source": "loop", "step": step, "parents": {}}, dict(versions))
+        latencies.append(time.perf_counter() - started)
+
+    # Input checkpoint, then per step: each task's pending writes, then the step's checkpoint
+    await put(-1, "STARTING")
+    for step, tasks in enumerate(RUN_STEPS):
+        for task in tasks:
+            writes = [("current_draft", draft), ("agent_thoughts", [{"agent": task, "thought": "done", "step": step}])]
+            await saver.aput_writes(config, writes, task_id=str(uuid.uuid4()))
+        await put(step, tasks[-1])
+
+
+async def run_graph(app, thread_id: str):
+    await app.ainvoke(
+        {"user_intent": "Sleep hygiene protocol", "thread_id": thread_id, "draft_history": [], "iteration_count": 0, "execution_context": "UI"},
+        config={"configurable": {"thread_id": thread_id}},
+    )
+
+
+async def count_rows(saver: ShardedSqliteSaver) -> int:
+    rows = 0
+    for shard in saver.shards:
+        for table in ("checkpoints", "writes"):
+            async with shard.conn.execute(f"SELECT COUNT(*) FROM {table}") as cur:
+                rows += (await cur.fetchone())[0]
+    return rows
+
+
+async def run_level(mode: str, shards: int, workflows: int, draft: str) -> dict:
+    workdir = tempfile.mkdtemp(prefix="cerina-shards-")
+    isolate_databases(workdir)
+    saver = await open_sharded_checkpointer(f"{workdir}/checkpoints.sqlite", shards)
+    for shard in saver.shards:
+        await shard.setup()
+
+    latencies = []
+    started = time.perf_counter()
+    try:
+        if mode == "saver":
+            await asyncio.gather(*(replay_run(saver, f"wf-{i}", draft, latencies) for i in range(workflows)))
+        else:
+            app = await build_graph(saver)
+            await asyncio.gather(*(run_graph(app, f"wf-{i}") for i in range(workflows)))
+        elapsed = time.perf_counter() - started
+        rows = await count_rows(saver)
+    finally:
+        await saver.aclose()
+
+    return {
+        "shards": shards,
+        "elapsed_s": elapsed,
+        "rows": rows,
+        "rows_per_s": rows / elapsed,
+        "p95_put_ms": statistics.quantiles(latencies, n=20)[-1] * 1000 if latencies else None,
+    }
+
+
+async def main(mode: str, shard_counts: list, workflows: int, draft_kb: float):
+    draft = ("- Step: notice the thought, name it, and breathe for four counts.\n" * int(draft_kb * 16))[: int(draft_kb * 1024)]
+    if mode == "graph":
+        install_simulated_llms(
+            drafter=SimulatedLLM(0, lambda n: f"# Protocol\n\n## Introduction\n{draft}\n<!-- draft {n} -->"),
+            safety=SimulatedLLM(0, json.dumps({"safety_score": 10, "feedback": []})),
+            critic=SimulatedLLM(0, json.dumps({"overall_score": 10, "feedback": []})),
+        )
+
+    rows = [await run_level(mode, shards, workflows, draft) for shards in shard_counts]
+
+    print(f"\n{workflows} concurrent workflows, mode={mode}, draft {draft_kb:g} KB")
+    print(f"{'shards':>6} | {'elapsed (s)':>11} | {'rows':>6} | {'rows/s':>8} | {'speedup':>7} | {'p95 put':>8}")
+    print("-" * 62)
+    base = rows[0]["rows_per_s"]
+    for row in rows:
+        p95 = f"{row['p95_put_ms']:>6.1f}ms" if row["p95_put_ms"] is not None else f"{'-':>8}"
+        print(
+            f"{row['shards']:>6} | {row['elapsed_s']:>11.3f} | {row['rows']:>6} | "
+            f"{row['rows_per_s']:>8.0f} | {row['rows_per_s'] / base:>6.2f}x | {p95}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["saver", "graph"], default="saver")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--workflows", type=int, default=100, help="Concurrent simulated workflows")
+    parser.add_argument("--draft-kb", type=float, default=4, help="Draft size stored in every checkpoint")
+    args = parser.parse_args()
+    asyncio.run(main(args.mode, args.shards, args.workflows, args.draft_kb))
@@ -0,0 +1,93 @@
+"""
+Throughput benchmark for concurrent `/start` workflows.
+
+Drives the real FastAPI app and compiled LangGraph with the Groq clients
+replaced by a fixed-latency simulated model, then measures how many full
+SSE workflows (drafter -> preprocessor -> evaluators -> supervisor -> HIL pause)
+a single event loop completes per second at increasing concurrency.
+
+Run from backend/backend_app:
+    python -m benchmarks.concurrent_start --latency 0.5 --levels 1 4 16 64
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.harness import SimulatedLLM, install_simulated_llms, isolate_databases
+from core.graph import build_graph, close_checkpointers
+from core.job_queue import JobWorkerPool, job_queue
+from main import app, run_workflow_job
+
+DRAFT = "# Protocol\n\n## Introduction\nBreathe slowly."
+
+
+def install_fixed_latency_llms(latency: float):
+    # Unique drafts keep the evaluation cache from short-circuiting the evaluators
+    install_simulated_llms(
+        drafter=SimulatedLLM(latency, lambda n: f"{DRAFT}\n<!-- draft {n} -->"),
+        safety=SimulatedLLM(latency, json.dumps({"safety_score": 10, "feedback": []})),
+        critic=SimulatedLLM(latency, json.dumps({"overall_score": 10, "feedback": []})),
+    )
+
+
+async def _run_one(client: httpx.AsyncClient) -> int:
+    events = 0
+    started = await client.post("/start", json={"user_intent": "Sleep hygiene protocol"})
+    async with client.stream("GET", f"/stream/{started.json()['thread_id']}") as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                events += 1
+    return events
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int) -> dict:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_run_one(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "workflows_per_s": concurrency / elapsed,
+        "events": sum(results),
+    }
+
+
+async def main(latency: float, levels: list):
+    install_fixed_latency_llms(latency)
+    app.state.graph = await build_graph()
+    # One job worker per concurrent workflow, so the queue is never the bottleneck
+    app.state.job_workers = JobWorkerPool(job_queue, run_workflow_job, workers=max(levels))
+    await app.state.job_workers.start()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        rows = [await run_level(client, level) for level in levels]
+    await app.state.job_workers.stop()
+    await close_checkpointers()
+
+    # Each workflow makes two sequential LLM waits (drafter, then the parallel evaluators).
+    ideal_single = 1 / (2 * latency)
+    print(f"\nSimulated LLM latency: {latency:.3f}s  (ideal serial rate {ideal_single:.2f} wf/s)")
+    print(f"{'concurrency':>11} | {'elapsed (s)':>11} | {'workflows/s':>11} | {'speedup':>7}")
+    print("-" * 51)
+    base = rows[0]["workflows_per_s"]
+    for row in rows:
+        print(
+            f"{row['concurrency']:>11} | {row['elapsed_s']:>11.3f} | "
+            f"{row['workflows_per_s']:>11.2f} | {row['workflows_per_s'] / base:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per LLM call.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    # Keep the benchmark's databases out of the working tree.
+    isolate_databases(tempfile.mkdtemp(prefix="cerina-bench-"))
+    asyncio.run(main(args.latency, args.levels))
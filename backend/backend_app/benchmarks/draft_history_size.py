@@ -0,0 +1,89 @@
+"""
+Checkpoint DB size for a 4-iteration run: full-copy vs delta-encoded draft_history.
+
+Runs the real graph (simulated LLMs) through four drafter passes — the safety
+evaluator fails the first three — once with the legacy `operator.add` history
+and once with the delta-encoded reducer, then compares checkpoints.sqlite sizes.
+
+Run from backend/backend_app:
+    python -m benchmarks.draft_history_size --lines 150
+"""
+import argparse
+import asyncio
+import json
+import operator
+import os
+import tempfile
+from typing import Annotated, List
+
+from core.graph import build_graph, close_checkpointers
+from benchmarks.harness import SimulatedLLM, install_simulated_llms, isolate_databases
+from shared.draft_history import materialize_history
+from shared.states import BlackboardState
+
+
+# Pre-delta history channel: every version stored as a full copy
+LEGACY_HISTORY = Annotated[List[str], operator.add]
+
+
+def make_draft(lines: int, revision: int) -> str:
+    body = [f"- Step {i}: notice the thought, name it, and breathe for four counts." for i in range(lines)]
+    # Each revision rewrites a handful of lines, as targeted fixes do
+    for k in range(revision * 3):
+        body[(k * 37) % lines] = f"- Step {(k * 37) % lines}: revised wording (pass {revision})."
+    return "# Sleep Hygiene Protocol\n\n## Introduction\n" + "\n".join(body)
+
+
+async def run_once(workdir: str, lines: int, history_annotation=None) -> dict:
+    isolate_databases(workdir)
+    install_simulated_llms(
+        drafter=SimulatedLLM(0, lambda n: make_draft(lines, n)),
+        safety=SimulatedLLM(0, lambda n: json.dumps({"safety_score": 10 if n >= 4 else 5, "feedback": ["Line 3: soften wording"]})),
+        critic=SimulatedLLM(0, json.dumps({"overall_score": 10, "feedback": []})),
+    )
+
+    # Channels are read from the schema annotations when the graph is compiled
+    compact_history = BlackboardState.__annotations__["draft_history"]
+    if history_annotation is not None:
+        BlackboardState.__annotations__["draft_history"] = history_annotation
+    try:
+        app = await build_graph()
+    finally:
+        BlackboardState.__annotations__["draft_history"] = compact_history
+
+    config = {"configurable": {"thread_id": "size-bench"}}
+    state = await app.ainvoke(
+        {"user_intent": "Sleep hygiene protocol", "draft_history": [], "iteration_count": 0, "execution_context": "UI"},
+        config=config,
+    )
+    await close_checkpointers()
+
+    db_bytes = sum(
+        os.path.getsize(os.path.join(workdir, name))
+        for name in os.listdir(workdir)
+        if name.startswith("checkpoints")
+    )
+    return {
+        "iterations": state["iteration_count"],
+        "versions": len(materialize_history(state["draft_history"])),
+        "db_bytes": db_bytes,
+    }
+
+
+async def main(lines: int):
+    legacy = await run_once(tempfile.mkdtemp(prefix="cerina-bench-"), lines, LEGACY_HISTORY)
+    compact = await run_once(tempfile.mkdtemp(prefix="cerina-bench-"), lines)
+
+    print(f"\nDraft length: {lines} lines, iterations: {compact['iterations']}, versions kept: {compact['versions']}")
+    print(f"{'history encoding':>18} | {'checkpoints.sqlite':>18}")
+    print("-" * 40)
+    print(f"{'full copies':>18} | {legacy['db_bytes'] / 1024:>15.1f} KB")
+    print(f"{'line deltas':>18} | {compact['db_bytes'] / 1024:>15.1f} KB")
+    print(f"Reduction: {100 * (1 - compact['db_bytes'] / legacy['db_bytes']):.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=150, help="Lines per generated draft.")
+    args = parser.parse_args()
+    asyncio.run(main(args.lines))
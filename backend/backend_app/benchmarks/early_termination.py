@@ -0,0 +1,95 @@
+"""
+Early termination of the evaluator fan-out (core/evaluation_rounds.py).
+
+Runs workflows through the real graph (simulated LLMs) where one evaluator fails the
+first draft and the other is the slower of the two, with early termination off and on:
+
+  safety fails   safety scores 5 then 10 (fast), the critic always passes (slow)
+  critic fails   critic scores 6 then 10 (fast), safety always passes (slow)
+
+Each workflow runs to the human review pause after the revision. Reported per mode:
+mean wall time per workflow, evaluator LLM calls started (cancelled ones included),
+evaluator tokens, and skipped reviews.
+
+Run from backend/backend_app:
+    python -m benchmarks.early_termination --fast 0.5 --slow 2.0
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import agents.workers as workers
+from core.graph import build_graph, close_checkpointers
+from benchmarks.harness import FakeChatModel, drafter_script, evaluator_script, install_simulated_llms, isolate_databases
+from shared.llm_usage import summarize_llm_usage
+
+SCENARIOS = {
+    # name: (safety scores, critic scores, safety is the fast evaluator)
+    "safety fails": ([5, 10], [10], True),
+    "critic fails": ([10], [6, 10], False),
+}
+
+
+async def run_mode(scenario: str, early: bool, workflows: int, fast: float, slow: float) -> dict:
+    isolate_databases(tempfile.mkdtemp(prefix="cerina-early-"))
+    safety_scores, critic_scores, safety_fast = SCENARIOS[scenario]
+    drafter = FakeChatModel(drafter_script(), fast)
+    safety = FakeChatModel(evaluator_script("safety_score", safety_scores), fast if safety_fast else slow)
+    critic = FakeChatModel(evaluator_script("overall_score", critic_scores), slow if safety_fast else fast)
+    install_simulated_llms(drafter=drafter, safety=safety, critic=critic)
+    workers.EARLY_TERMINATION_ENABLED = early
+
+    app = await build_graph()
+
+    async def one(number: int):
+        config = {"configurable": {"thread_id": f"{scenario.replace(' ', '-')}-{int(early)}-{number}"}}
+        started = time.perf_counter()
+        state = await app.ainvoke(
+            {"user_intent": "Sleep hygiene protocol", "draft_history": [], "iteration_count": 0, "execution_context": "UI"},
+            config=config,
+        )
+        return time.perf_counter() - started, state
+
+    try:
+        runs = await asyncio.gather(*(one(n) for n in range(workflows)))
+    finally:
+        await close_checkpointers()
+
+    usage = summarize_llm_usage([record for _, state in runs for record in state.get("llm_usage", [])])
+    evaluator_nodes = ("safety_guardian_agent", "clinical_critic_agent")
+    skipped = sum(
+        1 for _, state in runs for thought in state.get("agent_thoughts", [])
+        if thought.get("thought", "").startswith("Skipped:")
+    )
+    return {
+        "mode": "on" if early else "off",
+        "mean_s": sum(elapsed for elapsed, _ in runs) / len(runs),
+        "evaluator_calls": safety.calls + critic.calls,
+        "evaluator_tokens": sum(
+            t.prompt_tokens + t.completion_tokens for node, t in usage.by_node.items() if node in evaluator_nodes
+        ),
+        "skipped": skipped,
+        "statuses": {state.get("status") for _, state in runs},
+    }
+
+
+async def main(workflows: int, fast: float, slow: float):
+    print(f"\n{workflows} concurrent workflows per run; fast evaluator {fast}s, slow {slow}s, drafter {fast}s per call")
+    print(f"{'scenario':>13} | {'early':>5} | {'mean wall':>9} | {'eval calls':>10} | {'eval tokens':>11} | skipped")
+    print("-" * 72)
+    for scenario in SCENARIOS:
+        for early in (False, True):
+            r = await run_mode(scenario, early, workflows, fast, slow)
+            workers.EARLY_TERMINATION_ENABLED = True
+            print(f"{scenario:>13} | {r['mode']:>5} | {r['mean_s']:>8.2f}s | {r['evaluator_calls']:>10} | "
+                  f"{r['evaluator_tokens']:>11} | {r['skipped']}  {sorted(map(str, r['statuses']))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=10)
+    parser.add_argument("--fast", type=float, default=0.5, help="Seconds per call of the failing evaluator (and drafter)")
+    parser.add_argument("--slow", type=float, default=2.0, help="Seconds per call of the passing evaluator")
+    args = parser.parse_args()
+    asyncio.run(main(args.workflows, args.fast, args.slow))
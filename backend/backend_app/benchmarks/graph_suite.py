@@ -0,0 +1,289 @@
+"""
+Graph-level benchmark suite: orchestration overhead of core/graph.build_graph, offline.
+
+Runs concurrent workflows through the real compiled graph with FakeChatModel clients
+scripted onto specific supervisor paths, and reports per scenario:
+  - workflows/s and wall time
+  - per-node latency (p50 / p95, from LangChain callbacks)
+  - checkpoint overhead (SQLite checkpointer vs. the same run on an in-memory saver,
+    plus checkpoint writes per workflow and their mean latency)
+  - peak Python memory (tracemalloc, measured in a separate pass)
+
+Every workflow must end on its scenario's path (iterations, status) or the suite fails.
+With --baseline the suite also fails when a scenario's workflows/s drops more than
+--tolerance below the saved numbers, so graph overhead regressions show up in CI:
+
+    python -m benchmarks.graph_suite --save results.json            # record a baseline
+    python -m benchmarks.graph_suite --baseline results.json        # gate against it
+
+Run from backend/backend_app. LLM latency defaults to 0 (pure orchestration cost);
+--latency / --jitter add a log-normal LLM latency.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.memory import InMemorySaver
+
+from agents.supervisor import MAX_ITERATIONS
+from benchmarks.harness import (
+    FakeChatModel,
+    LogNormalLatency,
+    drafter_script,
+    evaluator_script,
+    install_simulated_llms,
+    isolate_databases,
+    malformed_on_passes,
+)
+from core.graph import build_graph
+from core.sharded_checkpointer import ShardedSqliteSaver, open_sharded_checkpointer
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    safety_scores: Sequence[float]
+    critic_scores: Sequence[float]
+    expected_iterations: int
+    malformed_safety_passes: Tuple[int, ...] = ()
+    expected_status: str = "AWAITING_HUMAN_REVIEW"
+
+
+SCENARIOS = [
+    # First draft passes both evaluators
+    Scenario("pass", safety_scores=[10], critic_scores=[10], expected_iterations=1),
+    # Two SAFETY_FAILURE patch revisions, then a pass
+    Scenario("safety_loop", safety_scores=[5, 6, 10], critic_scores=[10], expected_iterations=3),
+    # One CLINICAL_FAILURE revision
+    Scenario("clinical_loop", safety_scores=[10], critic_scores=[6, 10], expected_iterations=2),
+    # Safety never passes: the supervisor escalates at MAX_ITERATIONS
+    Scenario("max_iterations", safety_scores=[4], critic_scores=[10], expected_iterations=MAX_ITERATIONS),
+    # Unparseable safety JSON on the first draft: fallback assessment, full rewrite, then a pass
+    Scenario("malformed_json", safety_scores=[10], critic_scores=[10], expected_iterations=2, malformed_safety_passes=(1,)),
+]
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time of every graph node run (callbacks whose run is the node itself)."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict = {}
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and node == kwargs.get("name"):
+            self._started[run_id] = (node, time.perf_counter())
+
+    def _stop(self, run_id):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            node, at = started
+            self.durations[node].append(time.perf_counter() - at)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._stop(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # human_in_the_loop ends by interrupting the run
+        self._stop(run_id)
+
+
+class TimedCheckpointer(ShardedSqliteSaver):
+    """Accumulates time spent inside the checkpointer's async calls."""
+
+    def __init__(self, shards):
+        super().__init__(shards)
+        self.seconds: Counter = Counter()
+        self.calls: Counter = Counter()
+
+    def _record(self, op: str, started: float):
+        self.seconds[op] += time.perf_counter() - started
+        self.calls[op] += 1
+
+    async def aget_tuple(self, config):
+        started = time.perf_counter()
+        try:
+            return await super().aget_tuple(config)
+        finally:
+            self._record("aget_tuple", started)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        started = time.perf_counter()
+        try:
+            return await super().aput(config, checkpoint, metadata, new_versions)
+        finally:
+            self._record("aput", started)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        started = time.perf_counter()
+        try:
+            return await super().aput_writes(config, writes, task_id, task_path)
+        finally:
+            self._record("aput_writes", started)
+
+
+def install_scenario_llms(scenario: Scenario, latency: Optional[LogNormalLatency]):
+    latency = latency or 0.0
+    install_simulated_llms(
+        drafter=FakeChatModel(drafter_script(), latency, seed=1),
+        safety=FakeChatModel(
+            evaluator_script("safety_score", scenario.safety_scores), latency, seed=2,
+            malformed=malformed_on_passes(scenario.malformed_safety_passes),
+        ),
+        critic=FakeChatModel(evaluator_script("overall_score", scenario.critic_scores), latency, seed=3),
+    )
+
+
+async def run_workflows(graph, scenario: Scenario, workflows: int, label: str, callbacks: list) -> Tuple[float, list]:
+    # Thread ids are unique per pass, so no run reuses another's cached evaluations
+    thread_ids = [f"{scenario.name}-{label}-{i}" for i in range(workflows)]
+    started = time.perf_counter()
+    finals = await asyncio.gather(*(
+        graph.ainvoke(
+            {"user_intent": "Sleep hygiene protocol", "thread_id": thread_id, "draft_history": [],
+             "iteration_count": 0, "execution_context": "UI"},
+            config={"configurable": {"thread_id": thread_id}, "callbacks": callbacks},
+        )
+        for thread_id in thread_ids
+    ))
+    return time.perf_counter() - started, finals
+
+
+async def run_scenario(scenario: Scenario, workflows: int, latency: Optional[LogNormalLatency], label: str) -> dict:
+    isolate_databases(tempfile.mkdtemp(prefix="cerina-suite-"))
+    install_scenario_llms(scenario, latency)
+    opened = await open_sharded_checkpointer("checkpoints.sqlite", shards=1)
+    checkpointer = TimedCheckpointer(opened.shards)
+    timer = NodeTimer()
+    try:
+        elapsed, finals = await run_workflows(await build_graph(checkpointer), scenario, workflows, label, [timer])
+    finally:
+        await checkpointer.aclose()
+
+    # Same workflows without persistence (same callbacks): the difference is the checkpoint overhead
+    install_scenario_llms(scenario, latency)
+    memory_elapsed, _ = await run_workflows(await build_graph(InMemorySaver()), scenario, workflows, f"{label}-mem", [NodeTimer()])
+
+    off_path = [
+        (final.get("iteration_count"), final.get("status")) for final in finals
+        if (final.get("iteration_count"), final.get("status")) != (scenario.expected_iterations, scenario.expected_status)
+    ]
+    writes = checkpointer.calls["aput"] + checkpointer.calls["aput_writes"]
+    return {
+        "scenario": scenario.name,
+        "workflows": workflows,
+        "elapsed_s": elapsed,
+        "workflows_per_s": workflows / elapsed,
+        "in_memory_workflows_per_s": workflows / memory_elapsed,
+        "checkpoint_overhead": max(0.0, 1 - memory_elapsed / elapsed),
+        "checkpoint_writes_per_workflow": writes / workflows,
+        "checkpoint_write_ms": (checkpointer.seconds["aput"] + checkpointer.seconds["aput_writes"]) / max(1, writes) * 1000,
+        "off_path": off_path,
+        "nodes": dict(timer.durations),
+    }
+
+
+async def measure_peak_memory(scenario: Scenario, workflows: int, latency: Optional[LogNormalLatency]) -> float:
+    """Peak traced Python memory (MB) of one pass; kept out of the timed pass (tracemalloc is slow)."""
+    tracemalloc.start()
+    try:
+        await run_scenario(scenario, workflows, latency, label="mem")
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[int(q) - 1]
+
+
+def print_report(results: List[dict]):
+    print(
+        f"\n{'scenario':>15} | {'wf':>4} | {'iters':>5} | {'wf/s':>7} | {'in-mem wf/s':>11} | "
+        f"{'ckpt cost':>9} | {'writes/wf':>9} | {'ms/write':>8} | {'peak MB':>7} | path"
+    )
+    print("-" * 112)
+    for r in results:
+        path = "ok" if not r["off_path"] else f"OFF PATH x{len(r['off_path'])} (e.g. {r['off_path'][0]})"
+        print(
+            f"{r['scenario']:>15} | {r['workflows']:>4} | {r['expected_iterations']:>5} | {r['workflows_per_s']:>7.1f} | "
+            f"{r['in_memory_workflows_per_s']:>11.1f} | {r['checkpoint_overhead']:>8.0%} | "
+            f"{r['checkpoint_writes_per_workflow']:>9.1f} | {r['checkpoint_write_ms']:>8.2f} | {r['peak_mb']:>7.1f} | {path}"
+        )
+
+    print(f"\n{'scenario':>15} | {'node':>22} | {'runs':>5} | {'p50 ms':>8} | {'p95 ms':>8}")
+    print("-" * 70)
+    for r in results:
+        for node, durations in sorted(r["nodes"].items()):
+            print(
+                f"{r['scenario']:>15} | {node:>22} | {len(durations):>5} | "
+                f"{percentile(durations, 50) * 1000:>8.2f} | {percentile(durations, 95) * 1000:>8.2f}"
+            )
+
+
+def check_baseline(results: List[dict], baseline_path: str, tolerance: float) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = {row["scenario"]: row for row in json.load(f)}
+    regressions = []
+    for r in results:
+        before = baseline.get(r["scenario"])
+        if before and r["workflows_per_s"] < before["workflows_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{r['scenario']}: {r['workflows_per_s']:.1f} wf/s vs baseline {before['workflows_per_s']:.1f}"
+            )
+    return regressions
+
+
+async def main(args) -> int:
+    latency = LogNormalLatency(args.latency, args.jitter) if args.latency > 0 else None
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+
+    results = []
+    for scenario in selected:
+        result = await run_scenario(scenario, args.workflows, latency, label="timed")
+        result["expected_iterations"] = scenario.expected_iterations
+        result["peak_mb"] = await measure_peak_memory(scenario, args.workflows, latency) if args.memory else 0.0
+        results.append(result)
+    print_report(results)
+
+    summary = [
+        {key: r[key] for key in ("scenario", "workflows", "workflows_per_s", "checkpoint_overhead", "peak_mb")}
+        for r in results
+    ]
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    failures = [f"{r['scenario']}: {len(r['off_path'])} workflow(s) off the scripted path" for r in results if r["off_path"]]
+    if args.baseline:
+        failures += check_baseline(results, args.baseline, args.tolerance)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=20, help="Concurrent workflows per scenario")
+    parser.add_argument("--scenarios", nargs="*", choices=[s.name for s in SCENARIOS], help="Default: all")
+    parser.add_argument("--latency", type=float, default=0.0, help="Median simulated LLM seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Log-normal sigma of the LLM latency")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the tracemalloc pass")
+    parser.add_argument("--save", help="Write a JSON summary (use as a later --baseline)")
+    parser.add_argument("--baseline", help="Fail if workflows/s regresses against this JSON summary")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed workflows/s drop vs. the baseline")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,247 @@
+"""
+Shared helpers for the offline benchmarks: fake LLM clients, scripted workflow paths
+and scratch databases.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables.config import ensure_config
+
+import agents.llm as llm
+import core.sqlite_db as sqlite_db
+from agents.workers import DRAFT_PATCH_TAG
+from core.eval_cache import evaluation_cache
+from core.archiver import protocol_archiver
+from core.job_queue import job_queue
+from core.history_search import history_search
+from core.intent_index import intent_index
+from core.rate_limiter import RateLimiter
+
+
+# --- Latency distributions (seconds per call) ---
+@dataclass(frozen=True)
+class FixedLatency:
+    seconds: float
+
+    def sample(self, rng: random.Random) -> float:
+        return self.seconds
+
+
+@dataclass(frozen=True)
+class UniformLatency:
+    low: float
+    high: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+@dataclass(frozen=True)
+class LogNormalLatency:
+    """Long-tailed like real LLM latency: `median` seconds, spread `sigma`, capped at `cap`."""
+    median: float
+    sigma: float = 0.5
+    cap: float = math.inf
+
+    def sample(self, rng: random.Random) -> float:
+        return min(self.cap, rng.lognormvariate(math.log(self.median), self.sigma))
+
+
+Latency = Union[float, FixedLatency, UniformLatency, LogNormalLatency]
+
+
+@dataclass
+class FakeCall:
+    """What a script sees about the call it answers."""
+    number: int                 # 1-based, across this model
+    thread_call: int            # 1-based, within the calling workflow thread
+    thread_id: Optional[str]
+    node: Optional[str]
+    tags: List[str]
+    prompt: str                 # the last (human) message
+
+
+class FakeChatModel:
+    """
+    Deterministic stand-in for a ChatGroq client, installed per role through
+    agents.llm.llm_overrides. Each call waits a latency drawn (from a seeded RNG) from
+    `latency`, plus `seconds_per_kchar` per 1000 prompt characters, then answers with
+    `script(call)`. When `malformed(call)` is true the answer is cut in half, which
+    exercises the agents' JSON parse-failure paths. Responses carry usage_metadata
+    estimated at four characters per token.
+
+    `astream` yields the same answer in STREAM_CHUNK_CHARS pieces: the prompt time comes
+    first and the sampled latency is spread over the pieces, so a consumer that stops
+    reading early also stops paying for the rest. `output_chars` counts what was yielded.
+    """
+
+    STREAM_CHUNK_CHARS = 16
+
+    def __init__(
+        self,
+        script: Callable[[FakeCall], str],
+        latency: Latency = 0.0,
+        seconds_per_kchar: float = 0.0,
+        malformed: Optional[Callable[[FakeCall], bool]] = None,
+        seed: int = 0,
+    ):
+        self.script = script
+        self.latency = FixedLatency(latency) if isinstance(latency, (int, float)) else latency
+        self.seconds_per_kchar = seconds_per_kchar
+        self.malformed = malformed
+        self._rng = random.Random(seed)
+        self._thread_calls: Counter = Counter()
+        self.calls = 0
+        self.malformed_calls = 0
+        self.output_chars = 0
+        self.model_name = "simulated"
+
+    def bind(self, **kwargs):
+        return self
+
+    def _begin(self, messages, config: Optional[dict]) -> FakeCall:
+        # The graph's run config (thread id, node) is the ambient LangChain config here
+        run_config = ensure_config()
+        thread_id = run_config.get("configurable", {}).get("thread_id")
+        self.calls += 1
+        self._thread_calls[thread_id] += 1
+        return FakeCall(
+            number=self.calls,
+            thread_call=self._thread_calls[thread_id],
+            thread_id=thread_id,
+            node=run_config.get("metadata", {}).get("langgraph_node"),
+            tags=list((config or {}).get("tags") or []),
+            prompt=messages[-1][1] if messages else "",
+        )
+
+    def _answer(self, call: FakeCall) -> str:
+        content = self.script(call)
+        if self.malformed is not None and self.malformed(call):
+            self.malformed_calls += 1
+            content = content[: len(content) // 2]
+        return content
+
+    @staticmethod
+    def _usage(prompt_chars: int, content: str) -> dict:
+        input_tokens, output_tokens = prompt_chars // 4, len(content) // 4
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    async def ainvoke(self, messages, *args, config: Optional[dict] = None, **kwargs):
+        call = self._begin(messages, config)
+        prompt_chars = sum(len(content) for _, content in messages)
+        await asyncio.sleep(self.latency.sample(self._rng) + self.seconds_per_kchar * prompt_chars / 1000)
+
+        content = self._answer(call)
+        self.output_chars += len(content)
+        return AIMessage(content=content, usage_metadata=self._usage(prompt_chars, content))
+
+    async def astream(self, messages, *args, config: Optional[dict] = None, **kwargs):
+        call = self._begin(messages, config)
+        prompt_chars = sum(len(content) for _, content in messages)
+        await asyncio.sleep(self.seconds_per_kchar * prompt_chars / 1000)
+
+        content = self._answer(call)
+        latency = self.latency.sample(self._rng)
+        pieces = [content[i:i + self.STREAM_CHUNK_CHARS] for i in range(0, len(content), self.STREAM_CHUNK_CHARS)] or [""]
+        for number, piece in enumerate(pieces, start=1):
+            await asyncio.sleep(latency / len(pieces))
+            self.output_chars += len(piece)
+            # Like the provider, usage arrives with the last chunk
+            usage = self._usage(prompt_chars, content) if number == len(pieces) else None
+            yield AIMessageChunk(content=piece, usage_metadata=usage)
+
+
+class SimulatedLLM(FakeChatModel):
+    """
+    Fixed-latency fake: waits `latency` seconds (plus `seconds_per_kchar` for every 1000
+    prompt characters), then returns `responses` (a fixed string, or a callable receiving
+    the 1-based call number).
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        responses: Union[str, Callable[[int], str]],
+        seconds_per_kchar: float = 0.0,
+    ):
+        script = (lambda call: responses(call.number)) if callable(responses) else (lambda call: responses)
+        super().__init__(script, latency, seconds_per_kchar)
+        self.responses = responses
+
+
+# --- Scripted workflow paths ---
+# Every fake draft carries a marker line with its workflow and drafter pass. Scripts read
+# the pass back from the prompt, so answers depend only on what the agent was shown
+# (retries and hedged duplicates get the same answer) and drafts stay unique per
+# workflow and pass (the evaluation cache never short-circuits a scripted path).
+DRAFT_MARKER_LINE = 3
+_MARKER_RE = re.compile(r"fake draft (\S+) pass (\d+)")
+
+
+def draft_pass(prompt: str) -> int:
+    """Drafter pass the prompt's draft came from (0 when it contains no fake draft)."""
+    match = _MARKER_RE.search(prompt)
+    return int(match.group(2)) if match else 0
+
+
+def fake_protocol(thread_id: Optional[str], pass_number: int, lines: int = 30) -> str:
+    body = [f"- Step {i}: notice the thought, name it, and breathe for four counts." for i in range(1, lines - 2)]
+    marker = f"_fake draft {thread_id} pass {pass_number}_"
+    return "\n".join(["# Sleep Hygiene Protocol", "", marker, *body])
+
+
+def drafter_script(lines: int = 30) -> Callable[[FakeCall], str]:
+    """Full drafts for draft / rewrite calls; a one-line <L#> patch of the marker for patch-mode revisions."""
+    def script(call: FakeCall) -> str:
+        pass_number = draft_pass(call.prompt) + 1
+        if DRAFT_PATCH_TAG in call.tags:
+            text = f"_fake draft {call.thread_id} pass {pass_number}_"
+            return json.dumps({"patches": [{"start": DRAFT_MARKER_LINE, "end": DRAFT_MARKER_LINE, "text": text}]})
+        return fake_protocol(call.thread_id, pass_number, lines)
+    return script
+
+
+def evaluator_script(score_field: str, scores: Sequence[float], feedback: str = "Line 3: soften the wording") -> Callable[[FakeCall], str]:
+    """
+    The evaluation of drafter pass k scores scores[k-1] (the last score repeats).
+    Scores below 10 carry line-referenced feedback, so revisions take the patch path.
+    """
+    def script(call: FakeCall) -> str:
+        score = scores[min(max(draft_pass(call.prompt), 1), len(scores)) - 1]
+        return json.dumps({score_field: score, "feedback": [feedback] if score < 10 else []})
+    return script
+
+
+def malformed_on_passes(passes: Iterable[int]) -> Callable[[FakeCall], bool]:
+    """Malformed-JSON injector for evaluations of the given drafter passes."""
+    passes = set(passes)
+    return lambda call: draft_pass(call.prompt) in passes
+
+
+def install_simulated_llms(drafter: FakeChatModel, safety: FakeChatModel, critic: FakeChatModel):
+    llm.llm_overrides.update(drafter=drafter, safety=safety, critic=critic)
+    # Simulated calls cost nothing; keep the shared limiter out of the measurement
+    llm.set_rate_limiter(RateLimiter(["simulated"], 10**9, 10**12, initial_concurrency=10**6, max_concurrency=10**6))
+
+
+def isolate_databases(workdir: str):
+    """Point checkpoints and the application DB at a scratch directory."""
+    os.chdir(workdir)
+    sqlite_db.DB_PATH = os.path.join(workdir, "cerina_foundry.db")
+    evaluation_cache.db_path = sqlite_db.DB_PATH
+    protocol_archiver.db_path = sqlite_db.DB_PATH
+    job_queue.close()
+    job_queue.db_path = sqlite_db.DB_PATH
+    history_search.close()
+    history_search.db_path = sqlite_db.DB_PATH
+    intent_index.close()
+    intent_index.db_path = sqlite_db.DB_PATH
+    sqlite_db.init_db()
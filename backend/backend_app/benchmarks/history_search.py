@@ -0,0 +1,210 @@
+"""
+/history/search latency over a large protocols_history table (core/history_search.py).
+
+Fills a scratch application DB with --rows synthetic protocols (Zipf-distributed words,
+so some terms match a handful of rows and others a large share of the table), through
+the real schema and FTS sync triggers, then times each query shape over --queries
+random queries:
+
+  rare / medium / common term   BM25-ranked first page (least frequent 1% of terms /
+                                in 0.1-1% of protocols / in over 10% of them)
+  two terms                     BM25-ranked, both words required
+  prefix                        last word as a prefix (`wor*`)
+  common, recent                newest-first first page (no ranking)
+  common, page 5                fifth ranked page, through its keyset cursor
+  latest                        no search terms, newest first (created_at index)
+  run id                        lookup of one run (run_id index)
+
+Run from backend/backend_app:
+    python -m benchmarks.history_search --rows 1000000
+    python -m benchmarks.history_search --db /tmp/history.db   # reuse a filled DB
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from itertools import accumulate
+
+from core import sqlite_db
+from core.history_search import HistorySearch
+
+BASE_WORDS = (
+    "sleep stress anxiety breathing thought record behaviour activation exposure worry panic "
+    "relaxation mindfulness journal schedule routine evening morning caffeine screen bedtime "
+    "reframe challenge evidence belief automatic negative emotion body tension muscle grounding "
+    "values goal step practice notice name pause reflect support professional session week"
+).split()
+VOCABULARY_SIZE = 20000
+DRAFT_WORDS = 80
+INSERT_BATCH = 20000
+
+
+def make_vocabulary(rng: random.Random) -> list:
+    words = list(BASE_WORDS)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    seen = set(words)
+    while len(words) < VOCABULARY_SIZE:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(5, 9)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def fill(db_path: str, rows: int, state_kb: float, seed: int) -> list:
+    """Creates the schema and inserts `rows` protocols; returns the run ids used."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    # Zipf weights: word k is drawn with probability ~ 1/k
+    cumulative = list(accumulate(1.0 / (k + 1) for k in range(len(vocabulary))))
+    state_blob = "x" * int(state_kb * 1024)
+
+    sqlite_db.DB_PATH = db_path
+    sqlite_db.init_db()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    run_ids = []
+    started = time.perf_counter()
+    for first in range(0, rows, INSERT_BATCH):
+        batch = []
+        for i in range(first, min(rows, first + INSERT_BATCH)):
+            words = rng.choices(vocabulary, cum_weights=cumulative, k=DRAFT_WORDS + 4)
+            run_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            if i % 1000 == 0:
+                run_ids.append(run_id)
+            batch.append((
+                str(uuid.uuid4()), run_id, f"CBT protocol for {' '.join(words[:4])}",
+                "# Protocol\n\n" + " ".join(words[4:]), rng.randint(1, 4), state_blob,
+                # Spread creation over ~a year, in insertion order
+                time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1.7e9 + i * 30)),
+            ))
+        with conn:
+            conn.executemany(
+                "INSERT INTO protocols_history (id, run_id, user_intent, final_draft, iteration_count, "
+                "final_state_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+        done = min(rows, first + INSERT_BATCH)
+        print(f"\r  inserted {done:,}/{rows:,} ({done / (time.perf_counter() - started):,.0f} rows/s)", end="", flush=True)
+    print()
+    conn.execute("INSERT INTO protocols_history_fts (protocols_history_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    return run_ids
+
+
+def term_bands(db_path: str) -> dict:
+    """Indexed terms grouped by how many protocols contain them (from the FTS vocabulary)."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts_vocab USING fts5vocab(main, protocols_history_fts, row)")
+    total = conn.execute("SELECT COUNT(*) FROM protocols_history").fetchone()[0]
+    terms = conn.execute("SELECT term, doc FROM temp.fts_vocab WHERE term GLOB '[a-z]*'").fetchall()
+    conn.close()
+    by_share = lambda low, high: [t for t, doc in terms if low * total <= doc < high * total]
+    by_frequency = sorted(terms, key=lambda item: item[1])
+    return {
+        "total": total,
+        "rare": [t for t, _ in by_frequency[: max(1, len(by_frequency) // 100)]],
+        "medium": by_share(0.001, 0.01),
+        "common": by_share(0.1, 1.01),
+    }
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_queries(db_path: str, run_ids: list, queries: int, page_size: int, seed: int) -> list:
+    rng = random.Random(seed + 1)
+    bands = term_bands(db_path)
+    search = HistorySearch(db_path)
+
+    def cursor_for_page(page: int, query: str = ""):
+        cursor = None
+        for _ in range(page - 1):
+            cursor = search.search(query, limit=page_size, cursor=cursor)["next_cursor"]
+        return cursor
+
+    # Keyset cursors pointing at page 5, prepared up front so only that page is timed
+    deep_ranked = [(term, cursor_for_page(5, term)) for term in rng.sample(bands["common"], min(20, len(bands["common"])))]
+    deep_latest = cursor_for_page(5)
+
+    def deep_page():
+        term, cursor = rng.choice(deep_ranked)
+        return search.search(term, limit=page_size, cursor=cursor)
+    shapes = {
+        "rare term": lambda: search.search(rng.choice(bands["rare"]), limit=page_size),
+        "medium term": lambda: search.search(rng.choice(bands["medium"]), limit=page_size),
+        "common term": lambda: search.search(rng.choice(bands["common"]), limit=page_size),
+        "two terms": lambda: search.search(f"{rng.choice(bands['common'])} {rng.choice(bands['medium'])}", limit=page_size),
+        "prefix": lambda: search.search(rng.choice(bands["medium"])[:4] + "*", limit=page_size),
+        "common, recent": lambda: search.search(rng.choice(bands["common"]), order="recent", limit=page_size),
+        "common, page 5": deep_page,
+        "latest": lambda: search.search(limit=page_size),
+        "latest, page 5": lambda: search.search(limit=page_size, cursor=deep_latest),
+        "run id": lambda: search.search(run_id=rng.choice(run_ids), limit=page_size),
+    }
+
+    results = []
+    for name, query in shapes.items():
+        query()  # warm the page cache for this shape
+        samples = sorted(timed(query) for _ in range(queries))
+        results.append({
+            "shape": name,
+            "p50": statistics.median(samples),
+            "p95": samples[int(0.95 * (len(samples) - 1))],
+            "max": samples[-1],
+        })
+    search.close()
+    return results, bands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic protocols to archive")
+    parser.add_argument("--db", help="Existing benchmark DB to query (skips filling)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated DB and print its path")
+    parser.add_argument("--state-kb", type=float, default=0.5, help="Size of the final_state_json blob per row")
+    parser.add_argument("--queries", type=int, default=50, help="Timed queries per shape")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.db:
+        db_path = args.db
+        conn = sqlite3.connect(db_path)
+        run_ids = [row[0] for row in conn.execute("SELECT run_id FROM protocols_history WHERE rowid % 1000 = 1")]
+        conn.close()
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="cerina-history-"), "cerina_foundry.db")
+        print(f"Filling {args.rows:,} protocols ...")
+        started = time.perf_counter()
+        run_ids = fill(db_path, args.rows, args.state_kb, args.seed)
+        print(f"  filled in {time.perf_counter() - started:.1f}s, {os.path.getsize(db_path) / 2**20:,.0f} MB")
+
+    results, bands = run_queries(db_path, run_ids, args.queries, args.page_size, args.seed)
+
+    print(f"\n{bands['total']:,} protocols, page size {args.page_size}, {args.queries} queries per shape")
+    print(f"{'query':>16} | {'p50 ms':>8} | {'p95 ms':>8} | {'max ms':>8}")
+    print("-" * 50)
+    for row in results:
+        print(f"{row['shape']:>16} | {row['p50']:>8.2f} | {row['p95']:>8.2f} | {row['max']:>8.2f}")
+
+    if args.keep or args.db:
+        print(f"\nDB: {db_path}")
+    elif not args.db:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
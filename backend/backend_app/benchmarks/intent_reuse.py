@@ -0,0 +1,118 @@
+"""
+First-draft reuse of approved protocols for repeated intents (core/intent_index.py).
+
+Runs a stream of M2M requests (the HIL bypass, so every passing protocol is archived
+and indexed) through the real graph with simulated LLMs: a handful of topics, each
+asked several times in different wordings - some differ only in case and punctuation, some
+are close paraphrases and some are different enough that they should not match. The
+stream runs once with reuse off and once with it on, from empty databases.
+
+Reported per mode: mean run latency, drafter and total LLM calls, tokens, and the
+index's exact / near hit counts. Exact matches reuse the archived draft as is (no drafter
+call, and its evaluations come from the evaluation cache); near matches only seed the
+drafter, which adapts the approved protocol to the new intent, and are never indexed.
+
+Run from backend/backend_app:
+    python -m benchmarks.intent_reuse --drafter-latency 2.0 --evaluator-latency 1.0
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import agents.workers as workers
+from core.graph import build_graph, close_checkpointers
+from core.archiver import protocol_archiver
+from core.intent_index import intent_index
+from benchmarks.harness import FakeChatModel, drafter_script, evaluator_script, install_simulated_llms, isolate_databases
+from services.batch_runner import run_protocol
+
+# First wording of each topic comes first; the rest follow in round-robin order
+TOPICS = [
+    ["Sleep hygiene protocol for night shift workers", "CBT sleep hygiene plan for night-shift workers",
+     "Create a sleep hygiene protocol for a night shift worker", "Sleep hygiene for nurses working night shifts",
+     "Sleep hygiene protocol for night-shift workers."],
+    ["Graded exposure for fear of flying", "Exposure protocol for a fear of flying",
+     "Create a graded exposure plan for flying fear", "Flying anxiety: graded exposure hierarchy",
+     "graded exposure for fear of flying"],
+    ["Thought record exercise for social anxiety", "Social anxiety thought records",
+     "Create a thought record protocol for social anxiety", "Thought diary for social anxiety at work",
+     "Thought record exercise for social anxiety!"],
+    ["Behavioural activation for low mood", "Behavioral activation plan for low mood",
+     "Low mood behavioural activation schedule", "Activity scheduling for depression"],
+    ["Worry time protocol for generalized anxiety", "Scheduled worry time for generalised anxiety",
+     "Worry postponement for GAD", "Create a worry time exercise for generalized anxiety"],
+]
+
+
+def request_stream() -> list:
+    return [topic[i] for i in range(max(map(len, TOPICS))) for topic in TOPICS if i < len(topic)]
+
+
+async def run_mode(reuse: bool, drafter_latency: float, evaluator_latency: float) -> dict:
+    isolate_databases(tempfile.mkdtemp(prefix="cerina-reuse-"))
+    drafter = FakeChatModel(drafter_script(), drafter_latency)
+    safety = FakeChatModel(evaluator_script("safety_score", [10]), evaluator_latency)
+    critic = FakeChatModel(evaluator_script("overall_score", [10]), evaluator_latency)
+    install_simulated_llms(drafter=drafter, safety=safety, critic=critic)
+    workers.INTENT_REUSE_ENABLED = reuse
+    intent_index.exact_hits = intent_index.near_hits = intent_index.misses = 0
+
+    app = await build_graph()
+    latencies, tokens, reused, seeded = [], 0, [], []
+    try:
+        for number, intent in enumerate(request_stream(), start=1):
+            started = time.perf_counter()
+            result = await run_protocol(app, intent, thread_id=f"reuse-{int(reuse)}-{number}")
+            latencies.append(time.perf_counter() - started)
+            usage = result["llm_usage"]["total"]
+            tokens += usage["prompt_tokens"] + usage["completion_tokens"]
+            if result["status"] != "COMPLETED":
+                print(f"  ! {intent!r} ended {result['status']}")
+            snapshot = await app.aget_state({"configurable": {"thread_id": f"reuse-{int(reuse)}-{number}"}})
+            if snapshot.values.get("reused_protocol_id"):
+                reused.append(intent)
+            elif snapshot.values.get("seeded_from_protocol_id"):
+                seeded.append(intent)
+    finally:
+        await protocol_archiver.stop()
+        await close_checkpointers()
+
+    return {
+        "mode": "reuse on" if reuse else "reuse off",
+        "runs": len(latencies),
+        "mean_s": sum(latencies) / len(latencies),
+        "drafter_calls": drafter.calls,
+        "llm_calls": drafter.calls + safety.calls + critic.calls,
+        "tokens": tokens,
+        "stats": intent_index.stats(),
+        "reused": reused,
+        "seeded": seeded,
+    }
+
+
+async def main(drafter_latency: float, evaluator_latency: float):
+    results = [await run_mode(reuse, drafter_latency, evaluator_latency) for reuse in (False, True)]
+    workers.INTENT_REUSE_ENABLED = True
+
+    print(f"\n{results[0]['runs']} M2M requests over {len(TOPICS)} topics "
+          f"(drafter {drafter_latency}s, evaluators {evaluator_latency}s per call)")
+    print(f"{'mode':>10} | {'mean run':>8} | {'drafter calls':>13} | {'LLM calls':>9} | {'tokens':>7} | exact/near hits")
+    print("-" * 74)
+    for r in results:
+        print(f"{r['mode']:>10} | {r['mean_s']:>7.2f}s | {r['drafter_calls']:>13} | {r['llm_calls']:>9} | "
+              f"{r['tokens']:>7} | {r['stats']['exact_hits']}/{r['stats']['near_hits']}")
+    print("\nReused as is (reuse on):")
+    for intent in results[1]["reused"]:
+        print(f"  - {intent}")
+    print("\nAdapted from a similar intent's protocol (reuse on):")
+    for intent in results[1]["seeded"]:
+        print(f"  - {intent}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drafter-latency", type=float, default=0.5, help="Seconds per simulated drafter call")
+    parser.add_argument("--evaluator-latency", type=float, default=0.25, help="Seconds per simulated evaluator call")
+    args = parser.parse_args()
+    asyncio.run(main(args.drafter_latency, args.evaluator_latency))
@@ -0,0 +1,75 @@
+"""
+Output-token cost of a revision: full rewrite vs. <L#> line patches.
+
+For a generated protocol and revisions that fix an increasing number of lines,
+compares the drafter output needed to express the same revision as a full
+Markdown rewrite and as a patch JSON, and checks the spliced result is identical.
+Tokens are approximated as characters / 4 (the same estimate agents/llm.py uses).
+
+Run from backend/backend_app:
+    python -m benchmarks.patch_revisions --lines 150
+"""
+import argparse
+import json
+
+from agents.patching import apply_line_patches, parse_patches
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def make_draft(lines: int) -> str:
+    body = [
+        f"- Step {i}: notice the thought, write it down, and rate how strongly you believe it (0-100)."
+        for i in range(1, lines - 2)
+    ]
+    return "\n".join(["# Sleep Hygiene Protocol", "", "## Coping Strategies", *body])
+
+
+def revise(draft: str, fixed_lines: int) -> tuple:
+    """Rewrites `fixed_lines` lines (in pairs, spread through the draft). Returns (revised, patch_json)."""
+    lines = draft.split("\n")
+    patches = []
+    stride = max(2, len(lines) // max(1, fixed_lines // 2 + 1))
+    start = 4
+    remaining = fixed_lines
+    while remaining > 0 and start <= len(lines):
+        end = min(start + min(2, remaining) - 1, len(lines))
+        text = "\n".join(
+            f"- Step {n}: gently notice the thought and, if it feels right, note how strongly you hold it."
+            for n in range(start, end + 1)
+        )
+        patches.append({"start": start, "end": end, "text": text})
+        remaining -= end - start + 1
+        start += stride
+
+    patch_json = json.dumps({"patches": patches})
+    revised_lines = list(lines)
+    for patch in reversed(patches):
+        revised_lines[patch["start"] - 1:patch["end"]] = patch["text"].split("\n")
+    return "\n".join(revised_lines), patch_json
+
+
+def main(lines: int, fixes: list):
+    draft = make_draft(lines)
+    print(f"\nDraft: {lines} lines, ~{approx_tokens(draft)} tokens")
+    print(f"{'lines fixed':>11} | {'full rewrite':>12} | {'patch':>6} | {'saved':>6} | spliced ok")
+    print("-" * 56)
+    for fixed in fixes:
+        revised, patch_json = revise(draft, fixed)
+        spliced = apply_line_patches(draft, parse_patches(patch_json))
+        full_tokens = approx_tokens(revised)
+        patch_tokens = approx_tokens(patch_json)
+        print(
+            f"{fixed:>11} | {full_tokens:>12} | {patch_tokens:>6} | "
+            f"{100 * (1 - patch_tokens / full_tokens):>5.1f}% | {spliced == revised}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=150)
+    parser.add_argument("--fixes", type=int, nargs="+", default=[1, 2, 5, 10, 20, 40])
+    args = parser.parse_args()
+    main(args.lines, args.fixes)
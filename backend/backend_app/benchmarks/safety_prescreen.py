@@ -0,0 +1,70 @@
+"""
+Microbenchmark for the local safety pre-screen (core/safety_screen.py).
+
+Times SafetyPrescreen.scan over <L#>-tagged drafts of typical sizes, clean and with a
+violation, against the naive alternative of one regex search per lexicon phrase.
+
+Run from backend/backend_app:
+    python -m benchmarks.safety_prescreen --lines 50 150 400
+"""
+import argparse
+import re
+import timeit
+
+from agents.utilities import preprocessor_node
+from core.safety_screen import DEFAULT_HINT_LEXICON, DEFAULT_LEXICON, SafetyPrescreen
+
+
+def make_draft(lines: int, violation: bool) -> str:
+    body = [
+        f"- Step {i}: notice the thought, write it down, and rate how strongly you believe it (0-100)."
+        for i in range(1, lines - 2)
+    ]
+    if violation:
+        body[len(body) // 2] = "- When the worry keeps you awake, double your dose before bed."
+    draft = "\n".join(["# Sleep Hygiene Protocol", "", "## Coping Strategies", *body])
+    return preprocessor_node({"current_draft": draft})["augmented_draft"]
+
+
+def per_phrase_regex(phrases):
+    compiled = [re.compile(r"\b" + re.escape(p) + r"\b") for p in phrases]
+
+    def scan(augmented_draft: str):
+        hits = []
+        for number, line in enumerate(augmented_draft.lower().split("\n"), start=1):
+            hits.extend((number, rx.pattern) for rx in compiled if rx.search(line))
+        return hits
+
+    return scan
+
+
+def best_of(func, arg, number: int) -> float:
+    """Best per-call time in microseconds over 5 repeats."""
+    return min(timeit.repeat(lambda: func(arg), number=number, repeat=5)) / number * 1e6
+
+
+def main(line_counts: list, number: int):
+    screen = SafetyPrescreen()
+    phrases = [p for lexicon in (DEFAULT_LEXICON, DEFAULT_HINT_LEXICON) for tier in lexicon.values() for p in tier]
+    naive = per_phrase_regex(phrases)
+
+    print(f"\nLexicon: {len(phrases)} phrases")
+    print(f"{'lines':>6} | {'draft':>9} | {'automaton':>10} | {'regex/phrase':>12} | hits")
+    print("-" * 60)
+    for lines in line_counts:
+        for violation in (False, True):
+            draft = make_draft(lines, violation)
+            hits = screen.scan(draft)
+            label = "violation" if violation else "clean"
+            print(
+                f"{lines:>6} | {label:>9} | {best_of(screen.scan, draft, number):>8.0f}us | "
+                f"{best_of(naive, draft, number):>10.0f}us | {len(hits)}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[50, 150, 400])
+    parser.add_argument("--number", type=int, default=20, help="Calls per timing repeat")
+    args = parser.parse_args()
+    main(args.lines, args.number)
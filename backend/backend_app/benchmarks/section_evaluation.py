@@ -0,0 +1,90 @@
+"""
+Evaluator latency for long drafts: whole-draft review vs. section-parallel review.
+
+Runs safety_guardian_agent and clinical_critic_agent (concurrently, as the graph does)
+over a generated protocol with a simulated model whose latency grows with prompt size,
+first as one call per evaluator, then split by heading, then again after editing a
+single section in place and after inserting a line into one (either way only that
+section should miss the per-section cache, although the insert renumbers every later
+line of the draft).
+
+Run from backend/backend_app:
+    python -m benchmarks.section_evaluation --sections 6 --lines-per-section 30
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import agents.workers as workers
+from agents.utilities import preprocessor_node
+from benchmarks.harness import SimulatedLLM, install_simulated_llms, isolate_databases
+from core.eval_cache import evaluation_cache
+
+
+def make_draft(sections: int, lines_per_section: int, edited_section: int = -1, inserted_section: int = -1) -> str:
+    lines = ["# Sleep Hygiene Protocol", ""]
+    for s in range(sections):
+        lines.append(f"## Section {s + 1}")
+        if s == inserted_section:
+            lines.append("- Before you start: find a quiet place.")
+        for i in range(lines_per_section - 1):
+            wording = "gently" if s == edited_section else "calmly"
+            lines.append(f"- Step {i + 1}: {wording} notice the thought and write down what you observe.")
+    return "\n".join(lines)
+
+
+async def review(draft: str) -> float:
+    state = {"current_draft": draft, **preprocessor_node({"current_draft": draft})}
+    started = time.perf_counter()
+    await asyncio.gather(workers.safety_guardian_agent(state), workers.clinical_critic_agent(state))
+    return time.perf_counter() - started
+
+
+async def main(sections: int, lines_per_section: int, latency: float, seconds_per_kchar: float):
+    with tempfile.TemporaryDirectory() as workdir:
+        isolate_databases(workdir)
+        safety = SimulatedLLM(latency, json.dumps({"safety_score": 10, "feedback": []}), seconds_per_kchar)
+        critic = SimulatedLLM(latency, json.dumps({"overall_score": 10, "feedback": []}), seconds_per_kchar)
+        install_simulated_llms(drafter=SimulatedLLM(0, ""), safety=safety, critic=critic)
+
+        draft = make_draft(sections, lines_per_section)
+        edited = make_draft(sections, lines_per_section, edited_section=sections // 2)
+        inserted = make_draft(sections, lines_per_section, edited_section=sections // 2, inserted_section=0)
+
+        workers.SECTION_EVALUATION_ENABLED = False
+        whole = await review(draft)
+        whole_calls = safety.calls + critic.calls
+
+        workers.SECTION_EVALUATION_ENABLED = True
+        safety.calls = critic.calls = 0
+        split = await review(draft)
+        split_calls = safety.calls + critic.calls
+
+        safety.calls = critic.calls = 0
+        revised = await review(edited)
+        revised_calls = safety.calls + critic.calls
+
+        safety.calls = critic.calls = 0
+        shifted = await review(inserted)
+        shifted_calls = safety.calls + critic.calls
+
+        print(f"\nDraft: {sections} sections x {lines_per_section} lines, {len(draft)} chars")
+        print(f"{'mode':>30} | {'wall time':>9} | LLM calls")
+        print("-" * 56)
+        print(f"{'whole draft':>30} | {whole:>8.2f}s | {whole_calls}")
+        print(f"{'section-parallel':>30} | {split:>8.2f}s | {split_calls}")
+        print(f"{'section-parallel, 1 edited':>30} | {revised:>8.2f}s | {revised_calls}")
+        print(f"{'section-parallel, 1 line added':>30} | {shifted:>8.2f}s | {shifted_calls}")
+        print(f"Speed-up: {whole / split:.1f}x; cache: {evaluation_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--lines-per-section", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixed seconds per simulated call")
+    parser.add_argument("--seconds-per-kchar", type=float, default=0.1, help="Extra seconds per 1000 prompt chars")
+    args = parser.parse_args()
+    asyncio.run(main(args.sections, args.lines_per_section, args.latency, args.seconds_per_kchar))
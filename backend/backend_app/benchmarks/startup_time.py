@@ -0,0 +1,96 @@
+"""
+Cold-start report for the API and MCP server.
+
+Imports each entry module in a fresh interpreter (median of --runs), breaks the
+import down with `python -X importtime`, and times the prewarm step (DB tables,
+compiled graph, LLM clients, archiver) against a scratch directory. With
+--budget-ms the command fails when an entry module imports slower than the
+budget, so boot-time regressions can be caught in CI.
+
+Run from backend/backend_app:
+    python -m benchmarks.startup_time --top 15 --budget-ms 3000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+FIRST_PARTY = ("main", "agents", "core", "services", "shared")
+ENTRY_MODULES = ("main", "services.mcp_server")
+
+
+def _python(args: list) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+def import_seconds(module: str, runs: int) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return statistics.median(float(_python(["-c", code]).stdout.strip().splitlines()[-1]) for _ in range(runs))
+
+
+def importtime_report(module: str) -> list:
+    """Rows of (self_us, cumulative_us, module) from `python -X importtime`."""
+    rows = []
+    for line in _python(["-X", "importtime", "-c", f"import {module}"]).stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+async def prewarm_seconds() -> float:
+    from benchmarks.harness import isolate_databases
+    from core.bootstrap import prewarm
+    from core.archiver import protocol_archiver
+    from core.graph import close_checkpointers
+
+    with tempfile.TemporaryDirectory() as workdir:
+        isolate_databases(workdir)
+        started = time.perf_counter()
+        await prewarm()
+        elapsed = time.perf_counter() - started
+        await protocol_archiver.stop()
+        await close_checkpointers()
+    return elapsed
+
+
+def main(runs: int, top: int, budget_ms: float) -> int:
+    over_budget = []
+    for module in ENTRY_MODULES:
+        seconds = import_seconds(module, runs)
+        rows = importtime_report(module)
+        ours = sorted((r for r in rows if r[2].split(".")[0] in FIRST_PARTY), key=lambda r: -r[1])
+        theirs = sorted((r for r in rows if "." not in r[2] and r[2] not in FIRST_PARTY), key=lambda r: -r[1])
+
+        print(f"\nimport {module}: {seconds * 1000:.0f} ms (median of {runs})")
+        print(f"  {'cumulative':>10} | {'self':>7} | first-party module")
+        for self_us, cumulative_us, name in ours[:top]:
+            print(f"  {cumulative_us / 1000:>8.1f}ms | {self_us / 1000:>5.1f}ms | {name}")
+        print(f"  {'cumulative':>10} | top-level third-party package")
+        for _, cumulative_us, name in theirs[:top]:
+            print(f"  {cumulative_us / 1000:>8.1f}ms | {name}")
+
+        if budget_ms and seconds * 1000 > budget_ms:
+            over_budget.append(module)
+
+    print(f"\nprewarm (tables, graph, clients, archiver): {asyncio.run(prewarm_seconds()) * 1000:.0f} ms")
+
+    if over_budget:
+        print(f"FAIL: {', '.join(over_budget)} imported slower than the {budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per entry module")
+    parser.add_argument("--top", type=int, default=10, help="Modules listed per section")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Fail if an entry module imports slower")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.budget_ms))
@@ -0,0 +1,94 @@
+"""
+Cost of a bad evaluator response: buffered parse vs. streamed incremental validation
+(agents/json_stream.py).
+
+For each response shape below, a simulated safety model answers with it (--latency
+seconds of generation, spread over the streamed chunks). "buffered" waits for the whole
+response and validates it afterwards, as the evaluators did before; "streamed" feeds the
+chunks to IncrementalJSONValidator through agents.llm.stream_llm, which stops reading as
+soon as the answer is complete or can no longer become a valid SafetyAssessment.
+
+  schema echo        the format instructions' JSON schema echoed back
+  prose first        a long chain of reasoning before the JSON (accepted, as before)
+  object feedback    feedback items as objects instead of strings
+  wrong type         "safety_score": "6/10"
+  runaway            a valid start that never ends (over the output ceiling)
+  valid + epilogue   a valid object followed by an explanation nobody reads
+
+Run from backend/backend_app:
+    python -m benchmarks.streaming_validation --latency 3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from agents.llm import stream_llm
+from agents.json_stream import IncrementalJSONValidator, SchemaViolation
+from benchmarks.harness import SimulatedLLM, install_simulated_llms
+from shared.states import SafetyAssessment
+
+NOTE = "Line 12 [MEDICAL_ADVICE]: the draft suggests adjusting medication; replace with a referral to a clinician."
+VALID = json.dumps({"safety_score": 6, "feedback": [NOTE, NOTE]})
+
+RESPONSES = {
+    "schema echo": json.dumps({
+        "properties": {
+            "feedback": {"anyOf": [{"items": {"type": "string"}, "type": "array"}, {"type": "null"}], "default": None},
+            "safety_score": {"description": "0 - 10 score for Safety", "type": "number"},
+        },
+        "required": ["safety_score"],
+        "notes": [NOTE] * 12,
+    }),
+    "prose first": "Let me review the draft line by line before scoring it. " * 30 + VALID,
+    "object feedback": json.dumps({"safety_score": 6, "feedback": [
+        {"line_number": 12, "safety_flag": "MEDICAL_ADVICE", "description": NOTE}
+    ] * 12}),
+    "wrong type": json.dumps({"safety_score": "6/10", "feedback": [NOTE] * 12}),
+    "runaway": '{"safety_score": 6, "feedback": [' + ", ".join(json.dumps(f"{NOTE} ({i})") for i in range(80)),
+    "valid + epilogue": VALID + "\n\nExplanation: " + NOTE * 15,
+}
+
+MESSAGES = [("system", "You are a safety reviewer."), ("human", "Draft to Check:\n<L1>Breathe slowly.</L1>")]
+
+
+async def buffered(model: SimulatedLLM) -> str:
+    response = await model.ainvoke(MESSAGES)
+    validator = IncrementalJSONValidator(SafetyAssessment, max_chars=len(response.content) + 1)
+    try:
+        validator.feed(response.content)
+        validator.finish()
+        return "valid"
+    except SchemaViolation:
+        return "rejected"
+
+
+async def streamed() -> str:
+    try:
+        await stream_llm("safety", MESSAGES, lambda: IncrementalJSONValidator(SafetyAssessment))
+        return "valid"
+    except SchemaViolation:
+        return "rejected"
+
+
+async def main(latency: float):
+    print(f"\nSimulated safety model, {latency}s of generation per full response")
+    print(f"{'response':>17} | {'chars':>5} | {'mode':>8} | {'outcome':>8} | {'wall':>6} | {'chars read':>10} | share")
+    print("-" * 82)
+    for name, content in RESPONSES.items():
+        for mode in ("buffered", "streamed"):
+            model = SimulatedLLM(latency, content)
+            install_simulated_llms(drafter=model, safety=model, critic=model)
+            started = time.perf_counter()
+            outcome = await (buffered(model) if mode == "buffered" else streamed())
+            wall = time.perf_counter() - started
+            share = model.output_chars / len(content)
+            print(f"{name:>17} | {len(content):>5} | {mode:>8} | {outcome:>8} | {wall:>5.2f}s | "
+                  f"{model.output_chars:>10} | {share:>5.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds to generate a full response")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency))
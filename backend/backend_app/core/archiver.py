@@ -0,0 +1,195 @@
+import asyncio
+import sqlite3
+import logging
+from typing import List, Optional, Tuple
+
+from core.sqlite_db import (
+    DB_PATH, INSERT_PROTOCOL_SQL, INSERT_USAGE_SQL, INSERT_INTENT_SQL,
+    build_protocol_record, build_usage_records, build_intent_record,
+)
+
+logger = logging.getLogger(__name__)
+
+# Finalized states waiting to be written; a full queue back-pressures finalizer_node
+DEFAULT_QUEUE_SIZE = 1024
+# Maximum rows folded into a single transaction (group commit)
+DEFAULT_BATCH_SIZE = 64
+
+_STOP = object()
+
+
+class ProtocolArchiver:
+    """
+    Write-behind archiver for finalized protocols.
+
+    finalizer_node hands states over through a bounded asyncio queue and returns
+    immediately. A single writer task drains the queue, serializes the states and
+    inserts every queued row in one transaction on a long-lived WAL connection,
+    so bursts of finalizations cost one commit instead of one connection + commit each.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.db_path = db_path
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        # Serializes start/stop: concurrent first archive() calls must share one writer
+        self._lifecycle_lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.rows_written = 0
+        self.commits = 0
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        # check_same_thread=False: every write runs in asyncio.to_thread, but only
+        # ever one at a time (single writer task).
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _lock(self) -> asyncio.Lock:
+        # Locks are bound to the loop that waits on them (a new asyncio.run starts over)
+        loop = asyncio.get_running_loop()
+        if self._lifecycle_lock is None or self._lock_loop is not loop:
+            self._lifecycle_lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lifecycle_lock
+
+    async def start(self):
+        async with self._lock():
+            if self.running:
+                return
+            self._conn = await asyncio.to_thread(self._open_connection)
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._writer = asyncio.create_task(self._run(), name="protocol-archiver")
+            logger.info(f"[ARCHIVER] Started (WAL, batch={self.batch_size}, queue={self.queue_size})")
+
+    async def stop(self):
+        """Flushes everything queued before the call, then closes the connection."""
+        async with self._lock():
+            if not self.running:
+                return
+            queue = self._queue
+            await queue.put(_STOP)
+            await self._writer
+            # Anything queued behind the stop marker will never be written
+            _fail_pending(queue)
+            await asyncio.to_thread(self._conn.close)
+            self._writer = None
+            self._conn = None
+            logger.info(f"[ARCHIVER] Stopped after {self.rows_written} rows in {self.commits} commits.")
+
+    async def archive(self, run_id: str, final_state: dict, durable: bool = False):
+        """
+        Queues a finalized state for archiving.
+        With durable=True, waits until the row's transaction has committed.
+        """
+        if not self.running:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        queue, writer = self._queue, self._writer
+        await queue.put((run_id, final_state, future))
+        if writer.done():
+            # The archiver stopped while this item waited for room in the queue
+            _fail_pending(queue)
+
+        if durable:
+            await future
+        else:
+            future.add_done_callback(_log_failure)
+
+    async def flush(self):
+        """Waits until everything queued so far is committed."""
+        if not self.running:
+            return
+        future = asyncio.get_running_loop().create_future()
+        queue, writer = self._queue, self._writer
+        await queue.put((None, None, future))
+        if writer.done():
+            _fail_pending(queue)
+        await future
+
+    # --- Writer task ---
+    def _write_batch(self, batch: List[Tuple[str, dict, asyncio.Future]]) -> int:
+        records, usage, intents = [], [], []
+        for run_id, final_state, _ in batch:
+            if run_id is None:
+                continue
+            record = build_protocol_record(run_id, final_state)
+            records.append(record)
+            usage.extend(build_usage_records(record[0], run_id, final_state))
+            intent_record = build_intent_record(record[0], final_state)
+            if intent_record:
+                intents.append(intent_record)
+        if records:
+            with self._conn:  # one transaction for the whole batch
+                self._conn.executemany(INSERT_PROTOCOL_SQL, records)
+                self._conn.executemany(INSERT_USAGE_SQL, usage)
+                self._conn.executemany(INSERT_INTENT_SQL, intents)
+        return len(records)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self._queue.get()
+            while True:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size or self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+
+            if not batch:
+                continue
+
+            try:
+                written = await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.exception(f"[ARCHIVER] Group commit of {len(batch)} rows failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if written:
+                self.rows_written += written
+                self.commits += 1
+                logger.info(f"[ARCHIVER] Committed {written} protocol(s) in one transaction.")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+
+def _fail_pending(queue: asyncio.Queue):
+    """Fails the futures of items left in a queue whose writer has exited."""
+    while not queue.empty():
+        item = queue.get_nowait()
+        if item is _STOP:
+            continue
+        future = item[2]
+        if not future.done():
+            future.set_exception(RuntimeError("protocol archiver stopped before the row was written"))
+
+
+def _log_failure(future: asyncio.Future):
+    # Retrieve the exception so fire-and-forget archives don't warn at GC time
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"[ARCHIVER] Protocol could not be archived: {future.exception()}")
+
+
+# Process-wide archiver, started and flushed by the app lifespans
+protocol_archiver = ProtocolArchiver()
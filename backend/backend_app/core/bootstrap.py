@@ -0,0 +1,53 @@
+import sys
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Process startup helpers ---
+# Entry points (main.py, services/mcp_server.py, services/batch_runner.py) call these once,
+# instead of library modules doing it as an import side effect.
+
+_environment_loaded = False
+
+
+def load_environment():
+    """Loads .env into os.environ. Call before importing modules that read config constants."""
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _environment_loaded = True
+
+
+def configure_stdio():
+    """Force UTF-8 stdout/stderr (agent logs contain emoji) without replacing the streams."""
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
+
+
+async def prewarm():
+    """
+    Pays the cold-start cost before the first request: application tables, the compiled
+    graph on the shared checkpointer connection, the LLM clients and rate limiter, and
+    the write-behind archiver. Returns the compiled graph.
+    """
+    from core.sqlite_db import init_db
+    from core.graph import build_graph
+    from core.archiver import protocol_archiver
+    from agents.llm import prewarm_clients
+
+    try:
+        # Run the synchronous init_db function in a separate thread
+        await asyncio.to_thread(init_db)
+        logger.info("Sqlite Database initialization complete.")
+    except Exception as e:
+        logger.info(f"[PREWARM] CRITICAL ERROR during DB initialization: {e}")
+
+    graph = await build_graph()
+    prewarm_clients()
+    await protocol_archiver.start()
+    logger.info("[PREWARM] Graph, LLM clients and archiver ready.")
+    return graph
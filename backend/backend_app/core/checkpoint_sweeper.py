@@ -0,0 +1,178 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from core.state_cache import hot_state_cache
+from core.metrics import awaiting_review_threads
+
+logger = logging.getLogger(__name__)
+
+# --- Retention policy (overridable from the environment) ---
+# Checkpoints kept per thread once the workflow is finalized
+KEEP_LAST_FINALIZED = int(os.getenv("CHECKPOINT_KEEP_LAST", "2"))
+# Threads parked at human_in_the_loop longer than this are deleted
+AWAITING_REVIEW_TTL_HOURS = float(os.getenv("CHECKPOINT_REVIEW_TTL_HOURS", "168"))
+# Seconds between sweeps
+SWEEP_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "3600"))
+
+FINALIZED_STATUSES = {"COMPLETED", "FINALIZATION_ERROR"}
+AWAITING_STATUS = "AWAITING_HUMAN_REVIEW"
+
+
+class CheckpointSweeper:
+    """
+    Background retention for one checkpoint file (one shard of the checkpointer).
+
+    Each sweep compacts finalized threads down to their latest checkpoints, deletes
+    threads abandoned at human review past the TTL (evicting them from the hot /status
+    cache and the awaiting-review gauge) and returns the freed pages to the filesystem
+    with an incremental VACUUM. It shares the shard's connection and lock, so it never
+    contends with graph writes for the file lock.
+    """
+
+    def __init__(
+        self,
+        checkpointer: AsyncSqliteSaver,
+        keep_last: int = KEEP_LAST_FINALIZED,
+        review_ttl: timedelta = timedelta(hours=AWAITING_REVIEW_TTL_HOURS),
+        interval_seconds: float = SWEEP_INTERVAL_SECONDS,
+    ):
+        self.checkpointer = checkpointer
+        self.keep_last = max(1, keep_last)
+        self.review_ttl = review_ttl
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.last_report: Optional[dict] = None
+
+    # --- Lifecycle ---
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="checkpoint-sweeper")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        await self._enable_incremental_vacuum()
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"[SWEEPER] Sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    # --- SQLite helpers ---
+    async def _scalar(self, sql: str, params: tuple = ()):
+        async with self.checkpointer.conn.execute(sql, params) as cur:
+            row = await cur.fetchone()
+        return row[0] if row else None
+
+    async def _db_bytes(self) -> int:
+        page_count = await self._scalar("PRAGMA page_count")
+        page_size = await self._scalar("PRAGMA page_size")
+        return page_count * page_size
+
+    async def _enable_incremental_vacuum(self):
+        """auto_vacuum only takes effect after a full VACUUM on an existing file (done once)."""
+        await self.checkpointer.setup()
+        async with self.checkpointer.lock:
+            if await self._scalar("PRAGMA auto_vacuum") != 2:  # 2 == INCREMENTAL
+                logger.info("[SWEEPER] Converting checkpoints.sqlite to auto_vacuum=INCREMENTAL (one-time VACUUM).")
+                await self.checkpointer.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                await self.checkpointer.conn.execute("VACUUM")
+
+    # --- Sweep ---
+    async def sweep(self) -> dict:
+        conn = self.checkpointer.conn
+        await self.checkpointer.setup()
+        bytes_before = await self._db_bytes()
+        cutoff = datetime.now(timezone.utc) - self.review_ttl
+
+        compacted_threads = 0
+        expired_threads = 0
+        checkpoint_rows = 0
+        write_rows = 0
+
+        async with conn.execute(
+            "SELECT thread_id, COUNT(*) FROM checkpoints WHERE checkpoint_ns = '' GROUP BY thread_id"
+        ) as cur:
+            threads = await cur.fetchall()
+
+        for thread_id, count in threads:
+            config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            latest = await self.checkpointer.aget_tuple(config)
+            if latest is None:
+                continue
+            values = latest.checkpoint.get("channel_values", {})
+            status = values.get("status")
+
+            if status in FINALIZED_STATUSES and count > self.keep_last:
+                async with self.checkpointer.lock:
+                    async with conn.execute(
+                        """
+                        SELECT checkpoint_id FROM checkpoints
+                        WHERE thread_id = ? AND checkpoint_ns = ''
+                        ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?
+                        """,
+                        (thread_id, self.keep_last),
+                    ) as cur:
+                        stale_ids = [row[0] for row in await cur.fetchall()]
+                    for checkpoint_id in stale_ids:
+                        cur = await conn.execute(
+                            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_id = ?",
+                            (thread_id, checkpoint_id),
+                        )
+                        write_rows += cur.rowcount
+                        cur = await conn.execute(
+                            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id = ?",
+                            (thread_id, checkpoint_id),
+                        )
+                        checkpoint_rows += cur.rowcount
+                    await conn.commit()
+                compacted_threads += 1
+
+            elif status == AWAITING_STATUS and datetime.fromisoformat(latest.checkpoint["ts"]) < cutoff:
+                checkpoint_rows += await self._scalar(
+                    "SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                )
+                write_rows += await self._scalar(
+                    "SELECT COUNT(*) FROM writes WHERE thread_id = ?", (thread_id,)
+                )
+                await self.checkpointer.adelete_thread(thread_id)
+                # The sweepers run in the API process: /status and the awaiting-review
+                # gauge must stop counting the expired thread
+                hot_state_cache.evict(thread_id)
+                awaiting_review_threads.discard(thread_id)
+                expired_threads += 1
+
+        # Hand freed pages back to the filesystem
+        async with self.checkpointer.lock:
+            await conn.commit()
+            # executescript steps the pragma to completion; execute() frees one page per call
+            await conn.executescript("PRAGMA incremental_vacuum;")
+            await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        bytes_after = await self._db_bytes()
+        self.last_report = {
+            "threads_scanned": len(threads),
+            "threads_compacted": compacted_threads,
+            "threads_expired": expired_threads,
+            "checkpoint_rows_deleted": checkpoint_rows,
+            "write_rows_deleted": write_rows,
+            "bytes_reclaimed": max(0, bytes_before - bytes_after),
+            "db_bytes": bytes_after,
+        }
+        logger.info(f"[SWEEPER] {self.last_report}")
+        return self.last_report
@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import sqlite3
+import logging
+from collections import OrderedDict
+from typing import Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from core.sqlite_db import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Number of evaluations kept in process memory before LRU eviction
+DEFAULT_MAX_ENTRIES = 512
+
+
+class EvaluationCache:
+    """
+    Content-addressed cache for evaluator results (SafetyAssessment / ClinicalReview).
+
+    Entries are keyed by a hash of (evaluator, prompt version, model name, augmented draft),
+    held in an in-memory LRU and persisted to the `evaluation_cache` table so that
+    replays and restarts still hit.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(evaluator: str, prompt_version: str, model_name: str, augmented_draft: str) -> str:
+        digest = hashlib.sha256()
+        for part in (evaluator, prompt_version, model_name, augmented_draft or ""):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    # --- In-memory LRU ---
+    def _remember(self, key: str, payload: str):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # --- SQLite backing table (run in a worker thread) ---
+    def _db_get(self, key: str) -> Optional[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT result_json FROM evaluation_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def _db_put(self, key: str, evaluator: str, payload: str):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO evaluation_cache (cache_key, evaluator, result_json) VALUES (?, ?, ?)",
+                (key, evaluator, payload),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    async def get(self, key: str, model_cls: Type[ModelT]) -> Optional[ModelT]:
+        payload = self._memory.get(key)
+        if payload is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return model_cls.model_validate_json(payload)
+
+        try:
+            payload = await asyncio.to_thread(self._db_get, key)
+        except sqlite3.Error as e:
+            logger.warning(f"[EVAL CACHE] Lookup failed, treating as miss: {e}")
+            payload = None
+
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self._remember(key, payload)
+        return model_cls.model_validate_json(payload)
+
+    async def put(self, key: str, evaluator: str, result: BaseModel):
+        payload = result.model_dump_json()
+        self._remember(key, payload)
+        try:
+            await asyncio.to_thread(self._db_put, key, evaluator, payload)
+        except sqlite3.Error as e:
+            logger.warning(f"[EVAL CACHE] Could not persist entry: {e}")
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "entries_in_memory": len(self._memory),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+# Process-wide instance shared by the evaluator agents
+evaluation_cache = EvaluationCache()
@@ -0,0 +1,107 @@
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Optional, Tuple, TypeVar
+
+from core.metrics import EVALUATIONS_SKIPPED
+
+logger = logging.getLogger(__name__)
+
+# An evaluator that fails the draft cancels the other evaluator's in-flight review
+EARLY_TERMINATION_ENABLED = os.getenv("EARLY_TERMINATION_ENABLED", "true").lower() == "true"
+# Rounds remembered by this process; the oldest are dropped first (long since finished)
+MAX_TRACKED_ROUNDS = 1024
+
+T = TypeVar("T")
+# (thread id, iteration): both evaluators of one drafter pass share it
+RoundKey = Tuple[str, int]
+
+
+class SiblingFailed(Exception):
+    """Raised in an evaluator whose review was cancelled because the other one failed the draft."""
+
+    def __init__(self, failed_by: str, reason: str):
+        super().__init__(f"{failed_by} failed the draft ({reason})")
+        self.failed_by = failed_by
+        self.reason = reason
+
+
+@dataclass
+class _Round:
+    loop: asyncio.AbstractEventLoop
+    failed: asyncio.Event = field(default_factory=asyncio.Event)
+    failed_by: Optional[str] = None
+    reason: str = ""
+
+
+class EvaluationRounds:
+    """
+    Shares decisive failures between the two evaluators reviewing the same draft.
+
+    Both evaluators run in one LangGraph superstep, and the supervisor only runs once
+    both have returned. An evaluator that fails the draft calls `fail`; the other one's
+    review, running inside `unless_failed`, is then cancelled (with its LLM requests) and
+    raises SiblingFailed, so the superstep ends as soon as the failing result is in.
+    A key of None opts out: the review simply runs to completion.
+    """
+
+    def __init__(self, max_rounds: int = MAX_TRACKED_ROUNDS):
+        self.max_rounds = max_rounds
+        self._rounds: "OrderedDict[RoundKey, _Round]" = OrderedDict()
+
+    def _round(self, key: RoundKey) -> _Round:
+        loop = asyncio.get_running_loop()
+        entry = self._rounds.get(key)
+        # Events are bound to the loop that waits on them (a new asyncio.run starts over)
+        if entry is None or entry.loop is not loop:
+            entry = self._rounds[key] = _Round(loop)
+            while len(self._rounds) > self.max_rounds:
+                self._rounds.popitem(last=False)
+        return entry
+
+    def fail(self, key: Optional[RoundKey], evaluator: str, reason: str):
+        """Records that `evaluator` failed the draft of this round; the first failure wins."""
+        if key is None:
+            return
+        entry = self._round(key)
+        if entry.failed_by is None:
+            entry.failed_by, entry.reason = evaluator, reason
+            entry.failed.set()
+
+    async def unless_failed(self, key: Optional[RoundKey], evaluator: str, work: Awaitable[T]) -> T:
+        """Awaits `work`, unless the other evaluator of the round fails the draft first."""
+        if key is None:
+            return await work
+        entry = self._round(key)
+        if entry.failed_by == evaluator:
+            # A re-run of the evaluator that failed this round
+            return await work
+        if entry.failed_by is not None:
+            work.close()
+            EVALUATIONS_SKIPPED.labels(evaluator).inc()
+            raise SiblingFailed(entry.failed_by, entry.reason)
+
+        task = asyncio.ensure_future(work)
+        waiter = asyncio.ensure_future(entry.failed.wait())
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+            finished = task.done()
+            if not finished:
+                task.cancel()
+
+        if finished:
+            # Finished first (or in the same tick): keep the result that was paid for
+            return task.result()
+        # Let the cancelled review unwind (rate limiter leases, hedges) before returning
+        await asyncio.wait({task})
+        EVALUATIONS_SKIPPED.labels(evaluator).inc()
+        logger.info(f"[EVALUATION] {evaluator} cancelled: {entry.failed_by} failed the draft ({entry.reason}).")
+        raise SiblingFailed(entry.failed_by, entry.reason)
+
+
+# Process-wide registry shared by the evaluator nodes
+evaluation_rounds = EvaluationRounds()
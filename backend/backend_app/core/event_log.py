@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Events kept per thread for replay (draft_delta tokens make up most of them)
+SSE_BUFFER_EVENTS = int(os.getenv("SSE_BUFFER_EVENTS", "4096"))
+# How long a finished run's events stay available to late subscribers
+SSE_LOG_RETENTION_SECONDS = float(os.getenv("SSE_LOG_RETENTION_SECONDS", "600"))
+# Threads with an event log in memory (finished logs are dropped first)
+SSE_MAX_THREADS = int(os.getenv("SSE_MAX_THREADS", "1024"))
+
+
+class RunInProgressError(RuntimeError):
+    """A graph run is already streaming into this thread's event log."""
+
+
+class ThreadEventLog:
+    """
+    Bounded log of one thread's SSE events. Every event gets a monotonic id, so a
+    subscriber that reconnects with Last-Event-ID receives exactly what it missed.
+    Any number of subscribers can follow the same run.
+    """
+
+    def __init__(self, thread_id: str, max_events: int = SSE_BUFFER_EVENTS):
+        self.thread_id = thread_id
+        self._events: "deque[Tuple[int, str]]" = deque(maxlen=max_events)
+        self.last_id = 0
+        self.running = False
+        self.finished_at: Optional[float] = None
+        self._wakeup: Optional[asyncio.Future] = None
+
+    def publish(self, payload: Dict[str, Any]) -> int:
+        self.last_id += 1
+        self._events.append((self.last_id, json.dumps(payload)))
+        self._notify()
+        return self.last_id
+
+    def start(self):
+        if self.running:
+            raise RunInProgressError(f"Thread {self.thread_id} already has a run in progress")
+        self.running = True
+        self.finished_at = None
+
+    def finish(self):
+        self.running = False
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    def _notify(self):
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+        self._wakeup = None
+
+    async def _wait(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.get_running_loop().create_future()
+        # Shielded: a disconnecting subscriber must not cancel the others' wakeup
+        await asyncio.shield(self._wakeup)
+
+    async def subscribe(self, last_event_id: int = 0) -> AsyncIterator[Tuple[Optional[int], str]]:
+        """
+        Yields (id, json) for every event after `last_event_id`, then follows the live run
+        until it finishes. If the ring buffer already dropped some of the requested events,
+        a `replay_gap` event (without id) says so before replay continues.
+        """
+        cursor = min(max(0, last_event_id), self.last_id)
+        while True:
+            first_id = self._events[0][0] if self._events else self.last_id + 1
+            if cursor < first_id - 1:
+                yield None, json.dumps({"type": "replay_gap", "data": {"missed_from": cursor + 1, "resume_from": first_id}})
+                cursor = first_id - 1
+
+            # Ids are contiguous, so the unseen events are a suffix of the buffer
+            for event_id, data in list(islice(self._events, cursor - first_id + 1, None)):
+                yield event_id, data
+                cursor = event_id
+
+            if cursor >= self.last_id:
+                if not self.running:
+                    return
+                await self._wait()
+
+
+class EventHub:
+    """Event logs per thread; job workers (core/job_queue.py) run graphs into them."""
+
+    def __init__(self, max_threads: int = SSE_MAX_THREADS, retention_seconds: float = SSE_LOG_RETENTION_SECONDS):
+        self.max_threads = max_threads
+        self.retention_seconds = retention_seconds
+        self._logs: "OrderedDict[str, ThreadEventLog]" = OrderedDict()
+        self._opened: Optional[asyncio.Future] = None
+
+    def _prune(self):
+        now = time.monotonic()
+        for thread_id, log in list(self._logs.items()):
+            if not log.running and log.finished_at is not None and now - log.finished_at > self.retention_seconds:
+                del self._logs[thread_id]
+        # Over capacity: drop the oldest finished logs; running ones are never dropped
+        for thread_id, log in list(self._logs.items()):
+            if len(self._logs) <= self.max_threads:
+                break
+            if not log.running:
+                del self._logs[thread_id]
+
+    def get(self, thread_id: str) -> Optional[ThreadEventLog]:
+        self._prune()
+        return self._logs.get(thread_id)
+
+    def open(self, thread_id: str) -> ThreadEventLog:
+        """
+        Marks a run as started on the thread's log (creating it if needed). Later runs on
+        the same thread (approve / revise) continue the same id sequence.
+        """
+        log = self._logs.get(thread_id) or ThreadEventLog(thread_id)
+        log.start()
+        self._logs[thread_id] = log
+        self._logs.move_to_end(thread_id)
+        self._prune()
+        if self._opened is not None and not self._opened.done():
+            self._opened.set_result(None)
+        self._opened = None
+        return log
+
+    async def wait_opened(self, timeout: float):
+        """Returns when any run is opened in this process, or after `timeout` seconds."""
+        if self._opened is None:
+            self._opened = asyncio.get_running_loop().create_future()
+        try:
+            # Shielded: a waiter timing out must not cancel the others' wakeup
+            await asyncio.wait_for(asyncio.shield(self._opened), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, log: ThreadEventLog, events: AsyncIterator[Dict[str, Any]]):
+        """
+        Appends `events` to an opened log in the caller's task (a job worker), then
+        finishes the log. A failure is published to subscribers and re-raised.
+        """
+        try:
+            async for payload in events:
+                log.publish(payload)
+        except asyncio.CancelledError:
+            logger.info(f"[EVENTS] Run for thread {log.thread_id} cancelled.")
+            raise
+        except Exception as e:
+            logger.exception(f"[EVENTS] Run for thread {log.thread_id} failed")
+            log.publish({"type": "error", "message": f"Workflow failed: {str(e)}"})
+            raise
+        finally:
+            log.finish()
+
+    def stats(self) -> dict:
+        return {
+            "threads": len(self._logs),
+            "running": sum(1 for log in self._logs.values() if log.running),
+            "max_threads": self.max_threads,
+        }
+
+
+def format_sse(event_id: Optional[int], data: str) -> str:
+    return f"id: {event_id}\ndata: {data}\n\n" if event_id is not None else f"data: {data}\n\n"
+
+
+# Process-wide instance shared by the streaming endpoints
+event_hub = EventHub()
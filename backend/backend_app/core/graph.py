@@ -1,10 +1,18 @@
 import os
+import time
+import asyncio
+import inspect
+import functools
 import logging
+from typing import Dict, Optional, Tuple
 from langgraph.graph import StateGraph, END
-import aiosqlite
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.errors import GraphBubbleUp
 
+from core.metrics import NODE_DURATION, NODE_ERRORS
+from core.sharded_checkpointer import CHECKPOINT_SHARDS, ShardedSqliteSaver, open_sharded_checkpointer
 from shared.states import BlackboardState
+from agents.llm import record_llm_usage
 from agents.supervisor import supervisor_logic
 from agents.workers import drafter_agent, safety_guardian_agent, clinical_critic_agent
 from agents.utilities import preprocessor_node, human_in_the_loop, finalizer_node
@@ -12,53 +20,112 @@ from agents.utilities import preprocessor_node, human_in_the_loop, finalizer_nod
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# -------------------------
+# Shared checkpointer
+# -------------------------
+# One sharded checkpointer (an aiosqlite connection and worker thread per shard file)
+# per checkpoint path, reused by every graph built in this process. The shards are
+# bound to the event loop they were opened on, so a new loop (e.g. a second
+# asyncio.run) gets fresh connections.
+_checkpointers: Dict[Tuple[str, int], ShardedSqliteSaver] = {}
+
+
+async def get_checkpointer(db_path: Optional[str] = None, shards: int = CHECKPOINT_SHARDS) -> ShardedSqliteSaver:
+    db_path = db_path or os.path.join(os.getcwd(), "checkpoints.sqlite")
+    key = (db_path, shards)
+    loop = asyncio.get_running_loop()
+    saver = _checkpointers.get(key)
+    if saver is not None and saver.loop is loop:
+        return saver
+
+    saver = await open_sharded_checkpointer(db_path, shards)
+    current = _checkpointers.get(key)
+    if current is not None and current.loop is loop:
+        # Another task opened it while we were connecting
+        await saver.aclose()
+        return current
+
+    _checkpointers[key] = saver
+    return saver
+
+
+async def close_checkpointers():
+    """Closes every shared checkpointer connection opened on the running loop."""
+    loop = asyncio.get_running_loop()
+    for key, saver in list(_checkpointers.items()):
+        if saver.loop is loop:
+            await saver.aclose()
+            del _checkpointers[key]
+
+
 # -------------------------
 # Async graph factory
 # -------------------------
-async def build_graph():
-    # --- 1. Checkpointer ---
-    db_path = os.path.join(os.getcwd(), "checkpoints.sqlite")
-    conn = await aiosqlite.connect(db_path)
-    checkpointer = AsyncSqliteSaver(conn)
+async def build_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    # --- 1. Checkpointer (shared connection unless one is passed in) ---
+    checkpointer = checkpointer or await get_checkpointer()
 
     # --- 2. Execution wrapper ---
-    def execute_and_log(node_name, agent_func, *args, **kwargs):
-        logger.info(f"[GRAPH] Entering node: {node_name}")
-        return agent_func(*args, **kwargs)
+    # Async agents must stay coroutine functions so LangGraph awaits them on the
+    # event loop instead of pushing them to a worker thread. functools.wraps keeps
+    # the original signature visible, so nodes that accept `config` still get it.
+    # Each execution is timed into the node's histogram; interrupts (the review
+    # pause) and cancellations are neither durations nor errors and are not recorded.
+    # LLM requests made by async nodes are appended to the run's llm_usage channel.
+    def execute_and_log(node_name, agent_func):
+        duration = NODE_DURATION.labels(node_name)
+        errors = NODE_ERRORS.labels(node_name)
+
+        if inspect.iscoroutinefunction(agent_func):
+            @functools.wraps(agent_func)
+            async def async_node(*args, **kwargs):
+                logger.info(f"[GRAPH] Entering node: {node_name}")
+                started = time.perf_counter()
+                try:
+                    with record_llm_usage(node_name) as usage:
+                        result = await agent_func(*args, **kwargs)
+                except GraphBubbleUp:
+                    raise
+                except Exception:
+                    errors.inc()
+                    raise
+                duration.observe(time.perf_counter() - started)
+                if usage and isinstance(result, dict):
+                    result = {**result, "llm_usage": usage}
+                return result
+            return async_node
+
+        @functools.wraps(agent_func)
+        def sync_node(*args, **kwargs):
+            logger.info(f"[GRAPH] Entering node: {node_name}")
+            started = time.perf_counter()
+            try:
+                result = agent_func(*args, **kwargs)
+            except GraphBubbleUp:
+                raise
+            except Exception:
+                errors.inc()
+                raise
+            duration.observe(time.perf_counter() - started)
+            return result
+        return sync_node
 
     # --- 3. Graph ---
     graph_builder = StateGraph(BlackboardState)
 
-    graph_builder.add_node(
-        "drafter_agent",
-        lambda *a, **k: execute_and_log("drafter_agent", drafter_agent, *a, **k)
-    )
-    graph_builder.add_node(
-        "preprocessor",
-        lambda *a, **k: execute_and_log("preprocessor", preprocessor_node, *a, **k)
-    )
+    graph_builder.add_node("drafter_agent", execute_and_log("drafter_agent", drafter_agent))
+    graph_builder.add_node("preprocessor", execute_and_log("preprocessor", preprocessor_node))
     graph_builder.add_node(
         "safety_guardian_agent",
-        lambda *a, **k: execute_and_log("safety_guardian_agent", safety_guardian_agent, *a, **k)
+        execute_and_log("safety_guardian_agent", safety_guardian_agent)
     )
     graph_builder.add_node(
         "clinical_critic_agent",
-        lambda *a, **k: execute_and_log("clinical_critic_agent", clinical_critic_agent, *a, **k)
-    )
-    graph_builder.add_node(
-        "supervisor",
-        lambda *a, **k: execute_and_log("supervisor", supervisor_logic, *a, **k)
-    )
-    graph_builder.add_node(
-        "human_in_the_loop",
-        lambda *a, **k: execute_and_log("human_in_the_loop",human_in_the_loop, *a, **k)
-    )
-    graph_builder.add_node(
-        "finalizer_node",
-        lambda state, config: execute_and_log(
-            "finalizer_node", finalizer_node, state, config
-        )
+        execute_and_log("clinical_critic_agent", clinical_critic_agent)
     )
+    graph_builder.add_node("supervisor", execute_and_log("supervisor", supervisor_logic))
+    graph_builder.add_node("human_in_the_loop", execute_and_log("human_in_the_loop", human_in_the_loop))
+    graph_builder.add_node("finalizer_node", execute_and_log("finalizer_node", finalizer_node))
 
     # --- 4. Edges ---
     graph_builder.set_entry_point("drafter_agent")
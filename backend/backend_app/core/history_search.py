@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import base64
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.sqlite_db import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Page size bounds of /history/search
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Words of context around the matched terms in each snippet
+SNIPPET_TOKENS = 24
+# Relevance ranking considers the newest this-many matches of a query. BM25 has to score
+# every candidate, so without a bound a term found in most protocols costs O(table).
+HISTORY_RELEVANCE_WINDOW = int(os.getenv("HISTORY_RELEVANCE_WINDOW", "2000"))
+
+ORDER_RELEVANCE = "relevance"
+ORDER_RECENT = "recent"
+
+# Sort keys before the first row of a listing ("latest" sorts on CURRENT_TIMESTAMP text)
+MAX_ROWID = 2**63 - 1
+MAX_TIMESTAMP = "9999-12-31 23:59:59"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+HIT_COLUMNS = "h.rowid, h.id, h.run_id, h.user_intent, h.iteration_count, h.created_at"
+
+# Lowest rowid inside the relevance window: a walk down the doclist, no scoring
+WINDOW_FLOOR_SQL = """
+    SELECT rowid FROM protocols_history_fts WHERE protocols_history_fts MATCH ?
+    ORDER BY rowid DESC LIMIT 1 OFFSET ?
+"""
+
+# Pages are cut from the FTS result in the inner query; snippets and protocol columns
+# are only computed for the rows of the page.
+RELEVANCE_SQL = f"""
+    SELECT {HIT_COLUMNS}, page.score,
+           snippet(protocols_history_fts, -1, '[', ']', '…', {SNIPPET_TOKENS})
+    FROM (
+        SELECT rowid AS rid, rank AS score FROM protocols_history_fts
+        WHERE protocols_history_fts MATCH ? AND rowid >= ?
+          AND (rank > ? OR (rank = ? AND rowid > ?))
+        ORDER BY rank, rowid
+        LIMIT ?
+    ) AS page
+    -- CROSS JOIN keeps this order: each page row is then a rowid lookup in the index
+    CROSS JOIN protocols_history_fts
+    CROSS JOIN protocols_history h
+    WHERE protocols_history_fts.rowid = page.rid AND protocols_history_fts MATCH ? AND h.rowid = page.rid
+    ORDER BY page.score, page.rid
+"""
+
+RECENT_SQL = f"""
+    SELECT {HIT_COLUMNS}, NULL,
+           snippet(protocols_history_fts, -1, '[', ']', '…', {SNIPPET_TOKENS})
+    FROM protocols_history_fts
+    JOIN protocols_history h ON h.rowid = protocols_history_fts.rowid
+    WHERE protocols_history_fts MATCH ? AND protocols_history_fts.rowid < ?
+    ORDER BY protocols_history_fts.rowid DESC
+    LIMIT ?
+"""
+
+# No search terms: newest first through idx_protocols_history_created_at
+LATEST_SQL = f"""
+    SELECT {HIT_COLUMNS}, NULL, substr(h.final_draft, 1, 200)
+    FROM protocols_history h
+    WHERE (h.created_at < ? OR (h.created_at = ? AND h.rowid < ?))
+    ORDER BY h.created_at DESC, h.rowid DESC
+    LIMIT ?
+"""
+
+# Every protocol archived for one run, through idx_protocols_history_run_id
+RUN_SQL = f"""
+    SELECT {HIT_COLUMNS}, NULL, substr(h.final_draft, 1, 200)
+    FROM protocols_history h
+    WHERE h.run_id = ? AND h.rowid > ?
+    ORDER BY h.rowid
+    LIMIT ?
+"""
+
+
+class InvalidCursorError(ValueError):
+    """The pagination cursor was not produced by this query."""
+
+
+@dataclass
+class HistoryHit:
+    id: str
+    run_id: str
+    user_intent: str
+    iteration_count: int
+    created_at: str
+    snippet: str
+    score: Optional[float] = None
+
+
+def match_expression(query: str) -> str:
+    """
+    Turns free text into an FTS5 query: every word must match, each as a quoted term
+    (so user input never hits FTS5 operators). A trailing `*` makes the last word a prefix.
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return ""
+    expression = " ".join(f'"{term}"' for term in terms)
+    if query.rstrip().endswith("*"):
+        expression += "*"
+    return expression
+
+
+def encode_cursor(kind: str, position: Tuple) -> str:
+    raw = json.dumps([kind, *position], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], kind: str, default: Tuple) -> Tuple:
+    if not cursor:
+        return default
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}") from e
+    if not isinstance(decoded, list) or not decoded or decoded[0] != kind or len(decoded) != len(default) + 1:
+        raise InvalidCursorError("Cursor belongs to a different query")
+    return tuple(decoded[1:])
+
+
+class HistorySearch:
+    """
+    Read path over `protocols_history`: full-text search (FTS5, BM25-ranked or newest
+    first), newest protocols, and lookups by run id. Every listing uses keyset
+    pagination, so page N costs the same as page 1: the opaque cursor carries the sort
+    key of the last row returned instead of an offset. Ranked search orders the newest
+    `relevance_window` matches; the window's lower rowid is fixed by the first page and
+    travels in the cursor, so later pages rank the same candidates.
+
+    Queries run on one query-only WAL connection (readers don't block the archiver),
+    serialized by a lock; the API calls them through asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, relevance_window: int = HISTORY_RELEVANCE_WINDOW):
+        self.db_path = db_path
+        self.relevance_window = relevance_window
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA query_only=ON")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _query(self, sql: str, params: Tuple) -> List[tuple]:
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def search(
+        self,
+        query: str = "",
+        run_id: Optional[str] = None,
+        order: str = ORDER_RELEVANCE,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Returns {"results": [HistoryHit as dict], "next_cursor": str | None}."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        expression = match_expression(query)
+
+        if run_id is not None:
+            (after,) = decode_cursor(cursor, "run", (0,))
+            rows = self._query(RUN_SQL, (run_id, after, limit))
+            next_position = lambda row: (row[0],)
+            kind = "run"
+        elif not expression:
+            created_at, before = decode_cursor(cursor, "latest", (MAX_TIMESTAMP, MAX_ROWID))
+            rows = self._query(LATEST_SQL, (created_at, created_at, before, limit))
+            next_position = lambda row: (row[5], row[0])
+            kind = "latest"
+        elif order == ORDER_RECENT:
+            (before,) = decode_cursor(cursor, "recent", (MAX_ROWID,))
+            rows = self._query(RECENT_SQL, (expression, before, limit))
+            next_position = lambda row: (row[0],)
+            kind = "recent"
+        else:
+            floor, score, after = decode_cursor(cursor, "relevance", (None, float("-inf"), 0))
+            if floor is None:
+                found = self._query(WINDOW_FLOOR_SQL, (expression, max(0, self.relevance_window - 1)))
+                floor = found[0][0] if found else 0
+            score = float(score)
+            rows = self._query(RELEVANCE_SQL, (expression, floor, score, score, after, limit, expression))
+            next_position = lambda row: (floor, row[6], row[0])
+            kind = "relevance"
+
+        hits = [
+            HistoryHit(
+                id=row[1], run_id=row[2], user_intent=row[3], iteration_count=row[4] or 0,
+                created_at=str(row[5]), snippet=row[7] or "",
+                # BM25 rank is lower-is-better; expose it as a positive relevance score
+                score=-row[6] if row[6] is not None else None,
+            )
+            for row in rows
+        ]
+        next_cursor = encode_cursor(kind, next_position(rows[-1])) if len(rows) == limit else None
+        return {"results": [asdict(hit) for hit in hits], "next_cursor": next_cursor}
+
+
+# Process-wide reader on the application database
+history_search = HistorySearch()
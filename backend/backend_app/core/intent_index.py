@@ -0,0 +1,150 @@
+import os
+import asyncio
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from core.sqlite_db import DB_PATH
+from core.history_search import WINDOW_FLOOR_SQL, HISTORY_RELEVANCE_WINDOW
+from core.metrics import INTENT_REUSE_LOOKUPS
+from shared.intent_similarity import exact_intent_key, normalize_intent, intent_hash, intent_terms, intent_similarity
+
+logger = logging.getLogger(__name__)
+
+# Minimum trigram similarity of normalized intents for a near match to seed a run
+# (near matches are adapted by the drafter, only exact ones are reused verbatim)
+INTENT_REUSE_THRESHOLD = float(os.getenv("INTENT_REUSE_THRESHOLD", "0.75"))
+# Best BM25 candidates (on the intent column) scored per lookup
+INTENT_REUSE_CANDIDATES = int(os.getenv("INTENT_REUSE_CANDIDATES", "20"))
+
+EXACT_SQL = """
+    SELECT h.id, h.user_intent, h.final_draft, i.normalized_intent
+    FROM intent_index i JOIN protocols_history h ON h.id = i.protocol_id
+    WHERE i.exact_hash = ?
+    ORDER BY h.rowid DESC
+    LIMIT 1
+"""
+
+# Candidates come from the FTS index of protocols_history (see core/history_search.py);
+# the join keeps only protocols in intent_index, i.e. ones allowed to seed runs.
+NEAR_SQL = """
+    SELECT h.id, h.user_intent, h.final_draft, i.normalized_intent
+    FROM (
+        SELECT rowid AS rid FROM protocols_history_fts
+        WHERE protocols_history_fts MATCH ? AND rowid >= ?
+        ORDER BY rank
+        LIMIT ?
+    ) AS candidates
+    CROSS JOIN protocols_history h
+    CROSS JOIN intent_index i
+    WHERE h.rowid = candidates.rid AND i.protocol_id = h.id
+"""
+
+
+@dataclass
+class IntentMatch:
+    protocol_id: str
+    user_intent: str
+    final_draft: str
+    similarity: float
+    exact: bool
+
+
+class IntentIndex:
+    """
+    Finds an archived, approved protocol whose intent matches a new one.
+
+    Exact matches are a hash lookup of the order-preserving intent (every word, in order)
+    in `intent_index`. Otherwise the intent's content words are searched (any of them) in
+    the intent column of the protocol FTS index, and the best-ranked candidates are scored
+    by trigram similarity of their content-word bags; the best one at or above `threshold`
+    wins. A one-word change or a reordering can be clinically decisive (social vs. health
+    anxiety, parents of anxious children vs. anxious parents) and still score high, so only
+    exact matches may be served as they are. Lookups run on one query-only connection in a
+    worker thread.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        threshold: float = INTENT_REUSE_THRESHOLD,
+        candidates: int = INTENT_REUSE_CANDIDATES,
+        window: int = HISTORY_RELEVANCE_WINDOW,
+    ):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.candidates = candidates
+        self.window = window
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA query_only=ON")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _lookup(self, intent: str) -> Optional[IntentMatch]:
+        normalized = normalize_intent(intent)
+        if not normalized:
+            return None
+
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(EXACT_SQL, (intent_hash(exact_intent_key(intent)),)).fetchone()
+            if row is not None:
+                return IntentMatch(row[0], row[1], row[2], 1.0, exact=True)
+
+            # Unfolded words: the FTS tokenizer applies its own stemming
+            words = sorted(set(intent_terms(intent, fold_plurals=False)))
+            expression = "user_intent : (" + " OR ".join(f'"{word}"' for word in words) + ")"
+            floor = conn.execute(WINDOW_FLOOR_SQL, (expression, max(0, self.window - 1))).fetchone()
+            rows = conn.execute(NEAR_SQL, (expression, floor[0] if floor else 0, self.candidates)).fetchall()
+
+        best = None
+        for protocol_id, user_intent, final_draft, candidate in rows:
+            similarity = intent_similarity(normalized, candidate)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = IntentMatch(protocol_id, user_intent, final_draft, similarity, exact=False)
+        return best
+
+    async def find(self, intent: str) -> Optional[IntentMatch]:
+        match = await asyncio.to_thread(self._lookup, intent)
+        if match is None:
+            self.misses += 1
+            INTENT_REUSE_LOOKUPS.labels("miss").inc()
+        elif match.exact:
+            self.exact_hits += 1
+            INTENT_REUSE_LOOKUPS.labels("exact").inc()
+        else:
+            self.near_hits += 1
+            INTENT_REUSE_LOOKUPS.labels("near").inc()
+        return match
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+            "threshold": self.threshold,
+        }
+
+
+# Process-wide index reader on the application database
+intent_index = IntentIndex()
@@ -0,0 +1,326 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from core.sqlite_db import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Workflow jobs each process runs concurrently (0 = enqueue only, never claim)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# A claimed job belongs to its worker until the lease expires; running jobs renew it
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Idle workers re-check the table this often (jobs enqueued by other processes)
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+# Claims per job before it is marked failed (crashed workers count as attempts)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Terminal statuses
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+# Statuses of a job that has yet to finish (a failed attempt with attempts left is re-queued)
+ACTIVE_JOB_STATUSES = frozenset({"queued", "running"})
+
+# A job is claimable when queued, or running with an expired lease (its worker died).
+# Only one job per thread runs at a time, so a queued resume waits for its thread's run.
+CLAIM_SQL = """
+    UPDATE workflow_jobs
+    SET status = 'running', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+    WHERE job_id = (
+        SELECT j.job_id FROM workflow_jobs j
+        WHERE (j.status = 'queued' OR (j.status = 'running' AND j.lease_expires_at < ?))
+          AND NOT EXISTS (
+            SELECT 1 FROM workflow_jobs r
+            WHERE r.thread_id = j.thread_id AND r.job_id != j.job_id
+              AND ((r.status = 'running' AND r.lease_expires_at >= ?)
+                   OR (r.status = 'queued' AND r.rowid < j.rowid))
+          )
+        ORDER BY j.rowid
+        LIMIT 1
+    )
+    RETURNING job_id, thread_id, kind, payload_json, attempts
+"""
+
+
+@dataclass
+class Job:
+    job_id: str
+    thread_id: str
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    status: str = "running"
+    last_error: Optional[str] = None
+
+
+class JobQueue:
+    """
+    Durable workflow job queue in the application database (`workflow_jobs` table).
+
+    Any process can enqueue; workers claim jobs with a time-limited lease and renew it
+    while the job runs. A worker that crashes stops renewing, so its job becomes
+    claimable again once the lease expires. All statements are single autocommit
+    statements on one WAL connection, serialized by a lock (calls run in asyncio.to_thread).
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def enqueue(self, thread_id: str, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO workflow_jobs (job_id, thread_id, kind, payload_json, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, thread_id, kind, json.dumps(payload, default=str), time.time()),
+            )
+        return job_id
+
+    def claim(self, owner: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Job]:
+        """Atomically leases the oldest claimable job to `owner`, or returns None."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # Jobs whose workers kept dying are given up on instead of being claimed again
+            conn.execute(
+                "UPDATE workflow_jobs SET status = 'failed', last_error = 'lease expired too often', updated_at = ? "
+                "WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(CLAIM_SQL, (owner, now + lease_seconds, now, now, now)).fetchone()
+        if row is None:
+            return None
+        job_id, thread_id, kind, payload_json, attempts = row
+        return Job(job_id, thread_id, kind, json.loads(payload_json), attempts)
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extends the lease; False means the job is no longer ours (lease expired and re-claimed)."""
+        now = time.time()
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE workflow_jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (now + lease_seconds, now, job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, owner: str):
+        self._finish(job_id, owner, JOB_DONE, None)
+
+    def fail(self, job_id: str, owner: str, error: str, attempts: int):
+        """Re-queues the job while it has attempts left, otherwise marks it failed."""
+        status = JOB_FAILED if attempts >= self.max_attempts else "queued"
+        self._finish(job_id, owner, status, error)
+
+    def release(self, job_id: str, owner: str):
+        """Hands an interrupted job (shutdown) back to the queue without using up an attempt."""
+        with self._lock:
+            self._connection().execute(
+                "UPDATE workflow_jobs SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL, "
+                "attempts = attempts - 1, updated_at = ? WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time(), job_id, owner),
+            )
+
+    def _finish(self, job_id: str, owner: str, status: str, error: Optional[str]):
+        with self._lock:
+            self._connection().execute(
+                "UPDATE workflow_jobs SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE job_id = ? AND lease_owner = ?",
+                (status, error, time.time(), job_id, owner),
+            )
+
+    def _select_one(self, where: str, params: tuple) -> Optional[Job]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT job_id, thread_id, kind, payload_json, attempts, status, last_error FROM workflow_jobs "
+                f"WHERE {where} ORDER BY rowid DESC LIMIT 1",
+                params,
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, thread_id, kind, payload_json, attempts, status, last_error = row
+        return Job(job_id, thread_id, kind, json.loads(payload_json), attempts, status, last_error)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._select_one("job_id = ?", (job_id,))
+
+    def latest_for_thread(self, thread_id: str) -> Optional[Job]:
+        return self._select_one("thread_id = ?", (thread_id,))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT status, COUNT(*) FROM workflow_jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+
+JobHandler = Callable[[Job], Awaitable[None]]
+
+
+class JobWorkerPool:
+    """
+    `workers` async tasks in this process that claim jobs from the queue and run them
+    with `handler`. Local enqueues wake idle workers immediately; jobs enqueued by other
+    processes are picked up on the next poll. While a job runs its lease is renewed every
+    third of the lease period; if renewal fails the job is cancelled here, since another
+    worker now owns it.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: JobHandler,
+        workers: int = JOB_WORKERS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner_prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        # job id -> set whenever an attempt of that job ends in this process (see wait)
+        self._finished: Dict[str, asyncio.Event] = {}
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        for index in range(self.workers):
+            task = asyncio.create_task(self._worker(f"{self.owner_prefix}:{index}"), name=f"job-worker-{index}")
+            self._tasks.add(task)
+        logger.info(f"[JOBS] {self.workers} workers started ({self.owner_prefix}).")
+
+    async def stop(self):
+        """Cancels the workers; jobs they were running go back to the queue."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(self, thread_id: str, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = await asyncio.to_thread(self.queue.enqueue, thread_id, kind, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def wait(self, job_id: str) -> Optional[Job]:
+        """
+        Waits until the job is done or has failed for good, wherever it runs. Attempts run
+        in this process wake the waiter immediately; others are seen on the next poll.
+        """
+        finished = self._finished.setdefault(job_id, asyncio.Event())
+        try:
+            while True:
+                finished.clear()
+                job = await asyncio.to_thread(self.queue.get, job_id)
+                if job is None or job.status not in ACTIVE_JOB_STATUSES:
+                    return job
+                try:
+                    await asyncio.wait_for(finished.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._finished.pop(job_id, None)
+
+    async def _next_job(self, owner: str) -> Job:
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, owner, self.lease_seconds)
+            if job is not None:
+                return job
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self, owner: str):
+        while True:
+            job = await self._next_job(owner)
+            # More work may be waiting; let another idle worker look
+            self._wakeup.set()
+            self.busy += 1
+            try:
+                await self._run(job, owner)
+            finally:
+                self.busy -= 1
+
+    async def _run(self, job: Job, owner: str):
+        logger.info(f"[JOBS] {owner} running {job.kind} job {job.job_id} (thread {job.thread_id}, attempt {job.attempts}).")
+        run = asyncio.create_task(self.handler(job))
+        renewer = asyncio.create_task(self._keep_lease(job, owner, run))
+        try:
+            await run
+        except asyncio.CancelledError:
+            if renewer.done() and not renewer.cancelled() and renewer.result() is False:
+                # Lease lost: another worker owns the job now
+                logger.info(f"[JOBS] Lost the lease on job {job.job_id}; abandoned here.")
+                return
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            await asyncio.to_thread(self.queue.release, job.job_id, owner)
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.exception(f"[JOBS] Job {job.job_id} failed")
+            await asyncio.to_thread(self.queue.fail, job.job_id, owner, str(e), job.attempts)
+        else:
+            self.completed += 1
+            await asyncio.to_thread(self.queue.complete, job.job_id, owner)
+        finally:
+            renewer.cancel()
+            finished = self._finished.get(job.job_id)
+            if finished is not None:
+                finished.set()
+
+    async def _keep_lease(self, job: Job, owner: str, run: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.renew, job.job_id, owner, self.lease_seconds):
+                run.cancel()
+                return False
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "completed": self.completed,
+            "failed": self.failed,
+            "jobs": self.queue.counts(),
+        }
+
+
+# Process-wide queue on the application database
+job_queue = JobQueue()
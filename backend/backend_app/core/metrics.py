@@ -0,0 +1,242 @@
+import math
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format served by GET /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached evaluator (ms) up to a slow drafter call (minutes)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    """
+    A metric family: one child per label-value combination. Hot paths resolve their
+    child once with labels() and keep it, so recording is a lock plus an addition.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabelled metrics are exported (as zero) before their first event
+            self._children[()] = self._new_child()
+
+    def labels(self, *values) -> object:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def _samples(self) -> List[Tuple[str, Sequence[str], Sequence[str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for name, names, values, value in self._samples():
+            lines.append(f"{name}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [(self.name, self.labelnames, key, child.value) for key, child in list(self._children.items())]
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class Gauge(_Metric):
+    """A value that goes up and down. With `callback`, it is read at scrape time instead."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def _samples(self):
+        if self.callback is not None:
+            return [(self.name, (), (), float(self.callback()))]
+        return [(self.name, self.labelnames, key, child.value) for key, child in list(self._children.items())]
+
+
+class _HistogramChild:
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Per-bucket (not cumulative) counts; the last slot is the +Inf overflow
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self):
+        samples = []
+        names = self.labelnames + ("le",)
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", names, key + (_format_value(bound),), cumulative))
+            samples.append((f"{self.name}_sum", self.labelnames, key, total))
+            samples.append((f"{self.name}_count", self.labelnames, key, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Metric families of this process, rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Process-wide registry served by /metrics on the API and the MCP server
+metrics = MetricsRegistry()
+
+# --- Workflow metrics (recorded by core/graph.py, core/intent_index.py, core/evaluation_rounds.py, agents/, main.py) ---
+NODE_DURATION = metrics.histogram(
+    "cerina_node_duration_seconds", "Wall time of one graph node execution.", ["node"]
+)
+NODE_ERRORS = metrics.counter(
+    "cerina_node_errors_total", "Graph node executions that raised an error.", ["node"]
+)
+LLM_REQUEST_DURATION = metrics.histogram(
+    "cerina_llm_request_duration_seconds", "Latency of successful LLM requests (one attempt or hedge).", ["role"]
+)
+LLM_REQUESTS = metrics.counter(
+    "cerina_llm_requests_total", "LLM requests by outcome (ok, rate_limited, error, cancelled, aborted).", ["role", "outcome"]
+)
+LLM_CALL_FAILURES = metrics.counter(
+    "cerina_llm_call_failures_total", "Agent LLM calls that failed after all retries and hedges.", ["role"]
+)
+SUPERVISOR_DECISIONS = metrics.counter(
+    "cerina_supervisor_decisions_total", "Supervisor routing decisions.", ["next_action", "reason"]
+)
+WORKFLOW_ITERATIONS = metrics.histogram(
+    "cerina_workflow_iterations", "Drafting iterations when a workflow reaches human review.",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10),
+)
+EVALUATIONS_SKIPPED = metrics.counter(
+    "cerina_evaluations_skipped_total", "Evaluator reviews cancelled because the other evaluator failed the draft.", ["evaluator"]
+)
+INTENT_REUSE_LOOKUPS = metrics.counter(
+    "cerina_intent_reuse_lookups_total", "Intent index lookups by result (exact, near, miss).", ["result"]
+)
+SSE_ACTIVE_STREAMS = metrics.gauge(
+    "cerina_sse_active_streams", "Open SSE subscriber connections."
+)
+
+# Threads paused at the human review node in this process
+awaiting_review_threads = set()
+THREADS_AWAITING_REVIEW = metrics.gauge(
+    "cerina_threads_awaiting_review", "Threads paused for human review (since this process started).",
+    callback=lambda: len(awaiting_review_threads),
+)
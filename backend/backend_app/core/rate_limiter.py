@@ -0,0 +1,226 @@
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Continuous-refill token bucket; `capacity` units per `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def seconds_until(self, amount: float) -> float:
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class KeyState:
+    """Limits and adaptive (AIMD) concurrency for one API key."""
+
+    def __init__(
+        self,
+        api_key: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        initial_concurrency: float,
+        min_concurrency: float,
+        max_concurrency: float,
+    ):
+        self.api_key = api_key
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency_limit = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.rate_limited_total = 0
+
+    @property
+    def label(self) -> str:
+        return f"...{self.api_key[-4:]}" if self.api_key else "default"
+
+    def has_capacity(self, estimated_tokens: float, now: float) -> bool:
+        return (
+            now >= self.cooldown_until
+            and self.in_flight < int(self.concurrency_limit)
+            and self.requests.available() >= 1
+            and self.tokens.available() >= min(estimated_tokens, self.tokens.capacity)
+        )
+
+    def seconds_until_ready(self, estimated_tokens: float, now: float) -> float:
+        if self.in_flight >= int(self.concurrency_limit):
+            return float("inf")  # freed by a release, not by time
+        return max(
+            self.cooldown_until - now,
+            self.requests.seconds_until(1),
+            self.tokens.seconds_until(estimated_tokens),
+        )
+
+
+class Lease:
+    """One admitted call on one key. Report the outcome so limits can adapt."""
+
+    def __init__(self, key_state: KeyState, estimated_tokens: float, latency_target_s: float):
+        self.key_state = key_state
+        self.api_key = key_state.api_key
+        self.estimated_tokens = estimated_tokens
+        self.latency_target_s = latency_target_s
+        self.started = time.monotonic()
+        self.actual_tokens: Optional[int] = None
+        self.succeeded = False
+        self.rate_limited = False
+        self.retry_after: Optional[float] = None
+
+    def record_success(self):
+        self.succeeded = True
+
+    def record_usage(self, total_tokens: Optional[int]):
+        self.actual_tokens = total_tokens
+
+    def record_rate_limited(self, retry_after: Optional[float] = None):
+        self.rate_limited = True
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Process-wide admission control for LLM calls across a pool of API keys.
+
+    Every call acquires a Lease: the limiter picks the key with the most headroom that
+    has request and token budget left (token buckets per minute) and a free slot under
+    its adaptive concurrency limit. Limits follow AIMD: each fast success adds
+    1/limit, a 429 halves the limit and cools the key down, a call slower than its
+    latency target (per lease, since roles differ) trims it by 10%. Errors, timeouts and
+    cancellations that finish within the target leave the limit unchanged.
+    """
+
+    def __init__(
+        self,
+        api_keys: List[str],
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        initial_concurrency: float = 4,
+        min_concurrency: float = 1,
+        max_concurrency: float = 32,
+        latency_target_s: float = 30.0,
+    ):
+        keys = list(dict.fromkeys(k for k in api_keys if k)) or [""]
+        self.keys: List[KeyState] = [
+            KeyState(k, requests_per_minute, tokens_per_minute,
+                     initial_concurrency, min_concurrency, max_concurrency)
+            for k in keys
+        ]
+        self.latency_target_s = latency_target_s
+        self._changed: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so the limiter can be built before an event loop exists
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _pick(self, estimated_tokens: float) -> Optional[KeyState]:
+        now = time.monotonic()
+        ready = [k for k in self.keys if k.has_capacity(estimated_tokens, now)]
+        if not ready:
+            return None
+        return max(ready, key=lambda k: (k.tokens.available(), -k.in_flight))
+
+    @asynccontextmanager
+    async def lease(self, estimated_tokens: float, latency_target_s: Optional[float] = None) -> AsyncIterator[Lease]:
+        changed = self._condition()
+        async with changed:
+            while True:
+                key_state = self._pick(estimated_tokens)
+                if key_state is not None:
+                    break
+                now = time.monotonic()
+                wait = min(k.seconds_until_ready(estimated_tokens, now) for k in self.keys)
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=None if wait == float("inf") else max(wait, 0.01))
+                except asyncio.TimeoutError:
+                    pass
+
+            key_state.in_flight += 1
+            key_state.requests.take(1)
+            key_state.tokens.take(min(estimated_tokens, key_state.tokens.capacity))
+
+        lease = Lease(key_state, estimated_tokens, latency_target_s or self.latency_target_s)
+        try:
+            yield lease
+        finally:
+            async with changed:
+                self._settle(lease)
+                changed.notify_all()
+
+    def _settle(self, lease: Lease):
+        key_state = lease.key_state
+        key_state.in_flight -= 1
+
+        # Reconcile the token estimate with what the provider reported
+        if lease.actual_tokens is not None:
+            charged = min(lease.estimated_tokens, key_state.tokens.capacity)
+            delta = charged - lease.actual_tokens
+            if delta > 0:
+                key_state.tokens.give_back(delta)
+            else:
+                key_state.tokens.take(-delta)
+
+        # --- AIMD ---
+        if lease.rate_limited:
+            key_state.rate_limited_total += 1
+            key_state.concurrency_limit = max(key_state.min_concurrency, key_state.concurrency_limit / 2)
+            key_state.cooldown_until = time.monotonic() + (lease.retry_after or 1.0)
+            logger.warning(
+                f"[RATE LIMIT] 429 on key {key_state.label}; concurrency -> {key_state.concurrency_limit:.1f}"
+            )
+        elif time.monotonic() - lease.started > lease.latency_target_s:
+            key_state.concurrency_limit = max(key_state.min_concurrency, key_state.concurrency_limit * 0.9)
+        elif lease.succeeded:
+            key_state.concurrency_limit = min(
+                key_state.max_concurrency, key_state.concurrency_limit + 1 / key_state.concurrency_limit
+            )
+
+    def gauge(self) -> List[Dict]:
+        """Current limits per key (keys are masked)."""
+        now = time.monotonic()
+        return [
+            {
+                "key": k.label,
+                "concurrency_limit": round(k.concurrency_limit, 2),
+                "in_flight": k.in_flight,
+                "requests_available": round(k.requests.available(), 1),
+                "requests_per_minute": k.requests.capacity,
+                "tokens_available": round(k.tokens.available()),
+                "tokens_per_minute": k.tokens.capacity,
+                "cooldown_remaining_s": round(max(0.0, k.cooldown_until - now), 2),
+                "rate_limited_total": k.rate_limited_total,
+            }
+            for k in self.keys
+        ]
@@ -0,0 +1,149 @@
+import asyncio
+import random
+import time
+import logging
+import contextlib
+from collections import deque
+from typing import Any, AsyncContextManager, Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    """Timeout, retry and hedging settings for one kind of call."""
+
+    def __init__(
+        self,
+        timeout_s: float = 60.0,
+        max_attempts: int = 3,
+        base_delay_s: float = 0.5,
+        max_delay_s: float = 8.0,
+        hedge: bool = False,
+        hedge_min_delay_s: float = 1.0,
+        hedge_min_samples: int = 20,
+    ):
+        self.timeout_s = timeout_s
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.hedge = hedge
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self.hedge_min_samples = hedge_min_samples
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2 ** (attempt - 1)))
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, used to derive the hedge delay."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Timeouts, 429s, 5xx and connection failures are worth retrying; bad requests are not."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in {
+        "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+        "ConnectError", "ReadTimeout", "RemoteProtocolError",
+    }
+
+
+def _no_admission() -> AsyncContextManager[None]:
+    return contextlib.nullcontext()
+
+
+async def _admitted(admit: Callable[[], AsyncContextManager[Any]], call: Callable[[Any], Awaitable[T]]) -> T:
+    async with admit() as ticket:
+        return await call(ticket)
+
+
+async def _hedged(call: Callable[[], Awaitable[T]], hedge: Callable[[], Awaitable[T]], delay_s: float, label: str) -> T:
+    """Runs `call`; if it hasn't answered after `delay_s`, races it against `hedge()`."""
+    pending = {asyncio.ensure_future(call())}
+    error: Optional[BaseException] = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay_s)
+        if done:
+            return done.pop().result()
+
+        logger.info(f"[RESILIENCE] {label}: no answer after {delay_s:.2f}s, sending hedge request.")
+        pending.add(asyncio.ensure_future(hedge()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Whatever ends this attempt (an answer, a timeout, the caller being cancelled),
+        # requests still in flight are cancelled and unwound (releasing their leases)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+
+async def call_with_resilience(
+    call: Callable[[Any], Awaitable[T]],
+    policy: RetryPolicy,
+    tracker: Optional[LatencyTracker] = None,
+    label: str = "llm",
+    admit: Callable[[], AsyncContextManager[Any]] = _no_admission,
+) -> T:
+    """
+    Runs `call(ticket)` with a per-attempt timeout, retrying transient failures with
+    jittered exponential backoff. Each attempt first waits for `admit()` (e.g. a rate
+    limiter lease, which is the ticket); the timeout, the hedge delay and the recorded
+    latency start once it is admitted, so queueing under congestion neither times calls
+    out nor inflates the p95. With policy.hedge, once enough latencies are known, an
+    attempt still running after the p95 latency gets a duplicate request (admitted on its
+    own); the first answer wins.
+    """
+    for attempt in range(1, policy.max_attempts + 1):
+        try:
+            async with admit() as ticket:
+                started = time.monotonic()
+                hedge_delay = None
+                if policy.hedge and tracker is not None and len(tracker.samples) >= policy.hedge_min_samples:
+                    hedge_delay = max(policy.hedge_min_delay_s, tracker.percentile(0.95))
+
+                if hedge_delay is not None and hedge_delay < policy.timeout_s:
+                    attempt_coro = _hedged(lambda: call(ticket), lambda: _admitted(admit, call), hedge_delay, label)
+                else:
+                    attempt_coro = call(ticket)
+                result = await asyncio.wait_for(attempt_coro, timeout=policy.timeout_s)
+                elapsed = time.monotonic() - started
+
+        except Exception as e:
+            if attempt == policy.max_attempts or not is_transient_error(e):
+                raise
+            delay = policy.backoff(attempt)
+            logger.warning(
+                f"[RESILIENCE] {label}: attempt {attempt}/{policy.max_attempts} failed "
+                f"({type(e).__name__}: {e}); retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        if tracker is not None:
+            tracker.record(elapsed)
+        return result
@@ -0,0 +1,239 @@
+import os
+import re
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Phrases that fail a generated protocol outright, by safety flag: clearly instructive or
+# prescriptive wording only. Even these are hard fails only without a guard (below), so
+# "talk to your prescriber before you stop taking your medication" does not trip the screen.
+DEFAULT_LEXICON: Dict[str, List[str]] = {
+    "CRISIS_KEYWORD": [
+        "kill yourself",
+        "ways to die",
+        "how to overdose",
+    ],
+    "MEDICAL_ADVICE": [
+        "stop taking your medication",
+        "stop taking your medicine",
+        "stop your medication",
+        "come off your medication",
+        "increase your dose",
+        "double your dose",
+        "reduce your dose",
+        "skip your medication",
+        "you should take sleeping pills",
+        "take a sleeping pill",
+        "instead of seeing a doctor",
+        "no need to see a doctor",
+        "no need for therapy",
+    ],
+}
+
+# Phrases that are legitimate in CBT material (crisis resources, PHQ-9 items, thought-record
+# examples, psychoeducation) but worth a closer look: they never fail a draft by themselves,
+# they are passed to the Safety Guardian as hints along with the guarded hard phrases.
+DEFAULT_HINT_LEXICON: Dict[str, List[str]] = {
+    "CRISIS_KEYWORD": [
+        "end your life",
+        "end it all",
+        "hurt yourself",
+        "cut yourself",
+        "better off dead",
+        "no reason to live",
+        "nobody would miss you",
+    ],
+    "MEDICAL_ADVICE": [
+        "take melatonin",
+        "you have been diagnosed with",
+        "you are suffering from",
+    ],
+}
+
+# A hard phrase preceded (within GUARD_WINDOW words of the same sentence) by one of these is
+# negated, conditional or reported ("never double your dose", "if you feel like you might...",
+# "thoughts of...")
+GUARD_WORDS_BEFORE = frozenset({
+    "not", "no", "never", "don't", "dont", "without", "before", "unless", "if", "ask", "talk",
+    "feel", "feeling", "urge", "urges", "thought", "thoughts", "think", "thinking",
+})
+GUARD_WINDOW = 6
+# Anywhere else on the line: the line points to professional or crisis help
+GUARD_WORDS_LINE = frozenset({
+    "988", "911", "999", "111", "call", "text", "crisis", "helpline", "hotline", "emergency",
+    "samaritans", "doctor", "gp", "prescriber", "psychiatrist", "pharmacist", "clinician",
+})
+
+# JSON file {"hard": {flag: [phrases]}, "hint": {flag: [phrases]}}; a flat {flag: [phrases]}
+# file is read as hints
+SAFETY_LEXICON_PATH = os.getenv("SAFETY_LEXICON_PATH", "")
+
+TAGGED_LINE_RE = re.compile(r"^<L(\d+)>(.*)</L\1>$")
+
+
+@dataclass
+class ScreenHit:
+    line_number: int
+    flag: str
+    phrase: str
+    # True: an unguarded hard phrase, which fails the draft without an LLM review
+    hard: bool = False
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher over word tokens: one pass over a line finds every occurrence
+    of every phrase, independent of how many phrases the lexicon holds. Working on words
+    rather than characters keeps the Python-level loop short and gives whole-word
+    matching for free ("end it all" does not fire inside "blend it all").
+    """
+
+    def __init__(self, patterns: Dict[Tuple[str, ...], Any]):
+        # patterns: phrase tokens -> label. Node 0 is the root.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[Tuple[str, ...], Any]]] = [[]]
+
+        for phrase, label in patterns.items():
+            node = 0
+            for token in phrase:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = nxt
+            self._output[node].append((phrase, label))
+
+        # Breadth-first failure links (depth-1 nodes fail to the root); outputs are merged along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, tokens: List[str]):
+        """Yields (end, phrase, label) for every match in `tokens`; `end` is the index of its last token."""
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        node = 0
+        for end, token in enumerate(tokens):
+            if node == 0:
+                # Fast path: most words cannot start a phrase
+                node = root.get(token, 0)
+            else:
+                while node and token not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(token, 0)
+            for phrase, label in output[node]:
+                yield end, phrase, label
+
+
+# Case/punctuation folding done with str.translate (C speed) so lines split into bare words.
+# Sentence punctuation becomes a SENTENCE_BREAK token: phrases never match across it and
+# guard words before it do not reach into the next sentence.
+SENTENCE_BREAK = "."
+_PUNCTUATION = "".join(
+    chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c).isspace() or chr(c) == "'")
+) + "\u2014\u2013\u201c\u201d\u2026"
+FOLD_TABLE = str.maketrans({
+    **{ch: " " for ch in _PUNCTUATION},
+    **{ch: f" {SENTENCE_BREAK} " for ch in ".!?;"},
+    "\u2019": "'",
+})
+
+
+def _tokenize(text: str) -> List[str]:
+    return text.lower().translate(FOLD_TABLE).split()
+
+
+def _is_guarded(tokens: List[str], start: int, end: int) -> bool:
+    """True when the words around a match negate it, make it conditional or point to help."""
+    window = tokens[max(0, start - GUARD_WINDOW):start]
+    if SENTENCE_BREAK in window:
+        window = window[len(window) - window[::-1].index(SENTENCE_BREAK):]
+    if not GUARD_WORDS_BEFORE.isdisjoint(window):
+        return True
+    return not GUARD_WORDS_LINE.isdisjoint(tokens[:start] + tokens[end + 1:])
+
+
+class SafetyPrescreen:
+    """
+    Deterministic, in-process scan of an <L#>-tagged draft against the safety lexicon.
+
+    Each phrase has an anchor word (its longest word); a line that contains no anchor
+    cannot match anything, so clean lines are rejected with one set check and only the
+    rare candidate lines go through the automaton. A phrase is reported once per line,
+    marked `hard` when any of its occurrences there is a hard phrase without a guard;
+    everything else is a hint for the LLM review.
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, List[str]]] = None,
+        hint_lexicon: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.lexicon = DEFAULT_LEXICON if lexicon is None else lexicon
+        self.hint_lexicon = DEFAULT_HINT_LEXICON if hint_lexicon is None else hint_lexicon
+        # phrase tokens -> (flag, hard); a phrase listed in both tiers is hard
+        patterns = {
+            tuple(_tokenize(phrase)): (flag, hard)
+            for hard, lexicon_tier in ((False, self.hint_lexicon), (True, self.lexicon))
+            for flag, phrases in lexicon_tier.items()
+            for phrase in phrases
+            if _tokenize(phrase)
+        }
+        self._anchors = frozenset(max(phrase, key=len) for phrase in patterns)
+        self._matcher = AhoCorasick(patterns)
+        hard_count = sum(hard for _, hard in patterns.values())
+        logger.info(f"[SAFETY SCREEN] Loaded {hard_count} hard and {len(patterns) - hard_count} hint phrase(s).")
+
+    @classmethod
+    def from_env(cls) -> "SafetyPrescreen":
+        if not SAFETY_LEXICON_PATH:
+            return cls()
+        with open(SAFETY_LEXICON_PATH, "r", encoding="utf-8") as f:
+            lexicon = json.load(f)
+        if set(lexicon) <= {"hard", "hint"}:
+            return cls(lexicon.get("hard", {}), lexicon.get("hint", {}))
+        return cls({}, lexicon)
+
+    def scan(self, augmented_draft: str) -> List[ScreenHit]:
+        hits: List[ScreenHit] = []
+        raw_lines = (augmented_draft or "").split("\n")
+        folded_lines = (augmented_draft or "").lower().translate(FOLD_TABLE).split("\n")
+        anchors = self._anchors
+
+        for index, folded in enumerate(folded_lines):
+            if anchors.isdisjoint(folded.split()):
+                continue
+
+            match = TAGGED_LINE_RE.match(raw_lines[index])
+            line_number, text = (int(match.group(1)), match.group(2)) if match else (index + 1, raw_lines[index])
+            tokens = _tokenize(text)
+            line_hits: Dict[Tuple[str, ...], ScreenHit] = {}
+            for end, phrase, (flag, hard) in self._matcher.iter_matches(tokens):
+                # Decided per occurrence: a guarded mention does not cover an unguarded one
+                hard = hard and not _is_guarded(tokens, end - len(phrase) + 1, end)
+                hit = line_hits.get(phrase)
+                if hit is None:
+                    line_hits[phrase] = ScreenHit(line_number, flag, " ".join(phrase), hard)
+                elif hard:
+                    hit.hard = True
+            hits.extend(line_hits.values())
+        return hits
+
+
+# Process-wide instance used by the Safety Guardian
+safety_prescreen = SafetyPrescreen.from_env()
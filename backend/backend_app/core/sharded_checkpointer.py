@@ -0,0 +1,181 @@
+import os
+import zlib
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint files threads are spread over. Changing it remaps threads to other files,
+# so paused threads from before the change are no longer found: drain them first.
+CHECKPOINT_SHARDS = int(os.getenv("CHECKPOINT_SHARDS", "1"))
+# How long a shard connection waits on a locked file before failing the write
+CHECKPOINT_BUSY_TIMEOUT_MS = int(os.getenv("CHECKPOINT_BUSY_TIMEOUT_MS", "5000"))
+
+
+def shard_index(thread_id: Any, shards: int) -> int:
+    """Stable across processes and restarts (unlike hash()), so every worker agrees."""
+    return zlib.crc32(str(thread_id).encode("utf-8")) % shards
+
+
+def shard_paths(db_path: str, shards: int) -> List[str]:
+    """A single shard keeps the historical file name; N shards get `<stem>-<i>-of-<N><ext>`."""
+    if shards == 1:
+        return [db_path]
+    stem, ext = os.path.splitext(db_path)
+    return [f"{stem}-{i}-of-{shards}{ext}" for i in range(shards)]
+
+
+async def open_shard(db_path: str, busy_timeout_ms: int = CHECKPOINT_BUSY_TIMEOUT_MS) -> AsyncSqliteSaver:
+    conn = await aiosqlite.connect(db_path)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    return AsyncSqliteSaver(conn)
+
+
+class ShardedSqliteSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpointer that spreads threads over several SQLite files by hashing thread_id.
+
+    Each shard is a regular AsyncSqliteSaver with its own aiosqlite connection (and
+    worker thread), lock and file lock, so checkpoint writes of threads on different
+    shards no longer queue behind each other. Every call for a thread goes to that
+    thread's shard; listing without a thread id reads all shards.
+    """
+
+    def __init__(self, shards: List[AsyncSqliteSaver]):
+        super().__init__(serde=shards[0].serde)
+        self.shards = shards
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.shards[0].loop
+
+    @property
+    def config_specs(self) -> list:
+        return self.shards[0].config_specs
+
+    def shard_for(self, thread_id: Any) -> AsyncSqliteSaver:
+        return self.shards[shard_index(thread_id, len(self.shards))]
+
+    def _route(self, config: RunnableConfig) -> AsyncSqliteSaver:
+        return self.shard_for(config["configurable"]["thread_id"])
+
+    def _is_thread_scoped(self, config: Optional[RunnableConfig]) -> bool:
+        return bool(config and config.get("configurable", {}).get("thread_id") is not None)
+
+    @staticmethod
+    def _newest_first(tuples: List[CheckpointTuple], limit: Optional[int]) -> List[CheckpointTuple]:
+        # Checkpoint ids are time-ordered, as in each shard's ORDER BY checkpoint_id DESC
+        tuples.sort(key=lambda t: t.checkpoint["id"], reverse=True)
+        return tuples[:limit] if limit is not None else tuples
+
+    # --- Sync interface (from threads other than the shards' event loop) ---
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._route(config).get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        if self._is_thread_scoped(config):
+            yield from self._route(config).list(config, filter=filter, before=before, limit=limit)
+            return
+        tuples = [t for shard in self.shards for t in shard.list(config, filter=filter, before=before, limit=limit)]
+        yield from self._newest_first(tuples, limit)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self._route(config).put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._route(config).put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.shard_for(thread_id).delete_thread(thread_id)
+
+    # --- Async interface ---
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._route(config).aget_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if self._is_thread_scoped(config):
+            async for checkpoint_tuple in self._route(config).alist(config, filter=filter, before=before, limit=limit):
+                yield checkpoint_tuple
+            return
+        tuples = []
+        for shard in self.shards:
+            tuples.extend([t async for t in shard.alist(config, filter=filter, before=before, limit=limit)])
+        for checkpoint_tuple in self._newest_first(tuples, limit):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._route(config).aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._route(config).aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.shard_for(thread_id).adelete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return self.shards[0].get_next_version(current, channel)
+
+    async def aclose(self):
+        for shard in self.shards:
+            await shard.conn.close()
+
+
+async def open_sharded_checkpointer(
+    db_path: str,
+    shards: int = CHECKPOINT_SHARDS,
+    busy_timeout_ms: int = CHECKPOINT_BUSY_TIMEOUT_MS,
+) -> ShardedSqliteSaver:
+    savers = [await open_shard(path, busy_timeout_ms) for path in shard_paths(db_path, max(1, shards))]
+    logger.info(f"[CHECKPOINT] Opened {len(savers)} checkpoint shard(s) at {db_path}")
+    return ShardedSqliteSaver(savers)
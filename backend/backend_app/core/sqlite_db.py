@@ -1,3 +1,4 @@
+import re
 import sqlite3
 import json
 from datetime import datetime
@@ -6,6 +7,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 from pathlib import Path
+from shared.draft_history import materialize_history
+from shared.llm_usage import summarize_llm_usage, usage_rows
+from shared.intent_similarity import exact_intent_key, normalize_intent, intent_hash
+from shared.states import SAFETY_PASS_SCORE, CLINICAL_PASS_SCORE
 
 DB_PATH = str(Path(__file__).resolve().parents[1] / "cerina_foundry.db")
 
@@ -28,19 +33,182 @@ def init_db():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_protocols_history_run_id ON protocols_history (run_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_protocols_history_created_at ON protocols_history (created_at)")
+
+    # Full-text index over intents and drafts (see core/history_search.py). External
+    # content: the text lives only in protocols_history; triggers keep the index in sync.
+    fts_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'protocols_history_fts'"
+    ).fetchone()
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS protocols_history_fts USING fts5(
+        user_intent, final_draft,
+        content='protocols_history', content_rowid='rowid',
+        tokenize='porter unicode61'
+    )
+    """)
+    cursor.executescript("""
+    CREATE TRIGGER IF NOT EXISTS protocols_history_fts_insert AFTER INSERT ON protocols_history BEGIN
+        INSERT INTO protocols_history_fts (rowid, user_intent, final_draft)
+        VALUES (new.rowid, new.user_intent, new.final_draft);
+    END;
+    CREATE TRIGGER IF NOT EXISTS protocols_history_fts_delete AFTER DELETE ON protocols_history BEGIN
+        INSERT INTO protocols_history_fts (protocols_history_fts, rowid, user_intent, final_draft)
+        VALUES ('delete', old.rowid, old.user_intent, old.final_draft);
+    END;
+    CREATE TRIGGER IF NOT EXISTS protocols_history_fts_update AFTER UPDATE ON protocols_history BEGIN
+        INSERT INTO protocols_history_fts (protocols_history_fts, rowid, user_intent, final_draft)
+        VALUES ('delete', old.rowid, old.user_intent, old.final_draft);
+        INSERT INTO protocols_history_fts (rowid, user_intent, final_draft)
+        VALUES (new.rowid, new.user_intent, new.final_draft);
+    END;
+    """)
+    if not fts_exists:
+        # Databases archived before the index existed: index their rows once
+        cursor.execute("INSERT INTO protocols_history_fts (protocols_history_fts) VALUES ('rebuild')")
+
+    # Normalized intents of the archived protocols that may seed new runs (see core/intent_index.py):
+    # exact_hash is the hash of the order-preserving intent, normalized_intent the content-word bag
+    intent_columns = {row[1] for row in cursor.execute("PRAGMA table_info(intent_index)")}
+    if intent_columns and "exact_hash" not in intent_columns:
+        # Older tables hashed the content-word bag; rebuild them with the exact key
+        cursor.execute("DROP TABLE intent_index")
+        intent_columns = set()
+    intent_index_exists = bool(intent_columns)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS intent_index (
+        protocol_id TEXT PRIMARY KEY,
+        exact_hash TEXT NOT NULL,
+        normalized_intent TEXT NOT NULL
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_intent_index_exact_hash ON intent_index (exact_hash)")
+    if not intent_index_exists:
+        # Protocols archived before the index existed
+        rows = cursor.execute("SELECT id, user_intent, final_draft, final_state_json FROM protocols_history").fetchall()
+        records = []
+        for protocol_id, intent, draft, state_json in rows:
+            try:
+                state = json.loads(state_json or "{}")
+            except ValueError:
+                continue
+            record = build_intent_record(protocol_id, {**state, "user_intent": intent, "current_draft": draft})
+            if record:
+                records.append(record)
+        cursor.executemany(INSERT_INTENT_SQL, records)
+
+    # LLM usage of each archived protocol, one row per graph node (see shared/llm_usage.py)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS protocol_llm_usage (
+        protocol_id TEXT NOT NULL,
+        run_id TEXT,
+        node TEXT NOT NULL,
+        calls INTEGER,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        latency_ms REAL,
+        PRIMARY KEY (protocol_id, node)
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_protocol_llm_usage_run ON protocol_llm_usage (run_id)")
+
+    # Content-addressed cache of evaluator results (see core/eval_cache.py)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS evaluation_cache (
+        cache_key TEXT PRIMARY KEY,
+        evaluator TEXT,
+        result_json TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Durable workflow job queue with worker leases (see core/job_queue.py)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS workflow_jobs (
+        job_id TEXT PRIMARY KEY,
+        thread_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        payload_json TEXT,
+        status TEXT NOT NULL,
+        attempts INTEGER DEFAULT 0,
+        lease_owner TEXT,
+        lease_expires_at REAL,
+        last_error TEXT,
+        updated_at REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_workflow_jobs_status ON workflow_jobs (status, lease_expires_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_workflow_jobs_thread ON workflow_jobs (thread_id)")
     
     conn.commit()
     conn.close()
     logger.info(f" Database initialized at {DB_PATH}")
 
-def log_final_protocol(run_id: str, final_state: dict):
+INSERT_PROTOCOL_SQL = """
+    INSERT INTO protocols_history 
+    (id, run_id, user_intent, final_draft, iteration_count, final_state_json)
+    VALUES (?, ?, ?, ?, ?, ?)
     """
-    Logs a finalized protocol to the history table, including the full state
-    for comprehensive auditing.
+
+INSERT_USAGE_SQL = """
+    INSERT INTO protocol_llm_usage
+    (protocol_id, run_id, node, calls, prompt_tokens, completion_tokens, latency_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+
+def build_usage_records(protocol_id: str, run_id: str, final_state: dict) -> list:
+    """Per-node protocol_llm_usage rows for the protocol row `protocol_id`."""
+    summary = summarize_llm_usage(final_state.get('llm_usage'))
+    return [(protocol_id, run_id, *row) for row in usage_rows(summary)]
+
+INSERT_INTENT_SQL = """
+    INSERT OR REPLACE INTO intent_index (protocol_id, exact_hash, normalized_intent)
+    VALUES (?, ?, ?)
+    """
+
+def _score(assessment, field: str):
+    """A score from an assessment model, its dict form, or its str() form (archived JSON)."""
+    if assessment is None:
+        return None
+    value = assessment.get(field) if isinstance(assessment, dict) else getattr(assessment, field, None)
+    if value is None and isinstance(assessment, str):
+        match = re.search(rf"{field}=([0-9.]+)", assessment)
+        value = match.group(1) if match else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def is_reusable(final_state: dict) -> bool:
+    """
+    Approved by a human (UI runs), or passed both evaluators (M2M runs skip the review).
+    Drafts adapted from a similar intent's protocol are never reusable: the evaluators do
+    not see the intent, so a mismatch that survived adaptation must not spread further.
+    """
+    if final_state.get('seeded_from_protocol_id'):
+        return False
+    if final_state.get('status') == "COMPLETED":
+        return True
+    safety = _score(final_state.get('safety_assessment'), 'safety_score')
+    clinical = _score(final_state.get('clinical_critique'), 'overall_score')
+    return safety is not None and clinical is not None and safety >= SAFETY_PASS_SCORE and clinical >= CLINICAL_PASS_SCORE
+
+def build_intent_record(protocol_id: str, final_state: dict):
+    """The intent_index row of an archived protocol, or None if it may not seed new runs."""
+    intent = final_state.get('user_intent', '')
+    normalized = normalize_intent(intent)
+    if not normalized or not final_state.get('current_draft') or not is_reusable(final_state):
+        return None
+    return (protocol_id, intent_hash(exact_intent_key(intent)), normalized)
+
+def build_protocol_record(run_id: str, final_state: dict) -> tuple:
+    """
+    Extracts and serializes the columns of one protocols_history row.
+    Shared by the synchronous logger and the background archiver.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     import uuid
     record_id = str(uuid.uuid4())
     
@@ -50,6 +218,10 @@ def log_final_protocol(run_id: str, final_state: dict):
     draft = final_state.get('current_draft', '')
     iterations = final_state.get('iteration_count', 0)
 
+    # The audit record keeps full draft texts, not the checkpoint's delta encoding
+    if final_state.get('draft_history'):
+        final_state = {**final_state, 'draft_history': materialize_history(final_state['draft_history'])}
+
     # The default=str handles complex objects like Pydantic models, UUIDs, or datetimes.
     try:
         serialized_state = json.dumps(final_state, default=str)
@@ -57,18 +229,30 @@ def log_final_protocol(run_id: str, final_state: dict):
         # Fallback in case of highly complex objects that can't be stringified
         logger.info(f" Warning: Could not serialize full state. Storing partial JSON. Error: {e}")
         serialized_state = json.dumps({"error": str(e), "partial_state": draft})
-        
+
+    return (record_id, run_id, intent, draft, iterations, serialized_state)
+
+def log_final_protocol(run_id: str, final_state: dict):
+    """
+    Logs a finalized protocol to the history table, including the full state
+    for comprehensive auditing.
+    Synchronous path; the graph normally goes through core.archiver instead.
+    """
+    record = build_protocol_record(run_id, final_state)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
     
     # --- Insertion ---
-    cursor.execute("""
-    INSERT INTO protocols_history 
-    (id, run_id, user_intent, final_draft, iteration_count, final_state_json)
-    VALUES (?, ?, ?, ?, ?, ?)
-    """, (record_id, run_id, intent, draft, iterations, serialized_state))
+    cursor.execute(INSERT_PROTOCOL_SQL, record)
+    cursor.executemany(INSERT_USAGE_SQL, build_usage_records(record[0], run_id, final_state))
+    intent_record = build_intent_record(record[0], final_state)
+    if intent_record:
+        cursor.execute(INSERT_INTENT_SQL, intent_record)
     
     conn.commit()
     conn.close()
-    logger.info(f"Protocol archived with full audit data (ID: {record_id})")
+    logger.info(f"Protocol archived with full audit data (ID: {record[0]})")
 
 if __name__ == "__main__":
     # Run this file directly to set up the DB: `python api/core/db.py`
@@ -0,0 +1,99 @@
+import os
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from shared.llm_usage import summarize_llm_usage
+
+logger = logging.getLogger(__name__)
+
+# Active threads whose latest state summary is kept in memory
+HOT_STATE_MAX_THREADS = int(os.getenv("HOT_STATE_MAX_THREADS", "1024"))
+
+# Statuses after which a thread no longer changes, so it is not kept hot
+FINAL_STATUSES = {"COMPLETED"}
+
+
+class HotStateCache:
+    """
+    Latest state summary per active thread (status, draft, iteration, critique, thoughts,
+    LLM usage),
+    so `/status` polling is a dictionary lookup instead of a checkpoint read + deserialize.
+
+    Job workers seed a thread when they claim its run and feed node outputs in as the graph
+    emits them; a miss (including threads run by another process) falls back to the
+    checkpointer and the job table (see main.py). Threads are evicted when they
+    finalize, and least-recently-used threads once `max_threads` is exceeded.
+    """
+
+    def __init__(self, max_threads: int = HOT_STATE_MAX_THREADS):
+        self.max_threads = max_threads
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(thread_id)
+        self.hits += 1
+        return entry
+
+    def seed(self, thread_id: str, state: Dict[str, Any]):
+        """Replaces the summary from a full state (initial state, checkpoint or final result)."""
+        summary = {
+            "status": state.get("status", "UNKNOWN"),
+            "current_draft": state.get("current_draft", "") or "",
+            "iteration_count": state.get("iteration_count", 0) or 0,
+            "critique": state.get("clinical_critique"),
+            "agent_thoughts": list(state.get("agent_thoughts") or []),
+            "llm_usage": summarize_llm_usage(state.get("llm_usage")),
+        }
+        if summary["status"] in FINAL_STATUSES:
+            self.evict(thread_id)
+            return
+        self._entries[thread_id] = summary
+        self._entries.move_to_end(thread_id)
+        while len(self._entries) > self.max_threads:
+            self._entries.popitem(last=False)
+
+    def apply_update(self, thread_id: str, output: Dict[str, Any]):
+        """
+        Merges one node's output (a partial state update) into the summary, following the
+        state reducers: agent_thoughts and llm_usage are appended, everything else is overwritten.
+        Updates for threads that are not cached are dropped; the next read re-seeds them.
+        """
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            return
+        for key in ("status", "current_draft", "iteration_count"):
+            if key in output:
+                entry[key] = output[key]
+        if "clinical_critique" in output:
+            entry["critique"] = output["clinical_critique"]
+        if output.get("agent_thoughts"):
+            entry["agent_thoughts"] = entry["agent_thoughts"] + list(output["agent_thoughts"])
+        if output.get("llm_usage"):
+            entry["llm_usage"] = summarize_llm_usage(output["llm_usage"], entry["llm_usage"])
+
+        if entry["status"] in FINAL_STATUSES:
+            self.evict(thread_id)
+
+    def evict(self, thread_id: str):
+        self._entries.pop(thread_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "threads": len(self._entries),
+            "max_threads": self.max_threads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Process-wide instance shared by the API handlers
+hot_state_cache = HotStateCache()
@@ -1,17 +1,34 @@
+from core.bootstrap import load_environment, configure_stdio, prewarm
+# .env must be loaded before the modules below read their config constants
+load_environment()
+configure_stdio()
+
 import uuid
 import asyncio
-from core.sqlite_db import init_db
 import traceback
 import contextlib
-from typing import AsyncIterator
-from fastapi import FastAPI, HTTPException, status
+from typing import AsyncIterator, Tuple
+from fastapi import FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Literal, Optional, Any
 from langgraph.checkpoint.base import Checkpoint
 from shared.states import BlackboardState, ClinicalReview
+from shared.draft_history import materialize_history
+from shared.llm_usage import LLMUsageSummary, summarize_llm_usage
 from langgraph.types import Command
-from core.graph import build_graph
+from core.graph import close_checkpointers
+from core.eval_cache import evaluation_cache
+from core.archiver import protocol_archiver
+from core.state_cache import hot_state_cache
+from core.event_log import event_hub, format_sse, ThreadEventLog
+from core.job_queue import job_queue, Job, JobWorkerPool, JOB_FAILED, JOB_POLL_SECONDS, ACTIVE_JOB_STATUSES
+from core.history_search import history_search, InvalidCursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.intent_index import intent_index
+from core.checkpoint_sweeper import CheckpointSweeper
+from core.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, SSE_ACTIVE_STREAMS, awaiting_review_threads
+from agents.llm import get_rate_limiter
+from agents.workers import DRAFT_PATCH_TAG
 import logging
 logger = logging.getLogger(__name__)
 
@@ -47,6 +64,24 @@ class StatusResponse(BaseModel):
     iteration_count: int
     critique: Optional[ClinicalReview] = None
     agent_thoughts: List[Dict] = Field(default_factory=list)
+    draft_history: Optional[List[str]] = Field(None, description="Every draft version, oldest first (only when requested).")
+    llm_usage: Optional[LLMUsageSummary] = Field(None, description="Tokens and LLM wall time of the thread so far, in total and per node.")
+
+
+class HistoryHit(BaseModel):
+    """One archived protocol in /history/search results."""
+    id: str
+    run_id: str
+    user_intent: str
+    iteration_count: int
+    created_at: str
+    snippet: str = Field(description="Best-matching passage, matched terms in [brackets] (start of the draft without a query).")
+    score: Optional[float] = Field(None, description="BM25 relevance (higher is better); only for relevance order.")
+
+
+class HistorySearchResponse(BaseModel):
+    results: List[HistoryHit]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` for the next page; null on the last page.")
 
 # --- 2. FastAPI Setup ---
 
@@ -58,20 +93,30 @@ async def lifespan_handler(app: FastAPI) -> AsyncIterator[None]:
     """
     
     # --- STARTUP LOGIC ---
-    try:
-        # Run the synchronous init_db function in a separate thread
-        await asyncio.to_thread(init_db)
-        logger.info("Sqlite Database initialization complete.")
-    except Exception as e:
-        logger.info(f"[LIFESPAN] CRITICAL ERROR during DB initialization: {e}")
-        
-    app.state.graph = await build_graph()
+    # DB tables, compiled graph, LLM clients and archiver are ready before the first request
+    app.state.graph = await prewarm()
+    # Retention for the checkpoint files: compaction, review TTL, incremental VACUUM (per shard)
+    app.state.checkpoint_sweepers = [CheckpointSweeper(shard) for shard in app.state.graph.checkpointer.shards]
+    for sweeper in app.state.checkpoint_sweepers:
+        sweeper.start()
+    # Workflow runs are queued jobs; JOB_WORKERS of them run concurrently in this process
+    app.state.job_workers = JobWorkerPool(job_queue, run_workflow_job)
+    await app.state.job_workers.start()
     
     yield  # <-- This yields control back to the application to run
 
     # --- SHUTDOWN LOGIC (runs after the server shuts down) ---
     logger.info("[LIFESPAN] Shutting down.")
-    # If you had a DB connection pool that needed closing, it would go here.
+    # Stop the job workers before the graph goes away; their jobs go back to the queue
+    await app.state.job_workers.stop()
+    for sweeper in app.state.checkpoint_sweepers:
+        await sweeper.stop()
+    # Flush protocols still queued in the write-behind archiver
+    await protocol_archiver.stop()
+    await close_checkpointers()
+    job_queue.close()
+    history_search.close()
+    intent_index.close()
 
 app = FastAPI(title="Cerina Clinical Foundry API", version="1.0.0",lifespan=lifespan_handler)
 
@@ -87,12 +132,237 @@ app.add_middleware(
 
 import json
 import uuid
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from typing import AsyncGenerator
 
-@app.post("/start") 
+# ----------------------------------------------------------------------
+# Workflow event stream
+# ----------------------------------------------------------------------
+async def workflow_events(graph, graph_input, config: dict, thread_id: str, draft_iteration: int = 0) -> AsyncGenerator[dict, None]:
+    """
+    Runs the graph (a new run or a resume Command) and yields one SSE payload per event.
+    Runs happen in a job worker; clients read them from the thread's event log, so a
+    dropped connection does not cancel the workflow.
+    """
+    # draft_iteration: drafter pass currently streaming tokens (matches the iteration_count it will produce)
+    try:
+        # Iterate over the LangGraph workflow progress events
+        async for event in graph.astream_events(graph_input, config=config, version="v2"):
+            
+            event_type = event["event"]
+            node_name = event.get("name")
+
+            # --- Final Result: the root run ends (graph finished or paused for human review) ---
+            if event_type == "on_chain_end" and not event.get("parent_ids"):
+                final_state = event["data"]["output"] or {}
+                
+                # Send the final state data (for anything not streamed yet, like final draft)
+                final_payload = {
+                    "thread_id": thread_id,
+                    "status": final_state.get('status', 'FINISHED'),
+                    "current_draft": final_state.get('current_draft', ''),
+                    "iteration_count": final_state.get('iteration_count', 0),
+                }
+                yield {'type': 'final_result', 'data': final_payload}
+                break
+
+            # --- Track which drafter pass is running ---
+            if event_type == "on_chain_start" and node_name == "drafter_agent":
+                node_input = event["data"].get("input")
+                if isinstance(node_input, dict) and "iteration_count" in node_input:
+                    draft_iteration = (node_input.get("iteration_count") or 0) + 1
+                else:
+                    draft_iteration += 1
+
+            # --- Stream drafter tokens as they are generated (draft_delta) ---
+            # The final draft_update below remains the authoritative full text.
+            if (
+                event_type == "on_chat_model_stream"
+                and event.get("metadata", {}).get("langgraph_node") == "drafter_agent"
+            ):
+                # Patch-mode revisions stream JSON patches, not draft text
+                if DRAFT_PATCH_TAG in event.get("tags", []):
+                    continue
+                delta = event["data"]["chunk"].content
+                if isinstance(delta, str) and delta:
+                    yield {'type': 'draft_delta', 'data': {'delta': delta, 'iteration': draft_iteration}}
+                continue
+
+            
+            # --- Stream Data on Node Completion (on_node_end) ---
+            if event_type == "on_chain_end":
+                
+                output_data = event["data"]["output"]
+
+                # Node-level ends (not routers / the graph itself) update the hot /status cache
+                if isinstance(output_data, dict) and event.get("metadata", {}).get("langgraph_node") == node_name:
+                    hot_state_cache.apply_update(thread_id, output_data)
+
+                # --- Stream node status updates ---
+                if "status" in output_data:
+                    yield {'type': 'status_update','data': {'status': output_data['status'],'node': node_name}}
+                                
+                # --- Stream draft updates from drafter_agent ---
+                if node_name == "drafter_agent" and "current_draft" in output_data:
+                    yield {'type': 'draft_update','data': {'current_draft': output_data['current_draft'],'iteration': output_data.get('iteration_count')}}
+
+                # --- A. Stream the Agent's High-Level Thought ---
+                # Check the 'agent_thoughts' field which is updated in every agent function
+
+                if 'agent_thoughts' in output_data and output_data['agent_thoughts']:
+                    # Assuming the agent_thoughts field returns a list of dictionaries, 
+                    # and we want to stream the latest thought (the last one added)
+                    latest_thought = output_data['agent_thoughts'][-1]
+                    yield {'type': 'agent_thought', 'data': latest_thought}
+                
+                # --- B. Evaluator cancelled by early termination: a skip marker instead of its report ---
+                if node_name in ("safety_guardian_agent", "clinical_critic_agent") and output_data.get('evaluation_skipped') is not None:
+                    yield {'type': 'evaluation_skipped', 'data': output_data['evaluation_skipped'].model_dump()}
+
+                # --- C. Stream the Safety Assessment ---
+                elif node_name == "safety_guardian_agent" and 'safety_assessment' in output_data:
+                    # Convert the Pydantic object to a dictionary
+                    assessment_dict = output_data['safety_assessment'].model_dump()
+                    yield {'type': 'safety_report', 'data': assessment_dict}
+                
+                # --- D. Stream the Clinical Critique ---
+                elif node_name == "clinical_critic_agent" and 'clinical_critique' in output_data:
+                    # Convert the Pydantic object to a dictionary
+                    critique_dict = output_data['clinical_critique'].model_dump()
+                    yield {'type': 'critique_report', 'data': critique_dict}
+
+    except asyncio.CancelledError:
+        logger.info("Workflow run cancelled")
+        raise
+    except Exception as e:
+        # Partial run: let /status read the checkpoint instead
+        hot_state_cache.evict(thread_id)
+        logger.info(f"ERROR IN WORKFLOW: {str(e)}")
+        # EventHub.run reports it to subscribers; the job queue retries from the checkpoint
+        raise
+
+
+async def run_workflow_job(job: Job):
+    """
+    Job handler: runs a queued "start" or "resume" job into the thread's event log.
+    A retried job (failed attempt, crashed worker) continues from the thread's last
+    checkpoint instead of starting over.
+    """
+    thread_id = job.thread_id
+    config = {"configurable": {"thread_id": thread_id}}
+    clinical_foundry_graph = app.state.graph
+
+    snapshot = await clinical_foundry_graph.aget_state(config)
+    paused = any(task.interrupts for task in snapshot.tasks)
+    graph_input, runnable = None, True
+    if not snapshot.values:
+        graph_input = job.payload
+        runnable = job.kind == "start"
+    elif job.kind == "resume" and paused:
+        graph_input = Command(resume=job.payload)
+    else:
+        # An earlier attempt stopped mid-run: a None input continues from the checkpoint.
+        # A thread already paused for review (or finished) has nothing left to run.
+        runnable = bool(snapshot.next) and not paused
+
+    # The event log and the hot /status entry belong to the process that runs the job:
+    # they are opened / seeded here, once a local worker has claimed it
+    log = event_hub.open(thread_id)
+    if not runnable:
+        logger.info(f"[JOBS] Thread {thread_id} has nothing to run for {job.kind} job {job.job_id}.")
+        log.finish()
+        return
+
+    state = snapshot.values or job.payload
+    hot_state_cache.seed(thread_id, state)
+
+    async def run_events() -> AsyncGenerator[dict, None]:
+        yield {'type': 'meta', 'thread_id': thread_id, 'status': 'STARTING' if job.kind == "start" else 'RUNNING'}
+        async for payload in workflow_events(
+            clinical_foundry_graph, graph_input, config, thread_id, state.get("iteration_count", 0)
+        ):
+            yield payload
+
+    try:
+        await event_hub.run(log, run_events())
+    except Exception:
+        if job.kind == "resume" and job.attempts >= job_queue.max_attempts:
+            # The review decision will not be retried: the thread no longer awaits one
+            awaiting_review_threads.discard(thread_id)
+        raise
+
+
+def stream_events(events: AsyncIterator[Tuple[Optional[int], str]]) -> StreamingResponse:
+    """SSE response of (id, json) events (see ThreadEventLog.subscribe)."""
+    async def event_generator() -> AsyncGenerator[str, None]:
+        SSE_ACTIVE_STREAMS.inc()
+        try:
+            async for event_id, data in events:
+                yield format_sse(event_id, data)
+        finally:
+            SSE_ACTIVE_STREAMS.dec()
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+def stream_event_log(log: ThreadEventLog, last_event_id: int = 0) -> StreamingResponse:
+    """SSE response replaying the thread's events after `last_event_id`, then following the run."""
+    return stream_events(log.subscribe(last_event_id))
+
+
+async def thread_outcome(thread_id: str, job: Optional[Job]) -> dict:
+    """Final event of a run this process did not stream, from the job table and the checkpoint."""
+    if job is not None and job.status == JOB_FAILED:
+        return {'type': 'error', 'message': f"Workflow failed: {job.last_error}"}
+    snapshot = await app.state.graph.aget_state({"configurable": {"thread_id": thread_id}})
+    state = snapshot.values or {}
+    return {'type': 'final_result', 'data': {
+        "thread_id": thread_id,
+        "status": state.get('status', 'UNKNOWN'),
+        "current_draft": state.get('current_draft', ''),
+        "iteration_count": state.get('iteration_count', 0),
+    }}
+
+
+async def follow_queued_run(thread_id: str, after_id: int) -> AsyncIterator[Tuple[Optional[int], str]]:
+    """
+    Events of the thread's queued job: follows its event log once a worker in this process
+    opens it. A job claimed by another process (or with JOB_WORKERS=0, enqueue only) is
+    watched in the job table and reported from the checkpoint when it ends.
+    """
+    log = event_hub.get(thread_id)
+    seen = log.last_id if log is not None else 0
+    queued_sent = False
+    while True:
+        log = event_hub.get(thread_id)
+        if log is not None and log.running:
+            async for item in log.subscribe(after_id):
+                yield item
+            return
+        job = await asyncio.to_thread(job_queue.latest_for_thread, thread_id)
+        if job is None or job.status not in ACTIVE_JOB_STATUSES:
+            break
+        if not queued_sent:
+            yield None, json.dumps({'type': 'meta', 'thread_id': thread_id, 'status': 'QUEUED'})
+            queued_sent = True
+        await event_hub.wait_opened(JOB_POLL_SECONDS)
+
+    log = event_hub.get(thread_id)
+    if log is not None and log.last_id > seen:
+        # Ran here between two checks: replay it
+        async for item in log.subscribe(after_id):
+            yield item
+        return
+    yield None, json.dumps(await thread_outcome(thread_id, job))
+
+
+@app.post("/start", status_code=status.HTTP_202_ACCEPTED)
 async def start_workflow(request: StartRequest):
+    """
+    Queues a new workflow and returns its thread id without waiting for it to run.
+    Follow it with GET /stream/{thread_id} (SSE) or poll GET /status/{thread_id}.
+    """
     thread_id = str(uuid.uuid4())
     
     initial_state = BlackboardState(
@@ -111,128 +381,179 @@ async def start_workflow(request: StartRequest):
     )
     state_thread_id =initial_state.get("thread_id")
     logger.info(f"[API] Starting workflow for thread_id: {thread_id},State Thread Id: {state_thread_id}")
-    config = {"configurable": {"thread_id": thread_id}}
-    
-    # ----------------------------------------------------------------------
-    # Define the Streaming Generator
-    # ----------------------------------------------------------------------
-    async def event_generator() -> AsyncGenerator[str, None]:
-        # 1. Send initial metadata
-        yield f"data: {json.dumps({'type': 'meta', 'thread_id': thread_id, 'status': 'STARTING'})}\n\n"
-        clinical_foundry_graph =  app.state.graph
-        try:
-            # Iterate over the LangGraph workflow progress events
-            async for event in clinical_foundry_graph.astream_events(initial_state, config=config, version="v2"):
-                
-                event_type = event["event"]
-                node_name = event.get("name")
+    # Until a worker claims the job, /status and /stream answer from the job table
+    job_id = await app.state.job_workers.submit(thread_id, "start", dict(initial_state))
+    return {"thread_id": thread_id, "job_id": job_id, "status": "QUEUED", "stream_url": f"/stream/{thread_id}"}
 
-                
-                # --- Stream Data on Node Completion (on_node_end) ---
-                if event_type == "on_chain_end":
-                    
-                    output_data = event["data"]["output"]
-                    # --- Stream node status updates ---
-                    if "status" in output_data:
-                        yield f"data: {json.dumps({'type': 'status_update','data': {'status': output_data['status'],'node': node_name}})}\n\n"
-                                    
-                    # --- Stream draft updates from drafter_agent ---
-                    if node_name == "drafter_agent" and "current_draft" in output_data:
-                        yield f"data: {json.dumps({'type': 'draft_update','data': {'current_draft': output_data['current_draft'],'iteration': output_data.get('iteration_count')}})}\n\n"
-
-                    # --- A. Stream the Agent's High-Level Thought ---
-                    # Check the 'agent_thoughts' field which is updated in every agent function
-
-                    if 'agent_thoughts' in output_data and output_data['agent_thoughts']:
-                        # Assuming the agent_thoughts field returns a list of dictionaries, 
-                        # and we want to stream the latest thought (the last one added)
-                        latest_thought = output_data['agent_thoughts'][-1]
-                        yield f"data: {json.dumps({'type': 'agent_thought', 'data': latest_thought})}\n\n"
-                    
-                    # --- B. Stream the Safety Assessment ---
-                    if node_name == "safety_guardian_agent" and 'safety_assessment' in output_data:
-                        # Convert the Pydantic object to a dictionary
-                        assessment_dict = output_data['safety_assessment'].model_dump()
-                        yield f"data: {json.dumps({'type': 'safety_report', 'data': assessment_dict})}\n\n"
-                    
-                    # --- C. Stream the Clinical Critique ---
-                    elif node_name == "clinical_critic_agent" and 'clinical_critique' in output_data:
-                        # Convert the Pydantic object to a dictionary
-                        critique_dict = output_data['clinical_critique'].model_dump()
-                        yield f"data: {json.dumps({'type': 'critique_report', 'data': critique_dict})}\n\n"
-
-
-                # --- 4. Final Result / Graph End ---
-                if event_type == "on_graph_end":
-                    final_state = event["data"]["output"]
-                    
-                    # Send the final state data (for anything not streamed yet, like final draft)
-                    final_payload = {
-                        "thread_id": thread_id,
-                        "status": final_state.get('status', 'FINISHED'),
-                        "current_draft": final_state.get('current_draft', ''),
-                        "iteration_count": final_state.get('iteration_count', 0),
-                        # Note: agent_thoughts and critiques might be duplicates, but safe to send
-                    }
-                    yield f"data: {json.dumps({'type': 'final_result', 'data': final_payload})}\n\n"
-                    break
-        except asyncio.CancelledError:
-            logger.info("SSE cancelled")
-            raise
-        except Exception as e:
-            # Send an error event to the frontend before closing the connection
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Workflow failed: {str(e)}'})}\n\n"
-            logger.info("ERROR IN WORKFLOW:", str(e))
-   
-            
-    # ----------------------------------------------------------------------
-    # Return the Streaming Response
-    # ----------------------------------------------------------------------
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+async def queue_resume(thread_id: str, resume: dict) -> str:
+    """
+    Queues the resume of a paused thread. Resumes run only as jobs, so they never overlap
+    another run of the same thread; one already queued or running is a 409.
+    """
+    snapshot = await app.state.graph.aget_state({"configurable": {"thread_id": thread_id}})
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    job = await asyncio.to_thread(job_queue.latest_for_thread, thread_id)
+    if job is not None and job.status in ACTIVE_JOB_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Thread {thread_id} already has a queued or running job")
+    # /status reads the checkpoint until a worker here claims the job (it may run elsewhere)
+    hot_state_cache.evict(thread_id)
+    return await app.state.job_workers.submit(thread_id, "resume", resume)
+
+
+async def stream_resume(thread_id: str, resume: dict) -> StreamingResponse:
+    """
+    Queues the resume of a paused thread and streams the same event types as /start
+    (status_update, draft_update, safety_report, critique_report, final_result, ...).
+    The response starts after the events the thread's log already holds; the run can be
+    re-attached with GET /stream/{thread_id} like any other.
+    """
+    log = event_hub.get(thread_id)
+    already_sent = log.last_id if log is not None else 0
+    await queue_resume(thread_id, resume)
+    return stream_events(follow_queued_run(thread_id, already_sent))
+
+
+@app.get("/stream/{thread_id}")
+async def stream_thread(thread_id: str, last_event_id: Optional[int] = Header(None)):
+    """
+    Re-attaches to a thread's event stream: replays every event after the Last-Event-ID
+    header, then follows the run live. Any number of tabs/observers can subscribe.
+    A queued job is waited for; a run this process did not stream ends with its outcome.
+    """
+    last_event_id = last_event_id or 0
+    log = event_hub.get(thread_id)
+    if log is not None and log.running:
+        return stream_event_log(log, last_event_id)
+
+    job = await asyncio.to_thread(job_queue.latest_for_thread, thread_id)
+    if job is not None and job.status in ACTIVE_JOB_STATUSES:
+        return stream_events(follow_queued_run(thread_id, last_event_id))
+    if log is not None:
+        return stream_event_log(log, last_event_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No event stream for this thread (use /status)")
+
+    async def outcome() -> AsyncIterator[Tuple[Optional[int], str]]:
+        yield None, json.dumps(await thread_outcome(thread_id, job))
+    return stream_events(outcome())
+
+@app.get("/eval-cache/stats")
+async def get_eval_cache_stats():
+    """Hit/miss counters of the evaluator result cache."""
+    return evaluation_cache.stats()
+
+
+@app.get("/intent-reuse/stats")
+async def get_intent_reuse_stats():
+    """Lookups of the approved-protocol intent index by first drafts (exact, near, miss)."""
+    return intent_index.stats()
+
+@app.get("/llm/limits")
+async def get_llm_limits():
+    """Current per-key rate limits and adaptive concurrency of the shared LLM limiter."""
+    return get_rate_limiter().gauge()
+
+@app.get("/stream-hub/stats")
+async def get_stream_hub_stats():
+    """Threads with a replayable event log, and how many are still running."""
+    return event_hub.stats()
+
+@app.get("/jobs/stats")
+async def get_job_stats():
+    """Workers in this process, and queued / running / done / failed jobs overall."""
+    return await asyncio.to_thread(app.state.job_workers.stats)
+
+@app.get("/status-cache/stats")
+async def get_status_cache_stats():
+    """Hit/miss counters of the in-memory /status cache."""
+    return hot_state_cache.stats()
+
+@app.get("/history/search", response_model=HistorySearchResponse)
+async def search_history(
+    q: str = "",
+    run_id: Optional[str] = None,
+    order: Literal["relevance", "recent"] = "relevance",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """
+    Archived protocols: full-text search over intents and drafts (`q`, ranked or newest
+    first), every protocol of one run (`run_id`), or the newest protocols (neither).
+    Pages with `next_cursor` (keyset pagination).
+    """
+    try:
+        return await asyncio.to_thread(history_search.search, q, run_id, order, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Node, LLM, supervisor and stream metrics of this process in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+async def resume_and_wait(thread_id: str, resume: dict) -> dict:
+    """Queues a resume, waits for its job to finish (here or elsewhere) and returns the thread's state."""
+    job_id = await queue_resume(thread_id, resume)
+    job = await app.state.job_workers.wait(job_id)
+    if job is None or job.status == JOB_FAILED:
+        raise RuntimeError(job.last_error if job is not None else f"job {job_id} disappeared")
+    snapshot = await app.state.graph.aget_state({"configurable": {"thread_id": thread_id}})
+    return snapshot.values
 
 @app.get("/status/{thread_id}", response_model=StatusResponse)
-async def get_workflow_status(thread_id: str):
+async def get_workflow_status(thread_id: str, include_history: bool = False):
     """Required for the UI to 'fetch the current state'"""
+    # Hot path: active threads are answered from memory
+    if not include_history:
+        summary = hot_state_cache.get(thread_id)
+        if summary is not None:
+            return StatusResponse(thread_id=thread_id, **summary)
+
     config = {"configurable": {"thread_id": thread_id}}
     clinical_foundry_graph =  app.state.graph
     checkpoint = await asyncio.to_thread(clinical_foundry_graph.checkpointer.get, config)
 
     if not checkpoint:
-        raise HTTPException(status_code=404, detail="Thread not found")
+        # Queued (or failed) before the first checkpoint was written
+        job = await asyncio.to_thread(job_queue.latest_for_thread, thread_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        return StatusResponse(
+            thread_id=thread_id,
+            status="FAILED" if job.status == JOB_FAILED else "QUEUED",
+            current_draft="",
+            iteration_count=0,
+        )
     
+    # Not seeded into the hot cache: only a worker running the thread keeps an entry current
     state = checkpoint['channel_values']
-    
+
     return StatusResponse(
         thread_id=thread_id,
         status=state.get('status', 'UNKNOWN'),
         current_draft=state.get('current_draft', ''),
         iteration_count=state.get('iteration_count', 0),
         critique=state.get('clinical_critique'),
-        agent_thoughts=state.get('agent_thoughts', [])
+        agent_thoughts=state.get('agent_thoughts', []),
+        draft_history=materialize_history(state.get('draft_history', [])) if include_history else None,
+        llm_usage=summarize_llm_usage(state.get('llm_usage')),
     )
 @app.post("/approve", response_model=StatusResponse)
 async def approve_draft(request: ApproveRequest):
 
-    config = {"configurable": {"thread_id": request.thread_id}}
-    clinical_foundry_graph = app.state.graph
-
     try:
-        resume_command = Command(
-            resume={
-                "approved": True,
-                "final_draft": request.final_draft,
-                "human_decision": "approve"
-            }
-        )
-
-        result = await clinical_foundry_graph.ainvoke(
-            resume_command,
-            config=config
-        )
-
-        final_state = result
-
+        final_state = await resume_and_wait(request.thread_id, {
+            "approved": True,
+            "final_draft": request.final_draft,
+            "human_decision": "approve"
+        })
+
+    except HTTPException:
+        raise
     except Exception as e:
+        hot_state_cache.evict(request.thread_id)
         logger.exception("ERROR IN APPROVAL")
         raise HTTPException(
             status_code=500,
@@ -246,6 +567,7 @@ async def approve_draft(request: ApproveRequest):
         iteration_count=final_state.get("iteration_count", 0),
         critique=final_state.get("clinical_critique"),
         agent_thoughts=final_state.get("agent_thoughts", []),
+        llm_usage=summarize_llm_usage(final_state.get("llm_usage")),
     )
 
 
@@ -254,26 +576,16 @@ async def revise_draft(request: ReviseRequest):
     """
     Human edits the draft and sends it back for another iteration.
     """
-    config = {"configurable": {"thread_id": request.thread_id}}
-
-    clinical_foundry_graph = app.state.graph
-
     try:
-        resume_command = Command(
-            resume={
-                "approved": False,
-                "human_decision": "revise"
-            }
-        )
-
-        result = await clinical_foundry_graph.ainvoke(
-            resume_command,
-            config=config
-        )
-
-        final_state = result
+        final_state = await resume_and_wait(request.thread_id, {
+            "approved": False,
+            "human_decision": "revise"
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
+        hot_state_cache.evict(request.thread_id)
         raise HTTPException(
             status_code=500,
             detail=f"Revision failed: {str(e)}"
@@ -286,4 +598,27 @@ async def revise_draft(request: ReviseRequest):
         iteration_count=final_state.get("iteration_count", 0),
         critique=final_state.get("clinical_critique"),
         agent_thoughts=final_state.get("agent_thoughts", []),
+        llm_usage=summarize_llm_usage(final_state.get("llm_usage")),
     )
+
+
+@app.post("/approve/stream")
+async def approve_draft_stream(request: ApproveRequest):
+    """Streaming /approve: finalizes the thread while emitting the /start event types."""
+    return await stream_resume(request.thread_id, {
+        "approved": True,
+        "final_draft": request.final_draft,
+        "human_decision": "approve"
+    })
+
+
+@app.post("/revise/stream")
+async def revise_draft_stream(request: ReviseRequest):
+    """
+    Streaming /revise: the drafter -> evaluators -> supervisor cycle reports progress as it
+    runs instead of holding the request open until the next review pause.
+    """
+    return await stream_resume(request.thread_id, {
+        "approved": False,
+        "human_decision": "revise"
+    })
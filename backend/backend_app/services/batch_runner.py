@@ -0,0 +1,186 @@
+"""
+Batch protocol generation through the M2M graph.
+
+Used by the MCP `create_clinical_protocols_batch` tool and as a resumable CLI:
+
+    python -m services.batch_runner --input intents.jsonl --output results.jsonl --concurrency 8
+
+Each input line is a JSON object with a `user_goal` (and optionally a `thread_id`).
+Each output line is the result for one intent, written as soon as it finishes.
+Re-running with the same files skips every thread already recorded as COMPLETED
+and resumes threads that stopped part-way from their last checkpoint.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from shared.states import BlackboardState
+from shared.llm_usage import summarize_llm_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+# Namespace for deriving stable thread ids from input lines, so re-runs map to the same threads
+BATCH_NAMESPACE = uuid.UUID("6f1c2b9e-4d0a-4f5e-9a51-3c0de1b7a2f4")
+
+
+def stable_thread_id(line_number: int, user_goal: str) -> str:
+    return str(uuid.uuid5(BATCH_NAMESPACE, f"{line_number}:{user_goal}"))
+
+
+def _result_from_state(thread_id: str, user_goal: str, state: dict) -> Dict:
+    return {
+        "thread_id": thread_id,
+        "user_goal": user_goal,
+        "status": state.get("status"),
+        "protocol_draft": state.get("current_draft"),
+        "iteration_count": state.get("iteration_count", 0),
+        "llm_usage": summarize_llm_usage(state.get("llm_usage")).model_dump(),
+        "error": None,
+    }
+
+
+async def run_protocol(app, user_goal: str, thread_id: Optional[str] = None) -> Dict:
+    """
+    Runs one intent through the graph with the HIL bypass (M2M_API).
+    If the thread already has checkpoints it is resumed (or returned as-is when completed).
+    """
+    thread_id = thread_id or str(uuid.uuid4())
+    # M2M callers get the result only once it is archived
+    config = {"configurable": {"thread_id": thread_id, "durable_archive": True}}
+
+    snapshot = await app.aget_state(config)
+    if snapshot.values and snapshot.values.get("status") == "COMPLETED":
+        return _result_from_state(thread_id, user_goal, snapshot.values)
+
+    if snapshot.next:
+        logger.info(f"[BATCH] Resuming thread {thread_id} at {snapshot.next}")
+        final_state = await app.ainvoke(None, config=config)
+    else:
+        initial_state = BlackboardState(
+            user_intent=user_goal.strip(),
+            status="STARTING",
+            thread_id=thread_id,
+            execution_context="M2M_API"
+        )
+        final_state = await app.ainvoke(initial_state, config=config)
+
+    return _result_from_state(thread_id, user_goal, final_state)
+
+
+async def iter_protocol_batch(
+    app,
+    items: Iterable[Dict],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[Dict]:
+    """
+    Runs `items` ({"user_goal", "thread_id"}) with at most `concurrency` workflows
+    in flight and yields each result as soon as it finishes. A failed item yields a
+    FAILED result instead of aborting the batch.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_item(item: Dict) -> Dict:
+        async with semaphore:
+            try:
+                return await run_protocol(app, item["user_goal"], item.get("thread_id"))
+            except Exception as e:
+                logger.exception(f"[BATCH] Item failed (thread {item.get('thread_id')}): {e}")
+                return {
+                    "thread_id": item.get("thread_id"),
+                    "user_goal": item["user_goal"],
+                    "status": "FAILED",
+                    "protocol_draft": None,
+                    "iteration_count": 0,
+                    "error": str(e),
+                }
+
+    tasks = [asyncio.create_task(run_item(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# --- CLI ---
+
+def read_intents(path: str) -> List[Dict]:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            user_goal = record.get("user_goal") or record.get("user_intent")
+            if not user_goal:
+                raise ValueError(f"{path}:{line_number}: missing 'user_goal'")
+            items.append({
+                "user_goal": user_goal,
+                "thread_id": record.get("thread_id") or stable_thread_id(line_number, user_goal),
+            })
+    return items
+
+
+def read_completed_thread_ids(path: str) -> set:
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial last line from an interrupted run
+            if record.get("status") == "COMPLETED":
+                completed.add(record.get("thread_id"))
+    return completed
+
+
+async def run_cli(input_path: str, output_path: str, concurrency: int):
+    from core.bootstrap import prewarm
+    from core.graph import close_checkpointers
+    from core.archiver import protocol_archiver
+
+    items = read_intents(input_path)
+    completed = read_completed_thread_ids(output_path)
+    pending = [item for item in items if item["thread_id"] not in completed]
+    logger.info(f"[BATCH] {len(items)} intents, {len(items) - len(pending)} already complete, {len(pending)} to run.")
+
+    app = await prewarm()
+    done = failed = 0
+    try:
+        with open(output_path, "a", encoding="utf-8") as out:
+            async for result in iter_protocol_batch(app, pending, concurrency):
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                done += 1
+                failed += result["status"] != "COMPLETED"
+                logger.info(f"[BATCH] {done}/{len(pending)} {result['thread_id']} -> {result['status']}")
+    finally:
+        await protocol_archiver.stop()
+        await close_checkpointers()
+
+    print(f"Batch finished: {done - failed} completed, {failed} not completed, {len(items) - len(pending)} skipped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a JSONL file of intents through the M2M workflow.")
+    parser.add_argument("--input", required=True, help="JSONL file with one {'user_goal': ...} per line.")
+    parser.add_argument("--output", required=True, help="JSONL results file (appended; used to resume).")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    from core.bootstrap import load_environment, configure_stdio
+    load_environment()
+    configure_stdio()
+    asyncio.run(run_cli(args.input, args.output, args.concurrency))
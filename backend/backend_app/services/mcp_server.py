@@ -1,10 +1,13 @@
 import asyncio
+import contextlib
 import uuid
 import os
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, List, Optional
 from pydantic import BaseModel, Field
-from mcp.server.fastmcp import FastMCP 
+from mcp.server.fastmcp import FastMCP, Context
 from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 import sys
 import os
 import traceback
@@ -15,14 +18,17 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent 
 sys.path.insert(0, str(PROJECT_ROOT))
-from core.graph import build_graph
+from core.bootstrap import load_environment, configure_stdio, prewarm
+# .env must be loaded before the modules below read their config constants
+load_environment()
+configure_stdio()
 from core.sqlite_db import init_db
+from services.batch_runner import iter_protocol_batch, DEFAULT_CONCURRENCY
+from core.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 DB_PATH = str(Path(__file__).parent / "cerina_foundry.db")
 # Import state models
 from shared.states import BlackboardState 
-if hasattr(sys.stdout, "reconfigure"):
-    sys.stdout.reconfigure(encoding="utf-8")
-    sys.stderr.reconfigure(encoding="utf-8")
+from shared.llm_usage import LLMUsageSummary, summarize_llm_usage
 
 _graph_app = None
 _graph_lock = asyncio.Lock()
@@ -35,11 +41,21 @@ async def get_graph_app():
 
     async with _graph_lock:
         if _graph_app is None:
-            _graph_app = await build_graph()
+            _graph_app = await prewarm()
 
     return _graph_app
 
 
+@contextlib.asynccontextmanager
+async def mcp_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Prewarms the graph when the server starts instead of on the first tool call.
+    FastMCP may enter this once per session; get_graph_app makes repeats a no-op.
+    """
+    await get_graph_app()
+    yield
+
+
 # --- 2. Define the MCP Interface Schemas ---
 
 class ProtocolInput(BaseModel):
@@ -55,6 +71,28 @@ class ProtocolOutput(BaseModel):
     status: str = Field(description="Final status of the workflow ('COMPLETED', 'FAILED').")
     protocol_draft: str = Field(description="The final, safety-reviewed draft of the clinical protocol.")
     iteration_count: int = Field(description="Number of draft iterations performed.")
+    llm_usage: Optional[LLMUsageSummary] = Field(None, description="Prompt/completion tokens and LLM wall time of the run, in total and per node.")
+
+
+class BatchProtocolInput(BaseModel):
+    """Input for generating many protocols in one MCP call."""
+    user_goals: List[str] = Field(..., description="One goal per protocol to generate.")
+    max_concurrency: int = Field(
+        DEFAULT_CONCURRENCY, ge=1, le=64,
+        description="Maximum number of workflows running at the same time."
+    )
+
+class BatchItemResult(ProtocolOutput):
+    """Result for one goal of a batch; FAILED items carry the error instead of a draft."""
+    user_goal: str = Field(description="The goal this result belongs to.")
+    protocol_draft: Optional[str] = Field(None, description="The final draft, if the workflow completed.")
+    error: Optional[str] = Field(None, description="Failure reason for this item, if any.")
+
+class BatchProtocolOutput(BaseModel):
+    """All batch results, in completion order."""
+    completed: int
+    failed: int
+    results: List[BatchItemResult]
 
 
 # --- 3. Implement the FastMCP Server and Tool ---
@@ -62,7 +100,8 @@ class ProtocolOutput(BaseModel):
 # Initialize the FastMCP server
 mcp_app = FastMCP(
     name="CerinaFoundryProtocolCreator",
-    json_response=True 
+    json_response=True,
+    lifespan=mcp_lifespan,
 )
 
 @mcp_app.tool()
@@ -83,7 +122,8 @@ async def create_clinical_protocol(input_data: ProtocolInput) -> ProtocolOutput:
         execution_context="M2M_API" 
     )
     
-    config = {"configurable": {"thread_id": thread_id}}
+    # M2M callers get the result only once it is archived
+    config = {"configurable": {"thread_id": thread_id, "durable_archive": True}}
     
     try:
         # We use app.invoke (your compiled LangGraph)
@@ -111,16 +151,44 @@ async def create_clinical_protocol(input_data: ProtocolInput) -> ProtocolOutput:
         status=final_state.get("status"),
         protocol_draft=final_state.get("current_draft"),
         iteration_count=final_state.get("iteration_count", 0),
+        llm_usage=summarize_llm_usage(final_state.get("llm_usage")),
     )
 
 
 
 
+@mcp_app.tool()
+async def create_clinical_protocols_batch(input_data: BatchProtocolInput, ctx: Context) -> BatchProtocolOutput:
+    """
+    Generates one reviewed clinical protocol per goal (HIL bypassed, as in create_clinical_protocol),
+    running up to `max_concurrency` workflows at once. Each result is streamed to the client as a
+    progress/log notification when it finishes; the full list is returned at the end.
+    """
+    app = await get_graph_app()
+    items = [{"user_goal": goal, "thread_id": str(uuid.uuid4())} for goal in input_data.user_goals]
+
+    results: List[BatchItemResult] = []
+    async for result in iter_protocol_batch(app, items, input_data.max_concurrency):
+        item = BatchItemResult(**result)
+        results.append(item)
+        await ctx.report_progress(len(results), len(items), f"{item.thread_id}: {item.status}")
+        await ctx.info(item.model_dump_json())
+
+    failed = sum(1 for r in results if r.status != "COMPLETED")
+    return BatchProtocolOutput(completed=len(results) - failed, failed=failed, results=results)
+
+
+@mcp_app.custom_route("/metrics", methods=["GET"])
+async def get_metrics(request: Request) -> PlainTextResponse:
+    """Same Prometheus text exposition as the API's /metrics (HTTP transports only)."""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 def start_mcp_server(host="0.0.0.0", port=8001):
     """Initializes and starts the MCP server."""
     print(f"\n--- Starting Cerina Foundry MCP Server on http://{host}:{port} ---")
     print("M2M Endpoint: /mcp-docs (for discovery)")
-    print("Tool Function: create_clinical_protocol")
+    print("Tool Functions: create_clinical_protocol, create_clinical_protocols_batch")
     
     import uvicorn
     uvicorn.run(mcp_app.app, host=host, port=port)
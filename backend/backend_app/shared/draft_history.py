@@ -0,0 +1,90 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Union
+
+# --- Compact draft history ---
+# The first version is stored in full ({"base": text}); every later version is a
+# line-level delta against the version before it ({"ops": [...]}), where each op is
+# either [start, end] (copy lines start:end of the previous version) or a list of
+# new lines to insert. Plain strings (checkpoints written before this format) are
+# treated as full snapshots.
+
+HistoryEntry = Union[str, Dict]
+
+
+def _entry_lines(entry: HistoryEntry, previous: List[str]) -> List[str]:
+    if isinstance(entry, str):
+        return entry.split("\n")
+    if "base" in entry:
+        return entry["base"].split("\n")
+
+    lines: List[str] = []
+    for op in entry["ops"]:
+        if len(op) == 2 and all(isinstance(i, int) for i in op):
+            lines.extend(previous[op[0]:op[1]])
+        else:
+            lines.extend(op)
+    return lines
+
+
+def encode_version(previous_text: str, new_text: str) -> Dict:
+    """Encodes new_text as a line-level delta against previous_text."""
+    old_lines = previous_text.split("\n")
+    new_lines = new_text.split("\n")
+
+    ops: List[list] = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:  # replace / insert; deletes simply contribute no op
+            ops.append(new_lines[j1:j2])
+    return {"ops": ops}
+
+
+def materialize_history(history: List[HistoryEntry]) -> List[str]:
+    """Reconstructs the full text of every stored draft version, oldest first."""
+    versions: List[str] = []
+    lines: List[str] = []
+    for entry in history or []:
+        lines = _entry_lines(entry, lines)
+        versions.append("\n".join(lines))
+    return versions
+
+
+def get_draft_version(history: List[HistoryEntry], index: int) -> str:
+    """Reconstructs a single version (0-based, negative indexes count from the latest)."""
+    history = history or []
+    if index < 0:
+        index += len(history)
+    if not 0 <= index < len(history):
+        raise IndexError(f"Draft version {index} not in history of {len(history)}")
+
+    lines: List[str] = []
+    for entry in history[: index + 1]:
+        lines = _entry_lines(entry, lines)
+    return "\n".join(lines)
+
+
+def append_draft_versions(existing: List[HistoryEntry], new: List[HistoryEntry]) -> List[HistoryEntry]:
+    """
+    LangGraph reducer for BlackboardState.draft_history.
+    Nodes still append full draft strings; they are delta-encoded against the
+    latest stored version before they reach the checkpoint.
+    """
+    history = list(existing or [])
+    if not new:
+        return history
+
+    latest = get_draft_version(history, -1) if history else None
+    for item in new:
+        if not isinstance(item, str):
+            # Already encoded (e.g. state restored from a checkpoint)
+            history.append(item)
+            latest = get_draft_version(history, -1)
+            continue
+        if latest is None:
+            history.append({"base": item})
+        else:
+            history.append(encode_version(latest, item))
+        latest = item
+    return history
@@ -0,0 +1,67 @@
+import re
+import hashlib
+import unicodedata
+from typing import FrozenSet, List
+
+# --- Intent normalization for protocol reuse ---
+# Exact matches compare the whole intent, lowercased with accents folded and whitespace
+# and punctuation collapsed; word order and function words are kept, so "parents of
+# anxious children" and "anxious parents of children" stay different intents.
+# Near-match candidates are compared on their content words: stop words and request
+# boilerplate ("create a CBT protocol for ...") dropped, plurals folded, sorted, and
+# scored by character-trigram Jaccard similarity of those bags.
+
+STOP_WORDS = frozenset("""
+    a an the and or of for to in on at by with about from into as is are be my our your their
+    me i we you they it this that these those some any please can could would should will
+    create make write generate build draft design give need want help get based using use
+    protocol protocols plan exercise exercises cbt cognitive behavioral behavioural therapy
+""".split())
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _fold_plural(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _words(intent: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", intent or "").encode("ascii", "ignore").decode("ascii").lower()
+    return _WORD_RE.findall(text)
+
+
+def intent_terms(intent: str, fold_plurals: bool = True) -> List[str]:
+    """Content words of an intent, in order."""
+    words = [word for word in _words(intent) if word not in STOP_WORDS]
+    return [_fold_plural(word) for word in words] if fold_plurals else words
+
+
+def exact_intent_key(intent: str) -> str:
+    """Order-preserving form for exact matches: every word, in order, single-spaced."""
+    return " ".join(_words(intent))
+
+
+def normalize_intent(intent: str) -> str:
+    """Order-insensitive form for near-match scoring: the distinct content words, sorted."""
+    return " ".join(sorted(set(intent_terms(intent))))
+
+
+def intent_hash(exact_key: str) -> str:
+    return hashlib.sha256(exact_key.encode("utf-8")).hexdigest()
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def intent_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the character trigrams of two normalized intents (0..1)."""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    left, right = trigrams(a), trigrams(b)
+    return len(left & right) / len(left | right)
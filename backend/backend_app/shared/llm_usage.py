@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, List, Optional
+from pydantic import BaseModel, Field
+
+# --- Per-thread LLM accounting ---
+# Every successful LLM request made inside a node is appended to the run's `llm_usage`
+# channel as one record: {"node", "role", "prompt_tokens", "completion_tokens", "latency_ms"}.
+# Failed attempts report no usage and are not recorded; evaluator streams cut off as
+# off-schema are recorded with the tokens read so far (estimated when the provider had
+# not reported them yet). Cached evaluations make no request.
+
+
+class UsageTotals(BaseModel):
+    """Summed usage of a group of LLM requests."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+
+    def add(self, record: Dict):
+        self.calls += 1
+        self.prompt_tokens += int(record.get("prompt_tokens") or 0)
+        self.completion_tokens += int(record.get("completion_tokens") or 0)
+        self.latency_ms += float(record.get("latency_ms") or 0.0)
+
+
+class LLMUsageSummary(BaseModel):
+    """LLM usage of one thread, overall and per graph node."""
+    total: UsageTotals = Field(default_factory=UsageTotals)
+    by_node: Dict[str, UsageTotals] = Field(default_factory=dict)
+
+    def add(self, record: Dict):
+        self.total.add(record)
+        self.by_node.setdefault(record.get("node") or "unknown", UsageTotals()).add(record)
+
+
+def usage_record(node: str, role: str, usage: Optional[Dict], latency_s: float) -> Dict:
+    """Builds one record from a response's usage_metadata (LangChain input/output token names)."""
+    usage = usage or {}
+    return {
+        "node": node,
+        "role": role,
+        "prompt_tokens": int(usage.get("input_tokens") or 0),
+        "completion_tokens": int(usage.get("output_tokens") or 0),
+        "latency_ms": round(latency_s * 1000, 3),
+    }
+
+
+def summarize_llm_usage(records: Optional[Iterable[Dict]], summary: Optional[LLMUsageSummary] = None) -> LLMUsageSummary:
+    """Aggregates records, optionally on top of an existing summary (which is not modified)."""
+    summary = summary.model_copy(deep=True) if summary is not None else LLMUsageSummary()
+    for record in records or []:
+        summary.add(record)
+    return summary
+
+
+def usage_rows(summary: LLMUsageSummary) -> List[tuple]:
+    """(node, calls, prompt_tokens, completion_tokens, latency_ms) per node, for storage."""
+    return [
+        (node, t.calls, t.prompt_tokens, t.completion_tokens, t.latency_ms)
+        for node, t in sorted(summary.by_node.items())
+    ]
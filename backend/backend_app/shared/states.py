@@ -1,6 +1,7 @@
 import operator
 from typing import Annotated, List, Optional, TypedDict, Union, Dict, Any
 from pydantic import BaseModel, Field
+from shared.draft_history import append_draft_versions
 
 # --- 1. Inner Data Models (Structured "Thoughts") ---
 # These are the rigorous schemas we want our agents to populate.
@@ -16,6 +17,10 @@ class FeedbackItem(BaseModel):
         ..., description="Specific instructions for the Drafter on how to fix this."
     )
 """
+# Minimum scores the supervisor accepts without a revision
+SAFETY_PASS_SCORE = 9
+CLINICAL_PASS_SCORE = 8
+
 class ClinicalReview(BaseModel):
     """The full output from the Clinical Critic agent."""
     feedback: Optional[List[str]] = None
@@ -26,6 +31,12 @@ class SafetyAssessment(BaseModel):
     feedback: Optional[List[str]] = None
     safety_score: float = Field(..., description="0 - 10 score for Safety")
 
+class EvaluationSkipped(BaseModel):
+    """Marker left by an evaluator whose review was cancelled because the other one failed the draft."""
+    evaluator: str = Field(..., description="Node whose review was cancelled.")
+    failed_by: str = Field(..., description="Node whose failing result made the review unnecessary.")
+    reason: str = Field("", description="The failing result, e.g. 'safety score 4.0'.")
+
 # --- 2. The Main Blackboard State ---
 # This is the object passed between nodes in the graph.
 
@@ -39,8 +50,9 @@ class BlackboardState(TypedDict):
     final_draft: str             # The final text approved by the human
     
     # --- History & Versioning ---
-    # operator.add tells LangGraph to APPEND new items to this list, not overwrite
-    draft_history: Annotated[List[str], operator.add] 
+    # Nodes append full draft strings; the reducer stores the first version in full and
+    # later ones as line diffs (see shared/draft_history.py, materialize_history to read)
+    draft_history: Annotated[List[Union[str, Dict]], append_draft_versions]
     iteration_count: int         # Safety valve to prevent infinite loops
     
     # --- The "Blackboard" (Agent Scratchpads) ---
@@ -48,6 +60,10 @@ class BlackboardState(TypedDict):
     safety_assessment: Optional[SafetyAssessment]
     clinical_critique: Optional[ClinicalReview]
     agent_thoughts: Annotated[List[Dict], operator.add]
+    # Set when early termination cancelled one evaluator this round; cleared by the preprocessor
+    evaluation_skipped: Optional[EvaluationSkipped]
+    # One record per LLM request, appended by the node that made it (shared/llm_usage.py)
+    llm_usage: Annotated[List[Dict], operator.add]
     
     # --- Workflow Control ---
     # The Supervisor sets these to guide the graph
@@ -57,3 +73,5 @@ class BlackboardState(TypedDict):
     human_decision: Optional[str]
     reason_for_revision: Optional[str]
     is_revision: bool
+    reused_protocol_id: Optional[str]  # Archived protocol of the same intent, served as the first draft
+    seeded_from_protocol_id: Optional[str]  # Archived protocol of a similar intent the first draft adapted
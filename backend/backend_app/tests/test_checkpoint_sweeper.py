@@ -0,0 +1,45 @@
+import asyncio
+from datetime import timedelta
+
+import aiosqlite
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from core.checkpoint_sweeper import AWAITING_STATUS, CheckpointSweeper
+from core.metrics import awaiting_review_threads
+from core.state_cache import hot_state_cache
+
+
+async def save(checkpointer: AsyncSqliteSaver, thread_id: str, status: str, ts: str):
+    checkpoint = empty_checkpoint()
+    checkpoint["ts"] = ts
+    checkpoint["channel_values"] = {"status": status}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    await checkpointer.aput(config, checkpoint, {"source": "loop", "step": 1}, {})
+
+
+def test_expired_review_threads_leave_the_cache_and_the_gauge(tmp_path):
+    async def scenario():
+        async with aiosqlite.connect(str(tmp_path / "checkpoints.sqlite")) as conn:
+            checkpointer = AsyncSqliteSaver(conn)
+            await checkpointer.setup()
+            await save(checkpointer, "expired", AWAITING_STATUS, "2000-01-01T00:00:00+00:00")
+            await save(checkpointer, "fresh", AWAITING_STATUS, "2999-01-01T00:00:00+00:00")
+            for thread_id in ("expired", "fresh"):
+                awaiting_review_threads.add(thread_id)
+                hot_state_cache.seed(thread_id, {"status": AWAITING_STATUS})
+
+            report = await CheckpointSweeper(checkpointer, review_ttl=timedelta(hours=1)).sweep()
+            remaining = await checkpointer.aget_tuple({"configurable": {"thread_id": "expired", "checkpoint_ns": ""}})
+            return report, remaining
+
+    try:
+        report, remaining = asyncio.run(scenario())
+        assert report["threads_expired"] == 1
+        assert remaining is None
+        assert "expired" not in awaiting_review_threads
+        assert hot_state_cache.get("expired") is None
+        assert "fresh" in awaiting_review_threads
+    finally:
+        awaiting_review_threads.difference_update({"expired", "fresh"})
+        hot_state_cache.evict("fresh")
@@ -0,0 +1,72 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import core.sqlite_db as sqlite_db
+from core.intent_index import IntentIndex
+from shared.intent_similarity import exact_intent_key, normalize_intent
+
+ARCHIVED = "CBT protocol for parents of anxious children"
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_db, "DB_PATH", str(tmp_path / "app.db"))
+    sqlite_db.init_db()
+    sqlite_db.log_final_protocol("run-1", {
+        "user_intent": ARCHIVED,
+        "current_draft": "# Coaching parents of anxious children",
+        "status": "COMPLETED",
+    })
+    index = IntentIndex(db_path=sqlite_db.DB_PATH, threshold=0.5)
+    yield index
+    index.close()
+
+
+def test_exact_key_keeps_word_order_and_function_words():
+    assert exact_intent_key("  CBT protocol, for parents-of anxious CHILDREN! ") == "cbt protocol for parents of anxious children"
+    assert exact_intent_key(ARCHIVED) != exact_intent_key("CBT protocol for anxious parents of children")
+    assert exact_intent_key("Exposure for a child") != exact_intent_key("Exposure for the child")
+
+
+def test_content_word_bag_ignores_order():
+    # The near-match form is the one that may not decide exact reuse
+    assert normalize_intent(ARCHIVED) == normalize_intent("CBT protocol for anxious parents of children")
+
+
+def test_case_and_punctuation_changes_are_exact(index):
+    match = asyncio.run(index.find("cbt protocol for parents of anxious children."))
+    assert match is not None and match.exact
+
+
+@pytest.mark.parametrize("intent", [
+    "CBT protocol for anxious parents of children",   # role swap
+    "Anxious children of parents: CBT protocol for",  # reordered
+    "CBT protocol for parents of anxious child",      # plural folded in the bag only
+])
+def test_reordered_or_role_swapped_intents_are_not_exact(index, intent):
+    match = asyncio.run(index.find(intent))
+    # Still a near match, which only seeds the drafter
+    assert match is not None and not match.exact
+    assert index.exact_hits == 0 and index.near_hits == 1
+
+
+def test_old_bag_hashed_index_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_db, "DB_PATH", str(tmp_path / "old.db"))
+    sqlite_db.init_db()
+    sqlite_db.log_final_protocol("run-1", {"user_intent": ARCHIVED, "current_draft": "# Draft", "status": "COMPLETED"})
+    conn = sqlite3.connect(sqlite_db.DB_PATH)
+    conn.executescript("""
+        DROP TABLE intent_index;
+        CREATE TABLE intent_index (protocol_id TEXT PRIMARY KEY, intent_hash TEXT NOT NULL, normalized_intent TEXT NOT NULL);
+    """)
+    conn.close()
+
+    sqlite_db.init_db()
+    index = IntentIndex(db_path=sqlite_db.DB_PATH)
+    try:
+        assert asyncio.run(index.find(ARCHIVED)).exact
+        assert not asyncio.run(index.find("CBT protocol for anxious parents of children")).exact
+    finally:
+        index.close()
@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from agents.json_stream import IncrementalJSONValidator, SchemaViolation
+from shared.states import ClinicalReview, SafetyAssessment
+
+
+def feed_chunks(validator: IncrementalJSONValidator, chunks) -> bool:
+    """Feeds `chunks` in order; returns what the last feed() returned."""
+    complete = False
+    for chunk in chunks:
+        complete = validator.feed(chunk)
+    return complete
+
+
+def split_at(text: str, *positions: int):
+    bounds = [0, *positions, len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_single_chunk():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    assert validator.feed('{"safety_score": 9.5, "feedback": []}')
+    assert validator.result == SafetyAssessment(safety_score=9.5, feedback=[])
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_every_chunk_size_gives_the_same_result(size):
+    raw = json.dumps({"feedback": ['Line 3: say "breathe", not \\breathe\\', "café — ok"], "safety_score": -1.25e1})
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    assert feed_chunks(validator, [raw[i:i + size] for i in range(0, len(raw), size)])
+    assert validator.result == SafetyAssessment.model_validate_json(raw)
+
+
+def test_chunk_boundary_inside_an_escape():
+    raw = r'{"feedback": ["Line 2: quote \"stop\" and keep \\ slashes"], "safety_score": 8}'
+    backslash = raw.index("\\")
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    # The escape's backslash ends one chunk; the escaped quote must not close the string
+    assert not validator.feed(raw[:backslash + 1])
+    assert feed_chunks(validator, [raw[backslash + 1:]])
+    assert validator.result.feedback == ['Line 2: quote "stop" and keep \\ slashes']
+
+
+def test_chunk_boundary_inside_a_number():
+    raw = '{"safety_score": 10.75, "feedback": null}'
+    start = raw.index("10.75")
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    assert feed_chunks(validator, split_at(raw, start + 1, start + 3, start + 4))
+    assert validator.result.safety_score == 10.75
+
+
+def test_number_ending_the_object():
+    validator = IncrementalJSONValidator(ClinicalReview)
+    assert feed_chunks(validator, ['{"overall_score": 1', "0", "}"])
+    assert validator.result.overall_score == 10
+
+
+def test_nullable_field_accepts_null():
+    validator = IncrementalJSONValidator(ClinicalReview)
+    assert feed_chunks(validator, ['{"feedback": nu', 'll, "overall_score": 7}'])
+    assert validator.result == ClinicalReview(feedback=None, overall_score=7)
+
+
+def test_null_for_a_required_field_is_rejected():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    with pytest.raises(SchemaViolation, match="may not be null"):
+        feed_chunks(validator, ['{"safety_score": null', ', "feedback": []}'])
+
+
+def test_mistyped_field_is_rejected_before_the_object_closes():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    with pytest.raises(SchemaViolation, match="should be a number"):
+        validator.feed('{"safety_score": "9')
+
+
+def test_feedback_with_a_non_string_item_is_rejected():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    with pytest.raises(SchemaViolation, match="only strings"):
+        validator.feed('{"feedback": ["ok", 3')
+
+
+def test_duplicate_key_is_rejected():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    with pytest.raises(SchemaViolation, match="duplicate field 'safety_score'"):
+        feed_chunks(validator, ['{"safety_score": 9, ', '"safety_score": 3}'])
+
+
+def test_echoed_schema_is_rejected_at_its_first_key():
+    schema = json.dumps(SafetyAssessment.model_json_schema())
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    with pytest.raises(SchemaViolation, match="unexpected field"):
+        feed_chunks(validator, [schema[i:i + 16] for i in range(0, len(schema), 16)])
+    # Stopped at the first schema keyword, not at the end of the echo
+    assert validator._consumed < len(schema)
+
+
+def test_unknown_non_schema_field_is_skipped():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    assert validator.feed('{"notes": {"a": [1, "}"]}, "safety_score": 9}')
+    assert validator.result.safety_score == 9
+
+
+def test_missing_required_field_is_rejected_on_close():
+    validator = IncrementalJSONValidator(SafetyAssessment)
+    with pytest.raises(SchemaViolation, match="required field"):
+        validator.feed('{"feedback": []}')
+
+
+def test_preamble_and_trailing_epilogue_are_ignored():
+    validator = IncrementalJSONValidator(ClinicalReview)
+    assert not validator.feed("Here is my review:\n```json\n")
+    assert validator.feed('{"overall_score": 8}\n```\nLet me know if')
+    # Completed objects ignore the rest of the stream
+    assert validator.feed(" you need anything else. {not json")
+    validator.finish()
+    assert validator.result.overall_score == 8
+
+
+def test_output_ending_early_fails_finish():
+    validator = IncrementalJSONValidator(ClinicalReview)
+    assert not validator.feed('{"overall_score": 8')
+    with pytest.raises(SchemaViolation, match="ended before"):
+        validator.finish()
+
+
+def test_runaway_output_hits_the_ceiling():
+    validator = IncrementalJSONValidator(SafetyAssessment, max_chars=64)
+    validator.feed('{"feedback": ["')
+    with pytest.raises(SchemaViolation, match="exceeded 64 characters"):
+        for _ in range(10):
+            validator.feed("x" * 16)
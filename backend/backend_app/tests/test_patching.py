@@ -0,0 +1,75 @@
+import pytest
+
+from agents.patching import LinePatch, PatchError, apply_line_patches, parse_patches
+
+DRAFT = "\n".join(f"line {n}" for n in range(1, 6))
+
+
+def patch(start: int, end: int, text: str = "") -> LinePatch:
+    return LinePatch(start=start, end=end, text=text)
+
+
+def test_parse_patches_from_fenced_output():
+    raw = 'Sure:\n```json\n{"patches": [{"start": 2, "end": 3, "text": "new"}]}\n```'
+    assert parse_patches(raw) == [patch(2, 3, "new")]
+
+
+def test_parse_patches_accepts_a_bare_list():
+    assert parse_patches('[{"start": 1, "end": 0, "text": "first"}]') == [patch(1, 0, "first")]
+
+
+@pytest.mark.parametrize("raw, message", [
+    ("no json here", "No JSON patch"),
+    ('{"patches": [{"start": 1, "end": 1,}]}', "not valid JSON"),
+    ('{"patches": []}', "no 'patches' list"),
+    ('{"edits": [{"start": 1, "end": 1}]}', "no 'patches' list"),
+    ('{"patches": [{"start": 0, "end": 1}]}', "Malformed patch entry"),
+    ('{"patches": [{"end": 1}]}', "Malformed patch entry"),
+    ('{"patches": ["line 1"]}', "Malformed patch entry"),
+])
+def test_parse_patches_rejects(raw, message):
+    with pytest.raises(PatchError, match=message):
+        parse_patches(raw)
+
+
+def test_replace_delete_and_insert():
+    patches = [patch(5, 5), patch(2, 3, "two\nthree\nthree and a half"), patch(1, 0, "# Title")]
+    assert apply_line_patches(DRAFT, patches).split("\n") == [
+        "# Title", "line 1", "two", "three", "three and a half", "line 4",
+    ]
+
+
+def test_patch_text_loses_line_tags():
+    assert apply_line_patches(DRAFT, [patch(1, 1, "<L1>first</L1>")]).split("\n")[0] == "first"
+
+
+def test_adjacent_patches_apply():
+    result = apply_line_patches(DRAFT, [patch(2, 2, "b"), patch(3, 3, "c")])
+    assert result.split("\n") == ["line 1", "b", "c", "line 4", "line 5"]
+
+
+def test_insert_after_the_last_line():
+    assert apply_line_patches(DRAFT, [patch(6, 5, "line 6")]).split("\n")[-1] == "line 6"
+
+
+@pytest.mark.parametrize("patches", [
+    [patch(2, 4, "x"), patch(3, 3, "y")],
+    [patch(2, 3, "x"), patch(3, 5, "y")],
+    [patch(3, 3, "x"), patch(3, 3, "y")],
+    [patch(2, 4), patch(3, 2, "inserted inside a replaced range")],
+])
+def test_overlapping_patches_are_rejected(patches):
+    with pytest.raises(PatchError, match="overlaps"):
+        apply_line_patches(DRAFT, patches)
+
+
+@pytest.mark.parametrize("patches", [
+    [patch(4, 6, "x")],
+    [patch(7, 6, "x")],
+    [patch(3, 1, "x")],
+    [patch(1, 1, "ok"), patch(6, 6, "x")],
+])
+def test_out_of_range_patches_are_rejected(patches):
+    with pytest.raises(PatchError, match="outside the 5-line draft"):
+        apply_line_patches(DRAFT, patches)
+
@@ -0,0 +1,124 @@
+import asyncio
+
+from core.rate_limiter import RateLimiter
+from core.resilience import LatencyTracker, RetryPolicy, call_with_resilience
+
+
+def saturated_limiter() -> RateLimiter:
+    """One key, one slot, generous budgets: only the concurrency slot is contended."""
+    return RateLimiter(["key"], 10**6, 10**9, initial_concurrency=1, max_concurrency=1)
+
+
+async def hold_slot(limiter: RateLimiter, seconds: float, held: asyncio.Event):
+    async with limiter.lease(1):
+        held.set()
+        await asyncio.sleep(seconds)
+
+
+def test_queueing_for_a_lease_does_not_time_out_or_count_as_latency():
+    async def scenario():
+        limiter = saturated_limiter()
+        tracker = LatencyTracker()
+        calls = []
+
+        async def request(lease):
+            calls.append(lease.api_key)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        held = asyncio.Event()
+        holder = asyncio.create_task(hold_slot(limiter, 0.3, held))
+        await held.wait()
+        # Queued for ~0.3s behind the holder; the 0.1s timeout only covers the request
+        result = await call_with_resilience(
+            request, RetryPolicy(timeout_s=0.1, max_attempts=1), tracker,
+            admit=lambda: limiter.lease(1),
+        )
+        await holder
+        return result, calls, tracker.samples
+
+    result, calls, samples = asyncio.run(scenario())
+    assert result == "answer"
+    assert calls == ["key"]
+    assert len(samples) == 1 and samples[0] < 0.1
+
+
+def test_queued_calls_do_not_hedge():
+    async def scenario():
+        limiter = saturated_limiter()
+        tracker = LatencyTracker()
+        for _ in range(5):
+            tracker.record(0.02)
+        policy = RetryPolicy(timeout_s=1.0, max_attempts=1, hedge=True, hedge_min_delay_s=0.02, hedge_min_samples=5)
+        calls = 0
+
+        async def request(lease):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        held = asyncio.Event()
+        holder = asyncio.create_task(hold_slot(limiter, 0.2, held))
+        await held.wait()
+        await call_with_resilience(request, policy, tracker, admit=lambda: limiter.lease(1))
+        await holder
+        return calls, limiter.keys[0].in_flight
+
+    calls, in_flight = asyncio.run(scenario())
+    # Ten hedge delays spent in the queue did not send a duplicate request
+    assert calls == 1
+    assert in_flight == 0
+
+
+def test_slow_admitted_request_still_times_out_and_retries():
+    async def scenario():
+        limiter = saturated_limiter()
+        attempts = 0
+
+        async def request(lease):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                await asyncio.sleep(1)
+            return attempts
+
+        policy = RetryPolicy(timeout_s=0.05, max_attempts=2, base_delay_s=0.0)
+        result = await call_with_resilience(request, policy, admit=lambda: limiter.lease(1))
+        return result, limiter.keys[0].in_flight
+
+    result, in_flight = asyncio.run(scenario())
+    assert result == 2
+    # The timed-out attempt gave its slot back before the retry was admitted
+    assert in_flight == 0
+
+
+def test_hedge_takes_its_own_lease():
+    async def scenario():
+        limiter = RateLimiter(["key"], 10**6, 10**9, initial_concurrency=2, max_concurrency=2)
+        tracker = LatencyTracker()
+        for _ in range(5):
+            tracker.record(0.02)
+        policy = RetryPolicy(timeout_s=1.0, max_attempts=1, hedge=True, hedge_min_delay_s=0.02, hedge_min_samples=5)
+        in_flight = []
+
+        async def request(lease):
+            in_flight.append(limiter.keys[0].in_flight)
+            # The primary stalls; the hedge answers
+            await asyncio.sleep(0.5 if len(in_flight) == 1 else 0.01)
+            return len(in_flight)
+
+        result = await call_with_resilience(request, policy, tracker, admit=lambda: limiter.lease(1))
+        return result, in_flight, limiter.keys[0].in_flight
+
+    result, in_flight, remaining = asyncio.run(scenario())
+    assert result == 2
+    assert in_flight == [1, 2]
+    assert remaining == 0
+
+
+def test_without_admission_the_call_gets_no_ticket():
+    async def request(ticket):
+        return ticket
+
+    assert asyncio.run(call_with_resilience(request, RetryPolicy())) is None
@@ -0,0 +1,90 @@
+import pytest
+
+from core.safety_screen import AhoCorasick, SafetyPrescreen, _is_guarded, _tokenize
+
+
+def matches(patterns, text):
+    matcher = AhoCorasick({tuple(p.split()): p for p in patterns})
+    return [(end, label) for end, _, label in matcher.iter_matches(text.split())]
+
+
+def test_automaton_finds_overlapping_and_nested_phrases():
+    found = matches(["he", "she", "his", "hers", "she sells"], "she sells he hers his")
+    assert found == [(0, "she"), (1, "she sells"), (2, "he"), (3, "hers"), (4, "his")]
+
+
+def test_automaton_follows_failure_links_into_shorter_phrases():
+    # "a b c" fails after "a b"; "b c d" must still be found from the shared suffix
+    assert matches(["a b c x", "b c d"], "a b c d") == [(3, "b c d")]
+
+
+def test_automaton_matches_whole_words_only():
+    assert matches(["end it all"], "blend it all") == []
+    assert matches(["end it all"], "end it all end it all") == [(2, "end it all"), (5, "end it all")]
+
+
+def test_tokenize_marks_sentence_breaks():
+    assert _tokenize("Never! Double your dose; don’t “wait”.") == [
+        "never", ".", "double", "your", "dose", ".", "don't", "wait", ".",
+    ]
+
+
+@pytest.mark.parametrize("text, guarded", [
+    ("never double your dose", True),
+    ("please do not ever under any circumstances double your dose", True),   # 6 words back
+    ("not a good idea for anyone on most days to double your dose", False),  # out of the window
+    ("never . double your dose tonight", False),                             # previous sentence
+    ("double your dose and call your doctor", True),                         # help on the line
+])
+def test_guard_rules(text, guarded):
+    tokens = _tokenize(text)
+    start = tokens.index("double")
+    assert _is_guarded(tokens, start, start + 2) is guarded
+
+
+@pytest.fixture(scope="module")
+def screen():
+    return SafetyPrescreen()
+
+
+def scan(screen, line: str):
+    return [(hit.phrase, hit.hard) for hit in screen.scan(f"<L1>{line}</L1>")]
+
+
+@pytest.mark.parametrize("line", [
+    "Never double your dose. Tonight, double your dose.",
+    "Tonight, double your dose. Never double your dose.",
+])
+def test_an_unguarded_occurrence_is_hard_whatever_comes_first(screen, line):
+    assert scan(screen, line) == [("double your dose", True)]
+
+
+def test_guard_does_not_reach_into_the_next_sentence(screen):
+    assert scan(screen, "Never. Double your dose tonight.") == [("double your dose", True)]
+    assert scan(screen, "Never double your dose tonight.") == [("double your dose", False)]
+
+
+def test_guarded_and_hint_phrases_are_hints(screen):
+    assert scan(screen, "Do not stop taking your medication without talking to your prescriber.") == [
+        ("stop taking your medication", False)
+    ]
+    assert scan(screen, "If you feel like you want to end it all, call 988.") == [("end it all", False)]
+    assert scan(screen, "Thought: I am better off dead.") == [("better off dead", False)]
+
+
+def test_phrases_do_not_match_across_sentences(screen):
+    assert scan(screen, "Write it down until the end. It all gets easier with practice.") == []
+    assert scan(screen, "Write it down until the end, it all gets easier with practice.") == [("end it all", False)]
+
+
+def test_hits_carry_draft_line_numbers(screen):
+    draft = "<L7># Plan</L7>\n<L8>Skip your medication on weekends.</L8>\n<L9>Rest.</L9>"
+    [hit] = screen.scan(draft)
+    assert (hit.line_number, hit.flag, hit.hard) == (8, "MEDICAL_ADVICE", True)
+
+
+def test_custom_lexicons():
+    screen = SafetyPrescreen(lexicon={"TEST": ["stop now"]}, hint_lexicon={"TEST": ["slow down"]})
+    assert [(hit.phrase, hit.hard) for hit in screen.scan("<L1>slow down and stop now</L1>")] == [
+        ("slow down", False), ("stop now", True),
+    ]
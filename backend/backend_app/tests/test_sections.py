@@ -0,0 +1,65 @@
+from agents.sections import (
+    DraftSection, merge_clinical_reviews, merge_safety_assessments, split_sections, to_draft_lines,
+)
+from agents.utilities import preprocessor_node
+from shared.states import ClinicalReview, SafetyAssessment
+
+
+def tagged(draft: str) -> str:
+    return preprocessor_node({"current_draft": draft})["augmented_draft"]
+
+
+DRAFT = "\n".join(["# Title", "## A", "a1", "a2", "## B", "b1", "b2"])
+
+
+def test_sections_keep_draft_wide_bounds():
+    first, second = split_sections(tagged(DRAFT))
+    assert (first.title, first.first_line, first.last_line) == ("A", 1, 4)
+    assert (second.title, second.first_line, second.last_line) == ("B", 5, 7)
+    assert second.augmented_text == "<L5>## B</L5>\n<L6>b1</L6>\n<L7>b2</L7>"
+
+
+def test_sections_are_reviewed_with_relative_numbers():
+    second = split_sections(tagged(DRAFT))[1]
+    assert second.text == "## B\nb1\nb2"
+    assert second.relative_text == "<L1>## B</L1>\n<L2>b1</L2>\n<L3>b2</L3>"
+
+
+def test_inserting_a_line_only_changes_its_own_section():
+    before = split_sections(tagged(DRAFT))
+    after = split_sections(tagged(DRAFT.replace("a2", "a2\na3")))
+    assert after[0].text != before[0].text
+    # Renumbered draft-wide, identical to review and cache
+    assert after[1].first_line == before[1].first_line + 1
+    assert after[1].augmented_text != before[1].augmented_text
+    assert (after[1].text, after[1].relative_text) == (before[1].text, before[1].relative_text)
+
+
+def test_cited_lines_are_shifted_to_draft_numbers():
+    section = DraftSection(first_line=11)
+    feedback = [
+        "Line 2: soften the wording",
+        "lines 3-4 repeat <L5>, see also L1 and 2",
+        "General: no line cited, 10 steps is too many",
+    ]
+    assert to_draft_lines(feedback, section) == [
+        "Line 12: soften the wording",
+        "lines 13-14 repeat <L15>, see also L11 and 12",
+        "General: no line cited, 10 steps is too many",
+    ]
+    assert to_draft_lines(None, section) is None
+
+
+def test_merges_keep_the_worst_score_and_draft_numbers():
+    sections = split_sections(tagged(DRAFT))
+    safety = merge_safety_assessments([
+        SafetyAssessment(safety_score=9, feedback=None),
+        SafetyAssessment(safety_score=4, feedback=["Line 2: crisis advice"]),
+    ], sections)
+    assert safety == SafetyAssessment(safety_score=4, feedback=["Line 6: crisis advice"])
+
+    clinical = merge_clinical_reviews([
+        ClinicalReview(overall_score=6, feedback=["Line 3: vague"]),
+        ClinicalReview(overall_score=9, feedback=[]),
+    ], sections)
+    assert clinical == ClinicalReview(overall_score=6, feedback=["Line 3: vague"])
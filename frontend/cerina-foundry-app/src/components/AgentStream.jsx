@@ -72,6 +72,27 @@ function AgentStream({ streamEvents = [] }) {
                             );
                         }
 
+                        /* ---------- SKIPPED EVALUATION ---------- */
+                        // Cancelled because the other evaluator already failed the draft
+                        if (event.type === 'evaluation_skipped') {
+                            const { evaluator, failed_by, reason } = event.data || {};
+                            const delay = renderIndex++ * 220;
+
+                            return (
+                                <StreamItem
+                                    key={`skipped-${index}`}
+                                    agent={
+                                        evaluator === 'safety_guardian_agent'
+                                            ? 'Safety Guardian'
+                                            : 'Clinical Critic'
+                                    }
+                                    text={`SKIPPED: ${failed_by} already failed this draft (${reason}). The revised draft will be reviewed.`}
+                                    accent="gray"
+                                    delay={delay}
+                                />
+                            );
+                        }
+
                         /* ---------- REPORTS ---------- */
                         if (
                             event.type === 'safety_report' ||
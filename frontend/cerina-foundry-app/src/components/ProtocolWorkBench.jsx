@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import '../index.css';
 
 import StartForm from './StartForm';
@@ -8,6 +8,9 @@ import AgentStream from './AgentStream';
 import StatusIndicator from './StatusIndicator';
 
 const API_BASE_URL = 'http://127.0.0.1:8000';
+// Reconnects to GET /stream/{threadId} (with Last-Event-ID) after a dropped connection
+const STREAM_RECONNECT_ATTEMPTS = 5;
+const STREAM_RECONNECT_DELAY_MS = 1000;
 
 const INITIAL_STATE = {
     threadId: null,
@@ -18,11 +21,14 @@ const INITIAL_STATE = {
     loading: false,
     error: null,
     humanDecision: '',
+    streamingIteration: null,
 };
 
 function ProtocolWorkbench() {
     const [state, setState] = useState(INITIAL_STATE);
     const { threadId, status, currentDraft, critique, loading, error, humanDecision } = state;
+    // Stream position and run state, readable from the async stream readers
+    const streamRef = useRef({ threadId: null, lastEventId: 0 });
 
     /* ----------------------------------------------------
        Ensure humanDecision is populated when review starts
@@ -41,14 +47,27 @@ function ProtocolWorkbench() {
        SSE PARSER — STATUS IS AUTHORITATIVE
     -----------------------------------------------------*/
     const parseStreamData = (chunk) => {
-    const lines = chunk.split('\n\n').filter(Boolean);
-
-    lines.forEach(line => {
-        if (!line.startsWith('data: ')) return;
+    const events = chunk.split('\n\n').filter(Boolean);
+
+    events.forEach(event => {
+        // An event is an optional "id: N" line followed by its "data: {...}" line
+        let line = null;
+        event.split('\n').forEach(field => {
+            if (field.startsWith('id: ')) {
+                streamRef.current.lastEventId = Number(field.slice(4));
+            } else if (field.startsWith('data: ')) {
+                line = field;
+            }
+        });
+        if (!line) return;
 
         try {
             const payload = JSON.parse(line.slice(6));
 
+            if (payload.type === 'meta' && payload.thread_id) {
+                streamRef.current.threadId = payload.thread_id;
+            }
+
             setState(prev => {
                 const next = { ...prev };
 
@@ -91,7 +110,7 @@ function ProtocolWorkbench() {
                     /* ---------------------------
                     Stream events (logs only)
                     ----------------------------*/
-                    if (payload.event || payload.type) {
+                    if ((payload.event || payload.type) && payload.type !== 'draft_delta') {
                         next.streamEvents = [
                             ...(prev.streamEvents || []),
                             payload
@@ -117,6 +136,16 @@ function ProtocolWorkbench() {
                             next.loading = true;
                             break;
 
+                        case 'draft_delta':
+                            // Token chunks: a new iteration restarts the live draft
+                            next.currentDraft =
+                                payload.data.iteration === prev.streamingIteration
+                                    ? prev.currentDraft + payload.data.delta
+                                    : payload.data.delta;
+                            next.streamingIteration = payload.data.iteration;
+                            next.status = 'RUNNING';
+                            break;
+
                         case 'draft_update':
                             next.currentDraft =
                                 payload.data?.current_draft ??
@@ -162,6 +191,56 @@ function ProtocolWorkbench() {
         });
     };
 
+    /* ----------------------------------------------------
+       SSE READER — replays missed events after a dropped connection
+    -----------------------------------------------------*/
+    const readEventStream = async (response) => {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+
+            let idx;
+            while ((idx = buffer.indexOf('\n\n')) !== -1) {
+                const chunk = buffer.slice(0, idx);
+                buffer = buffer.slice(idx + 2);
+                parseStreamData(chunk);
+            }
+        }
+    };
+
+    // The server closes the stream cleanly when the run pauses or ends; a network
+    // error instead means the run is still going, so re-attach and replay what was missed.
+    const followStream = async (openResponse) => {
+        let attempt = 0;
+        let response = await openResponse();
+
+        while (true) {
+            try {
+                if (!response.ok) throw new Error('Failed to open workflow stream');
+                await readEventStream(response);
+                return;
+            } catch (err) {
+                if (!streamRef.current.threadId || attempt >= STREAM_RECONNECT_ATTEMPTS) throw err;
+            }
+
+            attempt += 1;
+            await new Promise(resolve => setTimeout(resolve, STREAM_RECONNECT_DELAY_MS * attempt));
+            try {
+                response = await fetch(`${API_BASE_URL}/stream/${streamRef.current.threadId}`, {
+                    headers: { 'Last-Event-ID': String(streamRef.current.lastEventId) },
+                });
+            } catch (err) {
+                response = { ok: false };
+            }
+        }
+    };
+
     /* ----------------------------------------------------
        START WORKFLOW (STREAM)
     -----------------------------------------------------*/
@@ -171,33 +250,21 @@ function ProtocolWorkbench() {
             loading: true,
             status: 'RUNNING',
         });
+        streamRef.current = { threadId: null, lastEventId: 0 };
 
         try {
+            // /start only queues the workflow; its events are read from /stream
             const response = await fetch(`${API_BASE_URL}/start`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ user_intent: userIntent }),
             });
-
             if (!response.ok) throw new Error('Failed to start workflow');
+            const { thread_id: threadId } = await response.json();
+            streamRef.current.threadId = threadId;
+            setState(s => ({ ...s, threadId }));
 
-            const reader = response.body.getReader();
-            const decoder = new TextDecoder();
-            let buffer = '';
-
-            while (true) {
-                const { done, value } = await reader.read();
-                if (done) break;
-
-                buffer += decoder.decode(value, { stream: true });
-
-                let idx;
-                while ((idx = buffer.indexOf('\n\n')) !== -1) {
-                    const chunk = buffer.slice(0, idx);
-                    buffer = buffer.slice(idx + 2);
-                    parseStreamData(chunk);
-                }
-            }
+            await followStream(() => fetch(`${API_BASE_URL}/stream/${threadId}`));
 
         } catch (err) {
             setState(s => ({
@@ -214,27 +281,21 @@ function ProtocolWorkbench() {
     -----------------------------------------------------*/
     const resumeWorkflow = useCallback(async (finalDraft) => {
         setState(s => ({ ...s, loading: true }));
+        streamRef.current.threadId = threadId;
 
         try {
-            const res = await fetch(`${API_BASE_URL}/approve`, {
+            // Progress arrives as the same SSE events as /start (ends with final_result)
+            await followStream(() => fetch(`${API_BASE_URL}/approve/stream`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     thread_id: threadId,
                     final_draft: finalDraft,
                 }),
-            });
-
-            const data = await res.json();
-
-            setState(s => ({
-                ...s,
-                status: data.status,
-                currentDraft: data.current_draft ?? s.currentDraft,
-                loading: false,
-                humanDecision: '',
             }));
 
+            setState(s => ({ ...s, loading: false, humanDecision: '' }));
+
         } catch (err) {
             setState(s => ({
                 ...s,
@@ -249,27 +310,21 @@ function ProtocolWorkbench() {
     -----------------------------------------------------*/
     const reviseWorkflow = useCallback(async (editedDraft) => {
         setState(s => ({ ...s, loading: true }));
+        streamRef.current.threadId = threadId;
 
         try {
-            const res = await fetch(`${API_BASE_URL}/revise`, {
+            // The revision cycle streams its progress instead of blocking until the next review
+            await followStream(() => fetch(`${API_BASE_URL}/revise/stream`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     thread_id: threadId,
                     edited_draft: editedDraft,
                 }),
-            });
-
-            const data = await res.json();
-
-            setState(s => ({
-                ...s,
-                status: data.status,
-                currentDraft: data.current_draft ?? s.currentDraft,
-                loading: false,
-                humanDecision: '',
             }));
 
+            setState(s => ({ ...s, loading: false, humanDecision: '' }));
+
         } catch (err) {
             setState(s => ({
                 ...s,